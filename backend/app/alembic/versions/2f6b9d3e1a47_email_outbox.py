@@ -0,0 +1,45 @@
+"""Email outbox
+
+Revision ID: 2f6b9d3e1a47
+Revises: e4c19d7b5a20
+Create Date: 2026-10-19 21:12:40.118306
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "2f6b9d3e1a47"
+down_revision = "e4c19d7b5a20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "outboxemail",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("created", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("email_to", sa.String(), nullable=False),
+        sa.Column("subject", sa.String(), nullable=False),
+        sa.Column("html", sa.Text(), nullable=False),
+        sa.Column("priority", sa.SmallInteger(), nullable=False),
+        sa.Column("attempts", sa.SmallInteger(), server_default="0", nullable=False),
+        sa.Column("next_attempt", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("sent", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_outboxemail_pending",
+        "outboxemail",
+        ["priority", "next_attempt"],
+        unique=False,
+        postgresql_where=sa.text("sent IS NULL"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_outboxemail_pending", table_name="outboxemail", postgresql_where=sa.text("sent IS NULL"))
+    op.drop_table("outboxemail")
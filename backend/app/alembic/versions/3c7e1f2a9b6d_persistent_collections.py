@@ -0,0 +1,52 @@
+"""Persistent collections
+
+Revision ID: 3c7e1f2a9b6d
+Revises: 9f40b24a68be
+Create Date: 2026-10-19 09:12:41.208113
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "3c7e1f2a9b6d"
+down_revision = "9f40b24a68be"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "collection",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("created", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("modified", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("URI", sa.String(), nullable=False),
+        sa.Column("ordered", sa.Boolean(), nullable=False),
+        sa.Column("totalItems", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("actor_id", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["actor_id"], ["actor.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_collection_URI"), "collection", ["URI"], unique=True)
+    op.create_index(op.f("ix_collection_id"), "collection", ["id"], unique=False)
+    op.create_table(
+        "collectionitem",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("created", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("collection_id", sa.String(), nullable=False),
+        sa.Column("object", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["collection_id"], ["collection.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("collection_id", "object"),
+    )
+    op.create_index("ix_collectionitem_collection_id_id", "collectionitem", ["collection_id", "id"], unique=False)
+
+
+def downgrade():
+    op.drop_index("ix_collectionitem_collection_id_id", table_name="collectionitem")
+    op.drop_table("collectionitem")
+    op.drop_index(op.f("ix_collection_id"), table_name="collection")
+    op.drop_index(op.f("ix_collection_URI"), table_name="collection")
+    op.drop_table("collection")
@@ -0,0 +1,43 @@
+"""Actor lookup indexes
+
+Revision ID: 5d2a8e41c7f3
+Revises: 3c7e1f2a9b6d
+Create Date: 2026-10-19 14:03:27.551902
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5d2a8e41c7f3"
+down_revision = "3c7e1f2a9b6d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index("ix_actor_preferredUsername", table_name="actor")
+    op.drop_index("ix_actor_URI", table_name="actor")
+    op.drop_constraint("actor_URL_key", "actor", type_="unique")
+    op.create_index(
+        "ix_actor_preferredUsername_domain",
+        "actor",
+        ["preferredUsername", "domain"],
+        unique=True,
+        postgresql_include=["URI"],
+    )
+    op.create_index(
+        "ix_actor_URL", "actor", ["URL"], unique=True, postgresql_include=["preferredUsername", "domain", "URI"]
+    )
+    op.create_index("ix_actor_URI", "actor", ["URI"], unique=True, postgresql_include=["inbox", "sharedInbox"])
+    op.create_index("ix_actor_preferredUsername_type", "actor", ["preferredUsername", "type"], unique=False)
+
+
+def downgrade():
+    op.drop_index("ix_actor_preferredUsername_type", table_name="actor")
+    op.drop_index("ix_actor_URI", table_name="actor")
+    op.drop_index("ix_actor_URL", table_name="actor")
+    op.drop_index("ix_actor_preferredUsername_domain", table_name="actor")
+    op.create_unique_constraint("actor_URL_key", "actor", ["URL"])
+    op.create_index("ix_actor_URI", "actor", ["URI"], unique=True)
+    op.create_index("ix_actor_preferredUsername", "actor", ["preferredUsername"], unique=False)
@@ -0,0 +1,32 @@
+"""Actor refresh
+
+Revision ID: 6e3b8c5f1d92
+Revises: 2f6b9d3e1a47
+Create Date: 2026-10-19 23:04:17.520931
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "6e3b8c5f1d92"
+down_revision = "2f6b9d3e1a47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("actor", sa.Column("etag", sa.String(), nullable=True))
+    op.create_index(
+        "ix_actor_fetched_remote",
+        "actor",
+        ["fetched"],
+        unique=False,
+        postgresql_where=sa.text('"privateKey" IS NULL'),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_actor_fetched_remote", table_name="actor", postgresql_where=sa.text('"privateKey" IS NULL'))
+    op.drop_column("actor", "etag")
@@ -0,0 +1,106 @@
+"""Node stats
+
+Revision ID: 7a41c9e2d8b5
+Revises: 5d2a8e41c7f3
+Create Date: 2026-10-19 16:21:08.930417
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "7a41c9e2d8b5"
+down_revision = "5d2a8e41c7f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "nodestat",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("value", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("modified", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    # Seed with current counts, after which the triggers keep the totals and the worker keeps the windows
+    op.execute(
+        """
+        INSERT INTO nodestat (name, value)
+        SELECT 'users_total', count(*) FROM actor WHERE creator_id IS NOT NULL
+        UNION ALL
+        SELECT 'users_active_month', count(*) FROM actor
+        WHERE creator_id IS NOT NULL AND fetched >= now() - interval '30 days'
+        UNION ALL
+        SELECT 'users_active_halfyear', count(*) FROM actor
+        WHERE creator_id IS NOT NULL AND fetched >= now() - interval '180 days'
+        UNION ALL
+        SELECT 'local_posts', count(*) FROM collectionitem i
+        JOIN collection c ON c.id = i.collection_id
+        JOIN actor a ON a.id = c.actor_id
+        WHERE a.creator_id IS NOT NULL AND c."URI" = a.outbox
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION nodestat_count_actor() RETURNS trigger AS $$
+        DECLARE
+            delta integer := 0;
+        BEGIN
+            IF TG_OP <> 'DELETE' AND NEW.creator_id IS NOT NULL THEN
+                delta := delta + 1;
+            END IF;
+            IF TG_OP <> 'INSERT' AND OLD.creator_id IS NOT NULL THEN
+                delta := delta - 1;
+            END IF;
+            IF delta <> 0 THEN
+                UPDATE nodestat SET value = value + delta, modified = now() WHERE name = 'users_total';
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER nodestat_actor AFTER INSERT OR DELETE OR UPDATE OF creator_id ON actor
+        FOR EACH ROW EXECUTE FUNCTION nodestat_count_actor()
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION nodestat_count_post() RETURNS trigger AS $$
+        DECLARE
+            delta integer := 1;
+            item_collection_id varchar := NEW.collection_id;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                delta := -1;
+                item_collection_id := OLD.collection_id;
+            END IF;
+            IF EXISTS (
+                SELECT 1 FROM collection c JOIN actor a ON a.id = c.actor_id
+                WHERE c.id = item_collection_id AND c."URI" = a.outbox AND a.creator_id IS NOT NULL
+            ) THEN
+                UPDATE nodestat SET value = value + delta, modified = now() WHERE name = 'local_posts';
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER nodestat_post AFTER INSERT OR DELETE ON collectionitem
+        FOR EACH ROW EXECUTE FUNCTION nodestat_count_post()
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER nodestat_post ON collectionitem")
+    op.execute("DROP FUNCTION nodestat_count_post()")
+    op.execute("DROP TRIGGER nodestat_actor ON actor")
+    op.execute("DROP FUNCTION nodestat_count_actor()")
+    op.drop_table("nodestat")
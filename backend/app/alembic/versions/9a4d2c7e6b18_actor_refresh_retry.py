@@ -0,0 +1,26 @@
+"""Actor refresh retry
+
+Revision ID: 9a4d2c7e6b18
+Revises: 6e3b8c5f1d92
+Create Date: 2026-10-19 14:37:52.184306
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "9a4d2c7e6b18"
+down_revision = "6e3b8c5f1d92"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("actor", sa.Column("last_modified", sa.String(), nullable=True))
+    op.add_column("actor", sa.Column("retry_after", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column("actor", "retry_after")
+    op.drop_column("actor", "last_modified")
@@ -0,0 +1,121 @@
+"""ULID ids as uuid
+
+Revision ID: b8e3f0a6c214
+Revises: 7a41c9e2d8b5
+Create Date: 2026-10-19 18:47:52.316094
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b8e3f0a6c214"
+down_revision = "7a41c9e2d8b5"
+branch_labels = None
+depends_on = None
+
+# (table, column) pairs holding ULIDs, primary keys before the foreign keys that reference them
+ULID_COLUMNS = [
+    ("creator", "id"),
+    ("token", "authenticates_id"),
+    ("actor", "id"),
+    ("actor", "creator_id"),
+    ("collection", "id"),
+    ("collection", "actor_id"),
+    ("collectionitem", "id"),
+    ("collectionitem", "collection_id"),
+]
+# (name, table, column, referred table, ondelete)
+FOREIGN_KEYS = [
+    ("token_authenticates_id_fkey", "token", "authenticates_id", "creator", None),
+    ("actor_creator_id_fkey", "actor", "creator_id", "creator", None),
+    ("collection_actor_id_fkey", "collection", "actor_id", "actor", "CASCADE"),
+    ("collectionitem_collection_id_fkey", "collectionitem", "collection_id", "collection", "CASCADE"),
+]
+# Crockford base32: 26 characters of 5 bits, the first 2 bits always zero, hold the 128 bits of the uuid
+ULID_TO_UUID = """
+CREATE FUNCTION ulid_to_uuid(ulid text) RETURNS uuid AS $$
+DECLARE
+    alphabet text := '0123456789ABCDEFGHJKMNPQRSTVWXYZ';
+    bits text := '';
+    hex text := '';
+BEGIN
+    FOR i IN 1..26 LOOP
+        bits := bits || ((strpos(alphabet, upper(substr(ulid, i, 1))) - 1)::bit(5))::text;
+    END LOOP;
+    bits := substr(bits, 3);
+    FOR i IN 0..31 LOOP
+        hex := hex || to_hex(substr(bits, i * 4 + 1, 4)::bit(4)::integer);
+    END LOOP;
+    RETURN hex::uuid;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE STRICT
+"""
+UUID_TO_ULID = """
+CREATE FUNCTION uuid_to_ulid(id uuid) RETURNS text AS $$
+DECLARE
+    alphabet text := '0123456789ABCDEFGHJKMNPQRSTVWXYZ';
+    hex text := replace(id::text, '-', '');
+    bits text := '00';
+    ulid text := '';
+BEGIN
+    FOR i IN 1..32 LOOP
+        bits := bits || (('x' || substr(hex, i, 1))::bit(4))::text;
+    END LOOP;
+    FOR i IN 0..25 LOOP
+        ulid := ulid || substr(alphabet, substr(bits, i * 5 + 1, 5)::bit(5)::integer + 1, 1);
+    END LOOP;
+    RETURN ulid;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE STRICT
+"""
+COUNT_POST = """
+CREATE OR REPLACE FUNCTION nodestat_count_post() RETURNS trigger AS $$
+DECLARE
+    delta integer := 1;
+    item_collection_id {type} := NEW.collection_id;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        delta := -1;
+        item_collection_id := OLD.collection_id;
+    END IF;
+    IF EXISTS (
+        SELECT 1 FROM collection c JOIN actor a ON a.id = c.actor_id
+        WHERE c.id = item_collection_id AND c."URI" = a.outbox AND a.creator_id IS NOT NULL
+    ) THEN
+        UPDATE nodestat SET value = value + delta, modified = now() WHERE name = 'local_posts';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def _convert(function: str, column_type: str) -> None:
+    # The column list of an UPDATE OF trigger pins the column type
+    op.execute("DROP TRIGGER nodestat_actor ON actor")
+    for name, table, *_ in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_="foreignkey")
+    for table, column in ULID_COLUMNS:
+        op.execute(f'ALTER TABLE "{table}" ALTER COLUMN "{column}" TYPE {column_type} USING {function}("{column}")')
+    for name, table, column, referred, ondelete in FOREIGN_KEYS:
+        op.create_foreign_key(name, table, referred, [column], ["id"], ondelete=ondelete)
+    op.execute(COUNT_POST.format(type=column_type))
+    op.execute(
+        """
+        CREATE TRIGGER nodestat_actor AFTER INSERT OR DELETE OR UPDATE OF creator_id ON actor
+        FOR EACH ROW EXECUTE FUNCTION nodestat_count_actor()
+        """
+    )
+
+
+def upgrade():
+    op.execute(ULID_TO_UUID)
+    _convert("ulid_to_uuid", "uuid")
+    op.execute("DROP FUNCTION ulid_to_uuid(text)")
+
+
+def downgrade():
+    op.execute(UUID_TO_ULID)
+    _convert("uuid_to_ulid", "varchar")
+    op.execute("DROP FUNCTION uuid_to_ulid(uuid)")
@@ -0,0 +1,75 @@
+"""Activity store
+
+Revision ID: e4c19d7b5a20
+Revises: b8e3f0a6c214
+Create Date: 2026-10-19 21:06:41.582930
+
+"""
+
+import uuid
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "e4c19d7b5a20"
+down_revision = "b8e3f0a6c214"
+branch_labels = None
+depends_on = None
+
+# The current month and the next two; the worker keeps creating them ahead from then on
+INITIAL_PARTITIONS = 3
+
+
+def get_month(year: int, month: int) -> datetime:
+    return datetime(year + (month - 1) // 12, (month - 1) % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def get_bound(moment: datetime) -> str:
+    # The smallest ULID of the moment as a uuid: the 48-bit millisecond timestamp, then zeros
+    return str(uuid.UUID(bytes=int(moment.timestamp() * 1000).to_bytes(6, "big") + bytes(10)))
+
+
+def upgrade():
+    op.create_table(
+        "activity",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("created", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("data", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        postgresql_partition_by="RANGE (id)",
+    )
+    op.create_index("ix_activity_URI", "activity", [sa.text("(data ->> 'id')"), "id"])
+    op.create_index(
+        "ix_activity_actor", "activity", [sa.text("coalesce((data -> 'actor') ->> 'id', data ->> 'actor')"), "id"]
+    )
+    op.create_index(
+        "ix_activity_object",
+        "activity",
+        [sa.text("coalesce((data -> 'object') ->> 'id', data ->> 'object')"), "id"],
+        postgresql_where=sa.text("coalesce((data -> 'object') ->> 'id', data ->> 'object') IS NOT NULL"),
+    )
+    in_reply_to = (
+        "coalesce(((data -> 'object') -> 'inReplyTo') ->> 'id', (data -> 'object') ->> 'inReplyTo', "
+        "(data -> 'inReplyTo') ->> 'id', data ->> 'inReplyTo')"
+    )
+    op.create_index(
+        "ix_activity_inReplyTo",
+        "activity",
+        [sa.text(in_reply_to), "id"],
+        postgresql_where=sa.text(f"{in_reply_to} IS NOT NULL"),
+    )
+    now = datetime.now(timezone.utc)
+    for i in range(INITIAL_PARTITIONS):
+        start, end = get_month(now.year, now.month + i), get_month(now.year, now.month + i + 1)
+        op.execute(
+            f"CREATE TABLE activity_p{start:%Y%m} PARTITION OF activity "
+            f"FOR VALUES FROM ('{get_bound(start)}') TO ('{get_bound(end)}')"
+        )
+
+
+def downgrade():
+    # Dropping the partitioned table drops every partition
+    op.drop_table("activity")
@@ -3,6 +3,7 @@ from fastapi import APIRouter
 from app.api.api_v1.endpoints import (
     oauth,
     creators,
+    metrics,
     proxy,
     wellknown,
     root,
@@ -11,6 +12,7 @@ from app.api.api_v1.endpoints import (
 api_router = APIRouter()
 api_router.include_router(creators.router, prefix="/creators", tags=["creators"])
 api_router.include_router(proxy.router, prefix="/proxy", tags=["proxy"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 
 root_router = APIRouter()
 root_router.include_router(oauth.router, prefix="/oauth", tags=["oauth"])
@@ -1,6 +1,6 @@
 from typing import Annotated, Any, List
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
 from fastapi.encoders import jsonable_encoder
 from pydantic.networks import EmailStr
 from sqlalchemy.orm import Session
@@ -86,13 +86,21 @@ def read_creator(
 def read_all_creators(
     *,
     db: Annotated[Session, Depends(deps.get_db)],
-    page: int = 0,
-    current_creator: Annotated[models.Creator, Depends(deps.get_current_active_admin)],
+    response: Response,
+    cursor: str = "",
+    current_creator: Annotated[schemas.Principal, Depends(deps.get_current_active_admin)],
 ) -> Any:
     """
-    Retrieve all current creators.
+    Retrieve all current creators. If there are more, the `X-Next-Cursor` response header
+    is the `cursor` for the next page.
     """
-    return crud.creator.get_multi(db=db, page=page)
+    try:
+        creators, next_cursor = crud.creator.get_page(db=db, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return creators
 
 
 @router.post("/new-totp", response_model=schemas.NewTOTP)
@@ -114,7 +122,7 @@ def toggle_state(
     *,
     db: Annotated[Session, Depends(deps.get_db)],
     creator_in: schemas.CreatorUpdate,
-    current_creator: Annotated[models.Creator, Depends(deps.get_current_active_admin)],
+    current_creator: Annotated[schemas.Principal, Depends(deps.get_current_active_admin)],
 ) -> Any:
     """
     Toggle creator state (moderator function)
@@ -133,7 +141,7 @@ def create_creator(
     *,
     db: Annotated[Session, Depends(deps.get_db)],
     creator_in: schemas.CreatorCreate,
-    current_creator: Annotated[models.Creator, Depends(deps.get_current_active_admin)],
+    current_creator: Annotated[schemas.Principal, Depends(deps.get_current_active_admin)],
 ) -> Any:
     """
     Create new creator (moderator function).
@@ -146,7 +154,10 @@ def create_creator(
         )
     creator = crud.creator.create(db, obj_in=creator_in)
     if settings.emails_enabled and creator_in.email:
-        send_new_account_email(email_to=creator_in.email, creatorname=creator_in.email, password=creator_in.password)
+        send_new_account_email(
+            db, email_to=creator_in.email, creatorname=creator_in.email, password=creator_in.password
+        )
+        db.commit()
     return creator
 
 
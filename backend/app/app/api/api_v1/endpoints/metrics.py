@@ -0,0 +1,23 @@
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends
+
+from app import schemas
+from app.api import deps
+from app.core.hashing import get_hash_metrics
+from app.core.scheduling import get_queue_latency_metrics
+from app.db.pool import get_pool_metrics
+
+router = APIRouter()
+
+
+@router.get("/")
+def read_metrics(
+    *,
+    current_creator: Annotated[schemas.Principal, Depends(deps.get_current_active_admin)],
+) -> Any:
+    """
+    Connection pool and password hashing metrics for the process serving this request, and worker queue
+    latency for each task priority across all workers (moderator function).
+    """
+    return {"pool": get_pool_metrics(), "hashing": get_hash_metrics(), "queues": get_queue_latency_metrics()}
@@ -48,11 +48,12 @@ def login_with_magic_link(*, db: Annotated[Session, Depends(deps.get_db)], email
     tokens = security.create_magic_tokens(subject=creator.id)
     if settings.emails_enabled and creator.email:
         # Send email with creator.email as subject
-        send_magic_login_email(email_to=creator.email, token=tokens[0])
+        send_magic_login_email(db, email_to=creator.email, token=tokens[0])
+        db.commit()
     return {"claim": tokens[1]}
 
 
-@router.post("/claim", response_model=schemas.Token)
+@router.post("/claim", response_model=schemas.TokenData)
 def validate_magic_link(
     *,
     db: Annotated[Session, Depends(deps.get_db)],
@@ -91,7 +92,7 @@ def validate_magic_link(
     }
 
 
-@router.post("/login", response_model=schemas.Token)
+@router.post("/login", response_model=schemas.TokenData)
 def login_with_oauth2(
     db: Annotated[Session, Depends(deps.get_db)], form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
 ) -> Any:
@@ -117,7 +118,7 @@ def login_with_oauth2(
     }
 
 
-@router.post("/totp", response_model=schemas.Token)
+@router.post("/totp", response_model=schemas.TokenData)
 def login_with_totp(
     *,
     db: Annotated[Session, Depends(deps.get_db)],
@@ -135,6 +136,8 @@ def login_with_totp(
     # Save the new counter to prevent reuse
     scopes = SecurityScopes(["read", "write", "admin"])
     current_creator = crud.creator.update_totp_counter(db=db, db_obj=current_creator, new_counter=new_counter)
+    if not current_creator:
+        raise HTTPException(status_code=400, detail="Login failed; unable to verify TOTP.")
     refresh_token = security.create_refresh_token(subject=current_creator.id, security_scopes=scopes)
     crud.token.create(db=db, obj_in=refresh_token, creator_obj=current_creator)
     return {
@@ -165,8 +168,7 @@ def enable_totp_authentication(
     if not new_counter:
         raise HTTPException(status_code=400, detail="Unable to authenticate or activate TOTP.")
     # Enable TOTP and save the new counter to prevent reuse
-    current_creator = crud.creator.activate_totp(db=db, db_obj=current_creator, totp_in=totp_in)
-    current_creator = crud.creator.update_totp_counter(db=db, db_obj=current_creator, new_counter=new_counter)
+    crud.creator.activate_totp(db=db, db_obj=current_creator, totp_in=totp_in, new_counter=new_counter)
     return {"msg": "TOTP enabled. Do not lose your recovery code."}
 
 
@@ -188,7 +190,7 @@ def disable_totp_authentication(
     return {"msg": "TOTP disabled."}
 
 
-@router.post("/refresh", response_model=schemas.Token)
+@router.post("/refresh", response_model=schemas.TokenData)
 def refresh_token(
     db: Annotated[Session, Depends(deps.get_db)],
     current_creator: Annotated[models.Creator, Depends(deps.get_refresh_creator)],
@@ -198,7 +200,7 @@ def refresh_token(
     """
     refresh_token = security.create_refresh_token(subject=current_creator.id)
     scopes = SecurityScopes(["read", "write", "admin"])
-    crud.token.create(db=db, obj_in=refresh_token, creator_obj=current_creator, security_scopes=scopes)
+    crud.token.create(db=db, obj_in=refresh_token, creator_obj=current_creator)
     return {
         "access_token": security.create_access_token(subject=current_creator.id, security_scopes=scopes),
         "refresh_token": refresh_token,
@@ -209,11 +211,13 @@ def refresh_token(
 @router.post("/revoke", response_model=schemas.Msg)
 def revoke_token(
     db: Annotated[Session, Depends(deps.get_db)],
+    token: Annotated[str, Depends(deps.oauth2_scheme)],
     current_creator: Annotated[models.Creator, Depends(deps.get_refresh_creator)],
 ) -> Any:
     """
     Revoke a refresh token
     """
+    crud.token.remove(db, db_obj=crud.token.get(db, token=token))
     return {"msg": "Token revoked"}
 
 
@@ -226,7 +230,8 @@ def recover_password(email: str, db: Annotated[Session, Depends(deps.get_db)]) -
     if creator and crud.creator.is_active(creator):
         tokens = security.create_magic_tokens(subject=creator.id)
         if settings.emails_enabled:
-            send_reset_password_email(email_to=creator.email, email=email, token=tokens[0])
+            send_reset_password_email(db, email_to=creator.email, email=email, token=tokens[0])
+            db.commit()
             return {"claim": tokens[1]}
     return {"msg": "If that login exists, we'll send you an email to reset your password."}
 
@@ -3,7 +3,7 @@ from pydantic import AnyHttpUrl
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
 import httpx
 
-from app import models
+from app import schemas
 from app.api import deps
 
 
@@ -20,7 +20,7 @@ async def proxy_post_request(
     *,
     path: AnyHttpUrl,
     request: Request,
-    current_creator: Annotated[models.Creator, Depends(deps.get_current_active_creator)],
+    current_creator: Annotated[schemas.Principal, Depends(deps.get_current_active_principal)],
 ) -> Any:
     # https://www.starlette.io/requests/
     # https://www.python-httpx.org/quickstart/
@@ -45,7 +45,7 @@ async def proxy_get_request(
     *,
     path: AnyHttpUrl,
     request: Request,
-    current_creator: Annotated[models.Creator, Depends(deps.get_current_active_creator)],
+    current_creator: Annotated[schemas.Principal, Depends(deps.get_current_active_principal)],
 ) -> Any:
     try:
         headers = {
@@ -1,6 +1,7 @@
 from typing import Annotated, Any, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas, schema_types
@@ -23,7 +24,7 @@ settings_SERVER_HOST = "https://4bcd-193-32-126-132.ngrok-free.app"
 def verify_request_signature(endpoint):
     # https://stackoverflow.com/a/72312122/295606
     @wraps(endpoint)
-    async def wrapper(*, db: Session, request: Request, **kwargs):
+    async def wrapper(*, db: AsyncSession, request: Request, **kwargs):
         # if request.headers.get("SECRET", None) != SECRET_KEY:
         #     raise HTTPException(status_code=401, detail="Invalid client secret")
         print("-------------------------------------------------")
@@ -66,7 +67,7 @@ def test_endpoint() -> Any:
 @verify_request_signature
 async def post_to_actor_inbox(
     *,
-    db: Annotated[Session, Depends(deps.get_db)],
+    db: Annotated[AsyncSession, Depends(deps.get_async_db)],
     actortype: str,
     actorname: str,
     request: Request,
@@ -99,7 +100,7 @@ async def post_to_actor_inbox(
         )
     # 2. Check if user or domain are blocked
     # 3. Get actor and check if they have blocked the poster
-    db_obj = crud.actor.get_by_name(db=db, preferredUsername=actorname, actortype=actortype)
+    db_obj = await crud.actor.aget_by_name(db=db, preferredUsername=actorname, actortype=actortype)
     if not db_obj:
         raise HTTPException(
             status_code=400,
@@ -117,13 +118,14 @@ async def post_to_actor_inbox(
     print("-----------------------------")
     # 5. Convert body to an activitypub class
     # 6. Queue processing the activity
+    await crud.activity.aingest(db, documents=[body])
 
 
 @router.get("/{actortype}/{actorname}")
 # @verify_request_signature
 async def read_actor(
     *,
-    db: Annotated[Session, Depends(deps.get_db)],
+    db: Annotated[AsyncSession, Depends(deps.get_async_read_db)],
     actortype: str,
     actorname: str,
     request: Request,
@@ -131,7 +133,7 @@ async def read_actor(
     """
     Get an actor of a specified type.
     """
-    db_obj = crud.actor.get_by_name(db=db, preferredUsername=actorname, actortype=actortype)
+    db_obj = await crud.actor.aget_by_name(db=db, preferredUsername=actorname, actortype=actortype)
     if not db_obj:
         raise HTTPException(
             status_code=400,
@@ -141,3 +143,32 @@ async def read_actor(
     wk = crud.pub.get_wellknown_actor(db_obj=db_obj)
     output_class = ap.get_class(wk)
     return output_class.data()
+
+
+@router.get("/{actortype}/{actorname}/{collectiontype}")
+def read_actor_collection(
+    *,
+    db: Annotated[Session, Depends(deps.get_read_db)],
+    actortype: str,
+    actorname: str,
+    collectiontype: schema_types.CollectionType,
+    page: bool = False,
+    max_id: str = "",
+) -> Any:
+    """
+    Get an actor's collection, or one page of it. Pages are read by cursor, newest first.
+    """
+    db_obj = crud.actor.get_by_name(db=db, preferredUsername=actorname, actortype=actortype)
+    if not db_obj:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{actortype} unknown.",
+        )
+    uri = getattr(db_obj, collectiontype.value)
+    collection_obj = crud.collection.get_by_uri(db, uri=uri)
+    if not page:
+        return crud.collection.get_collection_document(db_obj=collection_obj, uri=uri)
+    try:
+        return crud.collection.get_page_document(db, db_obj=collection_obj, uri=uri, max_id=max_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
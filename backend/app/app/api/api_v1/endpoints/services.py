@@ -1,8 +1,10 @@
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
 
 from app import schemas
+from app.api import deps
 from app.utilities import send_web_contact_email
 from app.schemas import EmailContent
 
@@ -10,9 +12,10 @@ router = APIRouter()
 
 
 @router.post("/contact", response_model=schemas.Msg, status_code=201)
-def send_email(*, data: EmailContent) -> Any:
+def send_email(*, db: Annotated[Session, Depends(deps.get_db)], data: EmailContent) -> Any:
     """
     Standard app contact us.
     """
-    send_web_contact_email(data=data)
+    send_web_contact_email(db, data=data)
+    db.commit()
     return {"msg": "Web contact email sent"}
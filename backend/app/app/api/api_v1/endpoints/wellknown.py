@@ -27,7 +27,7 @@ def read_nodeinfo_endpoint() -> Any:
 
 
 @router.get("/nodeinfo/2.1", response_model=schemas.NodeInfo, response_model_exclude_none=True)
-def read_nodeinfo(*, db: Annotated[Session, Depends(deps.get_db)]) -> Any:
+def read_nodeinfo(*, db: Annotated[Session, Depends(deps.get_read_db)]) -> Any:
     """
     Get wellknown nodeinfo 2.1.
     """
@@ -38,13 +38,13 @@ def read_nodeinfo(*, db: Annotated[Session, Depends(deps.get_db)]) -> Any:
 # @router.get("/webfinger")
 def read_webfinger(
     *,
-    db: Annotated[Session, Depends(deps.get_db)],
+    db: Annotated[Session, Depends(deps.get_read_db)],
     resource: str = "",
 ) -> Any:
     """
     Get wellknown actor.
     """
-    db_obj = crud.pub.get_actor_by_resource(db=db, resource=resource)
+    db_obj = crud.pub.get_webfinger_by_resource(db=db, resource=resource)
     if not resource or not db_obj:
         raise HTTPException(
             status_code=400,
@@ -1,5 +1,5 @@
 from typing import Generator, Annotated
-from collections.abc import AsyncIterator
+from collections.abc import AsyncGenerator, AsyncIterator
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Depends, HTTPException, status
@@ -7,13 +7,18 @@ from fastapi.security import OAuth2PasswordBearer, SecurityScopes
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from redis import asyncio as aioredis
+from redis import RedisError
 import jwt
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
+from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.principal import principals
+from app.db.replica import replicas
+from app.db.session import AsyncSessionLocal, SessionLocal
 
 
 scope_scheme = {
@@ -32,6 +37,25 @@ def get_db() -> Generator:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db() -> Generator:
+    # Read-only routes only: this may be a replica, so never write with it
+    try:
+        db = replicas.get_session()
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with await replicas.aget_session() as db:
+        yield db
+
+
 @asynccontextmanager
 async def get_lifespan(_: FastAPI) -> AsyncIterator[None]:
     # https://github.com/long2ice/fastapi-cache?tab=readme-ov-file
@@ -43,6 +67,10 @@ async def get_lifespan(_: FastAPI) -> AsyncIterator[None]:
 
 
 def get_token_payload(token: str) -> schemas.TokenPayload:
+    # Revocation is checked by the callers, so a cached payload never outlives it
+    token_data = security.token_cache.get(token)
+    if token_data:
+        return token_data
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGO])
         token_data = schemas.TokenPayload(**payload)
@@ -51,6 +79,7 @@ def get_token_payload(token: str) -> schemas.TokenPayload:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials.",
         )
+    security.token_cache.set(token, token_data)
     return token_data
 
 
@@ -59,18 +88,21 @@ def get_credentials_exception(detail: str, security_scopes: SecurityScopes = Sec
         authenticate_value = f'Bearer scope="{security_scopes.scope_str}"'
     else:
         authenticate_value = "Bearer"
-    HTTPException(
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail=detail,
         headers={"WWW-Authenticate": authenticate_value},
     )
 
 
-def get_current_creator(
+def get_current_principal(
     db: Annotated[Session, Depends(get_db)],
     token: Annotated[str, Depends(oauth2_scheme)],
     security_scopes: SecurityScopes = SecurityScopes([]),
-) -> models.Creator:
+) -> schemas.Principal:
+    """
+    The bearer of an access token, from the principal cache. Only a cache miss touches the database.
+    """
     token_data = get_token_payload(token)
     if token_data.refresh or token_data.totp:
         # Refresh token is not a valid access token and TOTP True can only be used to validate TOTP
@@ -78,18 +110,37 @@ def get_current_creator(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+    try:
+        revoked, principal = principals.get(token, creator_id=str(token_data.sub), issued=token_data.iat)
+        if revoked:
+            raise get_credentials_exception(detail="Token revoked.", security_scopes=security_scopes)
+        if not principal:
+            creator = crud.creator.get(db, id=token_data.sub)
+            if not creator:
+                raise get_credentials_exception(detail="Creator not found.", security_scopes=security_scopes)
+            principal = schemas.Principal(
+                id=creator.id, is_active=creator.is_active, is_admin=creator.is_admin, scopes=token_data.scopes or []
+            )
+            principals.set(token, principal=principal, expires=token_data.exp)
+    except RedisError:
+        # Revocation cannot be checked, so refuse rather than risk accepting a revoked token
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Authentication unavailable.")
     # Now test for scopes
-    creator = crud.creator.get(db, id=token_data.sub)
-    if not settings.USE_REFRESH_TOKEN:
-        # If not using refresh tokens, need to check that this is a valid token
-        if not models.token.get_by_creator(token=token, creator=creator):
-            creator = None
-    if not creator:
-        raise get_credentials_exception(detail="Creator not found.", security_scopes=security_scopes)
     if security_scopes:
         for scope in security_scopes.scopes:
-            if scope not in token_data.scopes:
+            if scope not in principal.scopes:
                 raise get_credentials_exception(detail="Not enough permissions.", security_scopes=security_scopes)
+    return principal
+
+
+def get_current_creator(
+    db: Annotated[Session, Depends(get_db)],
+    principal: Annotated[schemas.Principal, Depends(get_current_principal)],
+) -> models.Creator:
+    # For routes that need the whole creator; the others should depend on the principal alone
+    creator = crud.creator.get(db, id=principal.id)
+    if not creator:
+        raise get_credentials_exception(detail="Creator not found.")
     return creator
 
 
@@ -156,12 +207,20 @@ def get_current_active_creator(
     return current_creator
 
 
+def get_current_active_principal(
+    principal: Annotated[schemas.Principal, Depends(get_current_principal)],
+) -> schemas.Principal:
+    if not principal.is_active:
+        raise get_credentials_exception(detail="Inactive creator.")
+    return principal
+
+
 def get_current_active_admin(
-    current_creator: Annotated[models.Creator, Depends(get_current_creator)],
-) -> models.Creator:
-    if not crud.creator.is_active(current_creator) or not crud.creator.is_admin(current_creator):
+    principal: Annotated[schemas.Principal, Depends(get_current_principal)],
+) -> schemas.Principal:
+    if not principal.is_active or not principal.is_admin:
         raise get_credentials_exception(detail="Not enough permissions.")
-    return current_creator
+    return principal
 
 
 def get_active_websocket_creator(
@@ -0,0 +1,77 @@
+import argparse
+import logging
+import os
+import statistics
+import time
+
+from passlib.hash import argon2
+
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# OWASP Password Storage Cheat Sheet minimum for Argon2id: 19 MiB of memory, 2 iterations, 1 lane
+MIN_MEMORY_COST = 19456
+MIN_TIME_COST = 2
+MIN_PARALLELISM = 1
+# Memory is the costlier resource for an attacker, so spend the budget there first, up to this cap
+MAX_MEMORY_COST = 262144  # 256 MiB
+
+
+def measure(*, memory_cost: int, time_cost: int, parallelism: int, rounds: int = 5) -> float:
+    """
+    Median seconds to hash a password with these parameters on this host.
+    """
+    hasher = argon2.using(memory_cost=memory_cost, rounds=time_cost, parallelism=parallelism)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hasher.hash("calibration password")
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(
+    *, target: float, workers: int = 0, max_memory_cost: int = MAX_MEMORY_COST, rounds: int = 5
+) -> dict[str, int | float]:
+    """
+    The strongest parameters whose median hash time stays within `target` seconds, never below the
+    OWASP minimums. Lanes are shared out between the hashing workers, so concurrent hashes do not
+    compete for cores. Memory doubles while it fits, then iterations rise with what remains.
+    """
+    workers = workers or settings.HASH_WORKERS
+    parallelism = max(MIN_PARALLELISM, min(4, (os.cpu_count() or 1) // workers))
+    memory_cost, time_cost = MIN_MEMORY_COST, MIN_TIME_COST
+    elapsed = measure(memory_cost=memory_cost, time_cost=time_cost, parallelism=parallelism, rounds=rounds)
+    while memory_cost * 2 <= max_memory_cost:
+        trial = measure(memory_cost=memory_cost * 2, time_cost=time_cost, parallelism=parallelism, rounds=rounds)
+        if trial > target:
+            break
+        memory_cost, elapsed = memory_cost * 2, trial
+    while True:
+        trial = measure(memory_cost=memory_cost, time_cost=time_cost + 1, parallelism=parallelism, rounds=rounds)
+        if trial > target:
+            break
+        time_cost, elapsed = time_cost + 1, trial
+    return {"memory_cost": memory_cost, "time_cost": time_cost, "parallelism": parallelism, "seconds": elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Choose argon2 parameters for this host from a target login latency.")
+    parser.add_argument("--target-ms", type=float, default=250, help="target hash time in milliseconds")
+    parser.add_argument("--workers", type=int, default=0, help="concurrent hashes, default HASH_WORKERS")
+    parser.add_argument("--max-memory-kib", type=int, default=MAX_MEMORY_COST, help="memory cap per hash in KiB")
+    args = parser.parse_args()
+    logger.info("Calibrating argon2 for %s ms", args.target_ms)
+    result = calibrate(target=args.target_ms / 1000, workers=args.workers, max_memory_cost=args.max_memory_kib)
+    if result["seconds"] > args.target_ms / 1000:
+        logger.warning("The OWASP minimum takes %.0f ms on this host, over the target", result["seconds"] * 1000)
+    logger.info("Median hash time %.0f ms. Set in .env:", result["seconds"] * 1000)
+    print(f"HASH_MEMORY_COST={result['memory_cost']}")
+    print(f"HASH_TIME_COST={result['time_cost']}")
+    print(f"HASH_PARALLELISM={result['parallelism']}")
+
+
+if __name__ == "__main__":
+    main()
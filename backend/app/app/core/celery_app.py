@@ -1,5 +1,163 @@
-from celery import Celery
+import os
+import time
+from enum import IntEnum
+from typing import Any
 
-celery_app = Celery("worker", broker="amqp://guest@queue//")
+from celery import Celery, Task
+from celery.schedules import crontab
+from celery.signals import before_task_publish
 
-celery_app.conf.task_routes = {"app.worker.*": "main-queue"}
+from app.core.config import settings
+
+MAIN_QUEUE = "main-queue"  # maintenance, and any task not routed elsewhere
+CPU_QUEUE = "cpu-queue"  # signature verification and document validation: tasks declare `queue=CPU_QUEUE`
+IO_QUEUE = "io-queue"  # fetches and deliveries: every `async_task`
+EMAIL_QUEUE = "email-queue"
+
+
+class TaskPriority(IntEnum):
+    # Lower is taken first. A class never waits behind a less urgent one, however busy
+    interactive = 0  # someone is waiting on it, e.g. a Follow accept or a login email
+    normal = 1
+    bulk = 2  # fan-out and backfills
+    maintenance = 3
+
+
+# Each class spans this many broker priority levels, so an actor's tasks can be demoted within it
+PRIORITY_STEPS = 3
+MAX_PRIORITY = len(TaskPriority) * PRIORITY_STEPS - 1
+_REDIS_BROKER = settings.CELERY_BROKER_URL.startswith(("redis://", "rediss://"))
+
+
+def get_broker_priority(priority: TaskPriority, demotion: int = 0) -> int:
+    """
+    The message priority for a task of this class. RabbitMQ takes the highest number first, Redis
+    the lowest.
+    """
+    step = priority * PRIORITY_STEPS + min(max(demotion, 0), PRIORITY_STEPS - 1)
+    return step if _REDIS_BROKER else MAX_PRIORITY - step
+
+
+class PriorityTask(Task):
+    """
+    Base for every task: declare `priority_class` in the task decorator to set the task's default
+    priority, and its rate limit from `WORKER_RATE_LIMITS`.
+    """
+
+    priority_class = TaskPriority.normal
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.priority_class = TaskPriority(cls.priority_class)
+        cls.priority = get_broker_priority(cls.priority_class)
+        if cls.rate_limit is None:
+            cls.rate_limit = settings.WORKER_RATE_LIMITS.get(cls.priority_class.name)
+
+
+celery_app = Celery("worker", broker=settings.CELERY_BROKER_URL, task_cls=PriorityTask)
+
+celery_app.conf.task_default_priority = get_broker_priority(TaskPriority.normal)
+# Only prefetching one task at a time lets a newly queued urgent task overtake waiting ones
+celery_app.conf.worker_prefetch_multiplier = 1
+if _REDIS_BROKER:
+    celery_app.conf.broker_transport_options = {
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(MAX_PRIORITY + 1)),
+        "sep": ":",
+    }
+else:
+    # RabbitMQ only declares a queue as prioritised when it is created: delete existing queues to apply this
+    celery_app.conf.task_queue_max_priority = MAX_PRIORITY
+celery_app.conf.task_default_queue = MAIN_QUEUE
+celery_app.conf.task_routes = {"app.worker.email.*": {"queue": EMAIL_QUEUE}}
+celery_app.conf.beat_schedule = {
+    "refresh-node-stats": {
+        "task": "app.worker.stats.refresh_node_stats",
+        "schedule": settings.NODE_STATS_REFRESH_SECONDS,
+    },
+    "maintain-activity-partitions": {
+        "task": "app.worker.activity.maintain_activity_partitions",
+        "schedule": crontab(minute=0, hour=3),
+    },
+    "deliver-emails": {
+        "task": "app.worker.email.deliver_emails",
+        "schedule": settings.EMAIL_OUTBOX_POLL_SECONDS,
+    },
+    "purge-email-outbox": {
+        "task": "app.worker.email.purge_email_outbox",
+        "schedule": crontab(minute=30, hour=3),
+    },
+    "refresh-remote-actors": {
+        "task": "app.worker.actor.refresh_remote_actors",
+        "schedule": settings.ACTOR_REFRESH_POLL_SECONDS,
+        # A run still queued when the next is due is dropped rather than refetching the same actors
+        "options": {"expires": settings.ACTOR_REFRESH_POLL_SECONDS},
+    },
+}
+
+
+@before_task_publish.connect
+def stamp_queued_at(headers: dict[str, Any], **kwargs: Any) -> None:
+    # For queue latency, measured when a worker starts the task
+    headers.setdefault("queued_at", time.time())
+
+
+def get_worker_profiles() -> dict[str, dict[str, Any]]:
+    """
+    How each kind of worker consumes: its queues, pool, concurrency and prefetch. CPU-bound work gets a
+    process per core, and coroutine tasks a threads pool whose threads only wait on the event loop, so
+    neither can hold up the other. The `io` threads far outnumber the async pool's connections, so its
+    coroutines take sessions from `runtime.session()`, which holds them to the pool's size; size the pool
+    with `POSTGRES_POOL_SIZE` and `POSTGRES_MAX_OVERFLOW` for the database work they do at once. Beat runs
+    with the `main` worker, so deploy only one of those.
+    """
+    cores = os.cpu_count() or 1
+    return {
+        "main": {"queues": [MAIN_QUEUE], "pool": "prefork", "concurrency": 1, "prefetch": 1, "beat": True},
+        "cpu": {
+            "queues": [CPU_QUEUE],
+            "pool": "prefork",
+            "concurrency": settings.WORKER_CPU_CONCURRENCY or cores,
+            "prefetch": settings.WORKER_CPU_PREFETCH,
+        },
+        "io": {
+            "queues": [IO_QUEUE],
+            "pool": "threads",
+            "concurrency": settings.WORKER_IO_CONCURRENCY,
+            "prefetch": settings.WORKER_IO_PREFETCH,
+        },
+        "email": {
+            "queues": [EMAIL_QUEUE],
+            "pool": "threads",
+            "concurrency": settings.WORKER_EMAIL_CONCURRENCY,
+            "prefetch": settings.WORKER_EMAIL_PREFETCH,
+        },
+        # Every queue in one worker, for development
+        "all": {
+            "queues": [MAIN_QUEUE, CPU_QUEUE, IO_QUEUE, EMAIL_QUEUE],
+            "pool": "threads",
+            "concurrency": cores * 4,
+            "prefetch": 1,
+            "beat": True,
+        },
+    }
+
+
+def get_worker_arguments(profile: str) -> list[str]:
+    """
+    `celery worker` command line options for a profile.
+    """
+    options = get_worker_profiles()[profile]
+    arguments = [
+        "-Q",
+        ",".join(options["queues"]),
+        "-P",
+        options["pool"],
+        "-c",
+        str(options["concurrency"]),
+        "--prefetch-multiplier",
+        str(options["prefetch"]),
+    ]
+    if options.get("beat"):
+        arguments.append("-B")
+    return arguments
@@ -1,5 +1,5 @@
 import secrets
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 from typing_extensions import Self
 
 from pydantic import field_validator, AnyHttpUrl, EmailStr, HttpUrl, PostgresDsn, computed_field, model_validator
@@ -19,10 +19,23 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_SECONDS: int = 0  # access tokens don't expire -- they must be revoked
     REFRESH_TOKEN_EXPIRE_SECONDS: int = 60 * 60 * 24 * 30
     USE_REFRESH_TOKEN: bool = False  # don't use refresh tokens
+    PRINCIPAL_CACHE_SECONDS: int = 300  # how long an authenticated principal is cached in Redis
+    TOKEN_CACHE_SIZE: int = 4096  # decoded tokens kept in process, per worker
+    TOKEN_CACHE_SECONDS: int = 300  # upper bound, or the lifetime of tokens without an expiry
     FORCE_TOTP: bool = True
     JWT_ALGO: str = "HS512"
     TOTP_ALGO: str = "SHA-1"
     HASH_ALGO: List[str] = ["argon2"]
+    # Argon2id cost, to be set per host with `python -m app.calibrate_hashing`. Memory is in KiB.
+    # Stored hashes made with other costs are rehashed on the next successful login.
+    HASH_MEMORY_COST: int = 65536
+    HASH_TIME_COST: int = 3
+    HASH_PARALLELISM: int = 4
+    # Password hashes run on their own pool: at most HASH_WORKERS at once, with HASH_QUEUE_SIZE more waiting
+    # up to HASH_QUEUE_TIMEOUT seconds. Each argon2 hash holds HASH_MEMORY_COST KiB while it runs.
+    HASH_WORKERS: int = 2
+    HASH_QUEUE_SIZE: int = 8
+    HASH_QUEUE_TIMEOUT: float = 2.0
     # BACKEND_CORS_ORIGINS is a JSON-formatted list of origins
     # e.g: '["http://localhost", "http://localhost:4200", "http://localhost:3000", "http://localhost:8080"]'
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
@@ -41,6 +54,16 @@ class Settings(BaseSettings):
 
     # ACTIVITYPUB SETTINGS
     JSONLD_MAX_SIZE: int = 1024 * 50  # 50 KB
+    # Activities are stored in monthly partitions, created this many months ahead of need
+    ACTIVITY_PARTITIONS_AHEAD: int = 2
+    ACTIVITY_RETENTION_MONTHS: int = 0  # whole months kept before the current one, 0 to keep everything
+    # Remote actors fetched longer ago than this are refreshed in the background
+    ACTOR_REFRESH_SECONDS: int = 60 * 60 * 24
+    ACTOR_REFRESH_POLL_SECONDS: int = 300
+    ACTOR_REFRESH_RETRY_SECONDS: int = 60 * 60  # before an actor that could not be fetched is tried again
+    ACTOR_REFRESH_BATCH: int = 500  # actors refetched per run
+    ACTOR_REFRESH_PER_HOST: int = 4  # concurrent requests to any one host
+    ACTOR_REFRESH_ACTIVITY_DAYS: int = 7  # window of received activity that ranks the most active actors first
 
     # NODEINFO 2.1
     SOFTWARE_NAME: str = "fastfedi"
@@ -52,6 +75,11 @@ class Settings(BaseSettings):
     # GENERAL SETTINGS
 
     MULTI_MAX: int = 20
+    NODEINFO_CACHE_SECONDS: int = 60
+    NODE_STATS_REFRESH_SECONDS: int = 3600
+    WORKER_TASK_TIMEOUT: float = 300.0  # a coroutine task still running after this is cancelled
+    WORKER_HTTP_TIMEOUT: float = 10.0
+    WORKER_HTTP_MAX_CONNECTIONS: int = 500  # shared by every coroutine task in a worker process
 
     # COMPONENT SETTINGS
 
@@ -60,6 +88,20 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str = ""
+    # Connections per process are POOL_SIZE + MAX_OVERFLOW, for each of the sync and async engines
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 5
+    POSTGRES_POOL_RECYCLE: int = 1800  # seconds, -1 to never recycle
+    POSTGRES_POOL_TIMEOUT: int = 30  # seconds to wait for a connection before raising
+    POSTGRES_POOL_PRE_PING: bool = True  # replaces connections left stale by a database restart or failover
+    # Read replicas as a JSON-formatted list of "host" or "host:port", e.g: '["db-replica"]'
+    # They use the same user, password and database as the primary
+    POSTGRES_REPLICA_SERVERS: List[str] = []
+    POSTGRES_REPLICA_MAX_LAG: float = 5.0  # seconds of replay lag before a replica is skipped
+    POSTGRES_REPLICA_LAG_CHECK: float = 5.0  # seconds between replica lag checks
+    POSTGRES_STICKY_SECONDS: int = 10  # read-your-writes: a client's reads go to the primary this long after it writes
+    # Transaction pooling behind PgBouncer: no server-side prepared statements, and POOL_SIZE=0 defers pooling to it
+    POSTGRES_PGBOUNCER: bool = False
 
     @computed_field  # type: ignore[misc]
     @property
@@ -73,6 +115,24 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    @computed_field  # type: ignore[misc]
+    @property
+    def SQLALCHEMY_REPLICA_URIS(self) -> list[MultiHostUrl]:
+        uris = []
+        for server in self.POSTGRES_REPLICA_SERVERS:
+            host, _, port = server.partition(":")
+            uris.append(
+                MultiHostUrl.build(
+                    scheme="postgresql+psycopg",
+                    username=self.POSTGRES_USER,
+                    password=self.POSTGRES_PASSWORD,
+                    host=host,
+                    port=int(port) if port else self.POSTGRES_PORT,
+                    path=self.POSTGRES_DB,
+                )
+            )
+        return uris
+
     SMTP_TLS: bool = True
     SMTP_PORT: Optional[int] = None
     SMTP_HOST: Optional[str] = None
@@ -90,6 +150,12 @@ class Settings(BaseSettings):
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
     EMAIL_TEMPLATES_DIR: str = "/app/app/email-templates/build"
+    EMAIL_TEMPLATES_RELOAD: bool = False  # recompile a template when its file changes, for development
+    EMAIL_BATCH_SIZE: int = 50  # messages claimed at a time, all sent over one SMTP connection
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_SECONDS: int = 30  # delay before the first retry, doubling with each failure
+    EMAIL_OUTBOX_POLL_SECONDS: int = 30  # how often the worker drains the outbox without being prompted
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 7  # sent and abandoned messages are then deleted
 
     @computed_field  # type: ignore[misc]
     @property
@@ -105,5 +171,24 @@ class Settings(BaseSettings):
     REDIS_PASSWORD: str
     REDIS_PORT: int = 6379
 
+    # Worker settings
+    # RabbitMQ, or Redis as e.g. "redis://:password@cache:6379/1"
+    CELERY_BROKER_URL: str = "amqp://guest@queue//"
+    # Per worker profile: processes or threads, and tasks reserved per process or thread. 0 for one per core.
+    # I/O threads share one async pool of POSTGRES_POOL_SIZE + POSTGRES_MAX_OVERFLOW, and queue for it in turn
+    WORKER_CPU_CONCURRENCY: int = 0
+    WORKER_CPU_PREFETCH: int = 1
+    WORKER_IO_CONCURRENCY: int = 1000
+    WORKER_IO_PREFETCH: int = 1
+    WORKER_EMAIL_CONCURRENCY: int = 2
+    WORKER_EMAIL_PREFETCH: int = 1
+    # Per task priority class, as JSON: Celery rate limits per task per worker, e.g. '{"bulk": "50/s"}'
+    WORKER_RATE_LIMITS: Dict[str, str] = {}
+    # Per task priority class: seconds a task may wait in its queue before it counts against the SLO
+    WORKER_LATENCY_SLO: Dict[str, float] = {"interactive": 2, "normal": 30, "bulk": 600, "maintenance": 3600}
+    # An actor queueing more tasks than this in a window has its later tasks demoted within their class
+    WORKER_FAIR_SHARE_BURST: int = 100
+    WORKER_FAIR_SHARE_WINDOW: int = 60  # seconds
+
 
 settings = Settings()
@@ -0,0 +1,153 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class HashingRejected(Exception):
+    """
+    The hashing queue is full. Shed the request rather than tie up another server thread.
+    """
+
+    status_code = 429
+    detail = "Too many authentication requests, try again shortly."
+
+
+class HashingTimeout(HashingRejected):
+    """
+    The request waited `HASH_QUEUE_TIMEOUT` seconds without reaching a hashing worker.
+    """
+
+    status_code = 503
+    detail = "Authentication is temporarily unavailable, try again shortly."
+
+
+class HashMetrics:
+    """
+    Counters for the password hashing executor, per process. `wait` is the time queued before a
+    worker picks a hash up, and `duration` the time the hash itself takes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.submitted = 0
+            self.completed = 0
+            self.rejected = 0
+            self.timed_out = 0
+            self.in_flight = 0
+            self.peak_in_flight = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.duration_total = 0.0
+            self.duration_max = 0.0
+
+    def record_submit(self) -> None:
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def record_done(self) -> None:
+        with self._lock:
+            self.in_flight = max(self.in_flight - 1, 0)
+
+    def record_rejected(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def record_timed_out(self) -> None:
+        with self._lock:
+            self.timed_out += 1
+
+    def record_hash(self, *, wait: float, duration: float) -> None:
+        with self._lock:
+            self.completed += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.duration_total += duration
+            self.duration_max = max(self.duration_max, duration)
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "wait_total": self.wait_total,
+                "wait_max": self.wait_max,
+                "wait_avg": self.wait_total / self.completed if self.completed else 0.0,
+                "duration_total": self.duration_total,
+                "duration_max": self.duration_max,
+                "duration_avg": self.duration_total / self.completed if self.completed else 0.0,
+            }
+
+
+class HashExecutor:
+    """
+    A dedicated, bounded pool for password hashing. Argon2 is deliberately slow and memory hard, so
+    a login burst on the shared server threadpool would starve every other sync route. Here at
+    most `workers` hashes run at once and `queue_size` more may wait; beyond that a request is
+    rejected at once, and one that waits longer than `timeout` is abandoned before it starts.
+    """
+
+    def __init__(self, *, workers: int, queue_size: int, timeout: float):
+        self.timeout = timeout
+        self.metrics = HashMetrics()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hashing")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            self.metrics.record_rejected()
+            raise HashingRejected()
+        self.metrics.record_submit()
+        started = threading.Event()
+        submitted = time.perf_counter()
+
+        def timed() -> T:
+            started.set()
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.metrics.record_hash(wait=start - submitted, duration=time.perf_counter() - start)
+                self._release()
+
+        try:
+            future = self._executor.submit(timed)
+        except BaseException:
+            self._release()
+            raise
+        if not started.wait(self.timeout) and future.cancel():
+            # Cancelled before it started, so it will never release its own slot
+            self._release()
+            self.metrics.record_timed_out()
+            raise HashingTimeout()
+        return future.result()
+
+    def _release(self) -> None:
+        self.metrics.record_done()
+        self._slots.release()
+
+
+hashing = HashExecutor(
+    workers=settings.HASH_WORKERS, queue_size=settings.HASH_QUEUE_SIZE, timeout=settings.HASH_QUEUE_TIMEOUT
+)
+
+
+def get_hash_metrics() -> dict[str, Any]:
+    """
+    Password hashing metrics for this process.
+    """
+    return hashing.metrics.as_dict()
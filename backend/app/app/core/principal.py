@@ -0,0 +1,93 @@
+import time
+from typing import Optional
+
+import redis
+
+from app.core.config import settings
+from app.core.security import get_token_hash
+from app.schemas import Principal
+
+_PRINCIPAL_KEY = "principal:{}"
+_CREATOR_KEY = "principal:creator:{}"  # set of the token hashes cached for a creator
+_REVOKED_KEY = "principal:revoked"  # sorted set of revoked token hashes, scored by token expiry
+_REVOKED_BEFORE_KEY = "principal:revoked-before:{}"  # a creator's access tokens issued before this are revoked
+
+
+class PrincipalCache:
+    """
+    Authenticated principals in Redis, keyed by token hash, so an authenticated request costs one
+    pipelined round trip instead of the token and creator queries. Entries live for at most
+    `PRINCIPAL_CACHE_SECONDS`, and are dropped explicitly when a creator is updated or removed.
+    Revoked tokens are kept in a sorted set until they would have expired anyway; tokens without an
+    expiry stay revoked for good. Revoking a creator's session rejects every access token issued to
+    them before then, as these are not tied to the refresh token they came with. Redis errors propagate, so a caller can refuse the request rather
+    than accept a token whose revocation it cannot check.
+    """
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    def get(self, token: str, *, creator_id: str, issued: Optional[float] = None) -> tuple[bool, Optional[Principal]]:
+        """
+        Returns `(revoked, principal)`, where the principal is None if it is not cached. A token without
+        an issue time predates revocation by issue time, so is revoked by any.
+        """
+        key = get_token_hash(token)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zscore(_REVOKED_KEY, key)
+        pipe.get(_REVOKED_BEFORE_KEY.format(creator_id))
+        pipe.get(_PRINCIPAL_KEY.format(key))
+        revoked, revoked_before, cached = pipe.execute()
+        if revoked is not None or (revoked_before is not None and (issued or 0) < float(revoked_before)):
+            return True, None
+        return False, Principal.model_validate_json(cached) if cached else None
+
+    def set(self, token: str, *, principal: Principal, expires: Optional[int] = None) -> None:
+        ttl = settings.PRINCIPAL_CACHE_SECONDS
+        if expires:
+            ttl = min(ttl, int(expires - time.time()))
+        if ttl <= 0:
+            return
+        key = get_token_hash(token)
+        creator_key = _CREATOR_KEY.format(principal.id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(_PRINCIPAL_KEY.format(key), principal.model_dump_json(), ex=ttl)
+        pipe.sadd(creator_key, key)
+        pipe.expire(creator_key, settings.PRINCIPAL_CACHE_SECONDS)
+        pipe.execute()
+
+    def revoke(self, token: str, *, expires: Optional[int] = None) -> None:
+        key = get_token_hash(token)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zadd(_REVOKED_KEY, {key: expires or float("inf")})
+        pipe.delete(_PRINCIPAL_KEY.format(key))
+        # Tokens past their expiry are rejected by the decode, so stop tracking them
+        pipe.zremrangebyscore(_REVOKED_KEY, "-inf", time.time())
+        pipe.execute()
+
+    def revoke_creator(self, creator_id: str) -> None:
+        # Access tokens only expire with refresh tokens in use, so otherwise this is kept for good
+        ttl = settings.ACCESS_TOKEN_EXPIRE_SECONDS if settings.USE_REFRESH_TOKEN else None
+        self.client.set(_REVOKED_BEFORE_KEY.format(creator_id), time.time(), ex=ttl or None)
+        self.invalidate_creator(creator_id)
+
+    def invalidate_creator(self, creator_id: str) -> None:
+        creator_key = _CREATOR_KEY.format(creator_id)
+        keys = self.client.smembers(creator_key)
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.delete(_PRINCIPAL_KEY.format(key))
+        pipe.delete(creator_key)
+        pipe.execute()
+
+
+principals = PrincipalCache(
+    redis.Redis(
+        host=settings.DOCKER_IMAGE_CACHE,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD,
+        socket_timeout=1,
+        socket_connect_timeout=1,
+        decode_responses=True,
+    )
+)
@@ -0,0 +1,131 @@
+import logging
+import time
+from datetime import datetime
+from typing import Any, Optional
+
+import redis
+from celery import Task
+from celery.result import AsyncResult
+from celery.signals import task_prerun
+
+from app.core.celery_app import PRIORITY_STEPS, TaskPriority, get_broker_priority
+from app.core.config import settings
+
+_FAIR_KEY = "scheduling:actor:{}:{}"  # tasks queued for an actor in one window
+_LATENCY_KEY = "scheduling:latency:{}"  # hash of queue latency totals for a priority class
+
+
+class FairShare:
+    """
+    Tasks queued per actor, counted over `WORKER_FAIR_SHARE_WINDOW` seconds across every process.
+    An actor over `WORKER_FAIR_SHARE_BURST` has its further tasks demoted one step within their
+    class, and two steps over ten times that, so a very busy account waits behind everyone else's
+    work of the same class rather than ahead of it.
+    """
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    def get_demotion(self, actor: str) -> int:
+        window = int(time.time() // settings.WORKER_FAIR_SHARE_WINDOW)
+        key = _FAIR_KEY.format(actor, window)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.incr(key)
+            pipe.expire(key, settings.WORKER_FAIR_SHARE_WINDOW)
+            count = pipe.execute()[0]
+        except redis.RedisError as e:
+            # Scheduling falls back to the class priority rather than refusing work
+            logging.warning(f"Fair share unavailable: {e}")
+            return 0
+        demotion, limit = 0, settings.WORKER_FAIR_SHARE_BURST
+        while count > limit and demotion < PRIORITY_STEPS - 1:
+            demotion += 1
+            limit *= 10
+        return demotion
+
+
+class QueueLatency:
+    """
+    Time tasks spend queued, from publish to a worker starting them, per priority class and summed
+    across every worker in Redis. A task waiting longer than its class's `WORKER_LATENCY_SLO` counts
+    as a breach. Totals are kept under `prefix`, so tests can count apart from the workers.
+    """
+
+    def __init__(self, client: redis.Redis, *, prefix: str = ""):
+        self.client = client
+        self.key = prefix + _LATENCY_KEY
+
+    def record(self, priority: TaskPriority, seconds: float) -> None:
+        key = self.key.format(priority.name)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hincrby(key, "count", 1)
+            pipe.hincrbyfloat(key, "total", seconds)
+            if seconds > settings.WORKER_LATENCY_SLO.get(priority.name, float("inf")):
+                pipe.hincrby(key, "breaches", 1)
+            pipe.execute()
+        except redis.RedisError as e:
+            logging.warning(f"Queue latency not recorded: {e}")
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        pipe = self.client.pipeline(transaction=False)
+        for priority in TaskPriority:
+            pipe.hgetall(self.key.format(priority.name))
+        metrics = {}
+        for priority, values in zip(TaskPriority, pipe.execute()):
+            count = int(values.get("count", 0))
+            breaches = int(values.get("breaches", 0))
+            metrics[priority.name] = {
+                "count": count,
+                "latency_avg": float(values.get("total", 0)) / count if count else 0.0,
+                "slo_seconds": settings.WORKER_LATENCY_SLO.get(priority.name),
+                "breaches": breaches,
+                "within_slo": 1 - breaches / count if count else 1.0,
+            }
+        return metrics
+
+    def reset(self) -> None:
+        self.client.delete(*(self.key.format(priority.name) for priority in TaskPriority))
+
+
+_client = redis.Redis(
+    host=settings.DOCKER_IMAGE_CACHE,
+    port=settings.REDIS_PORT,
+    password=settings.REDIS_PASSWORD,
+    socket_timeout=1,
+    socket_connect_timeout=1,
+    decode_responses=True,
+)
+fair_share = FairShare(_client)
+queue_latency = QueueLatency(_client)
+
+
+def dispatch(task: Task, *args: Any, actor: Optional[str] = None, **kwargs: Any) -> AsyncResult:
+    """
+    Queue a task at its class's priority, demoted within the class if `actor` has been busy.
+    """
+    demotion = fair_share.get_demotion(actor) if actor else 0
+    return task.apply_async(args, kwargs, priority=get_broker_priority(task.priority_class, demotion))
+
+
+def get_queue_latency_metrics() -> dict[str, dict[str, Any]]:
+    """
+    Queue latency against the SLO for each priority class, across all workers.
+    """
+    try:
+        return queue_latency.as_dict()
+    except redis.RedisError as e:
+        logging.warning(f"Queue latency unavailable: {e}")
+        return {}
+
+
+@task_prerun.connect
+def record_queue_latency(task: Task, **kwargs: Any) -> None:
+    queued_at = getattr(task.request, "queued_at", None)
+    if queued_at is None:
+        return
+    # A task with an eta or countdown is only due from then
+    if task.request.eta:
+        queued_at = max(queued_at, datetime.fromisoformat(task.request.eta).timestamp())
+    queue_latency.record(getattr(task, "priority_class", TaskPriority.normal), max(time.time() - queued_at, 0.0))
@@ -1,4 +1,8 @@
-from datetime import datetime, timedelta
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from typing import Any, Union, Optional
 
 from fastapi.security import SecurityScopes
@@ -9,7 +13,8 @@ from passlib.exc import TokenError, MalformedTokenError
 import uuid
 
 from app.core.config import settings
-from app.schemas import NewTOTP
+from app.core.hashing import hashing
+from app.schemas import NewTOTP, TokenPayload
 
 """
 https://github.com/OWASP/CheatSheetSeries/blob/master/cheatsheets/Authentication_Cheat_Sheet.md
@@ -18,18 +23,79 @@ https://github.com/OWASP/CheatSheetSeries/blob/master/cheatsheets/Password_Stora
 https://blog.cloudflare.com/ensuring-randomness-with-linuxs-random-number-generator/
 https://passlib.readthedocs.io/en/stable/lib/passlib.pwd.html
 Specifies minimum criteria:
-    - Use Argon2id with a minimum configuration of 15 MiB of memory, an iteration count of 2, and 1 degree of parallelism.
+    - Use Argon2id with a minimum configuration of 19 MiB of memory, an iteration count of 2, and 1 degree of parallelism.
     - Passwords shorter than 8 characters are considered to be weak (NIST SP800-63B).
     - Maximum password length of 64 prevents long password Denial of Service attacks.
     - Do not silently truncate passwords.
     - Allow usage of all characters including unicode and whitespace.
 """
 pwd_context = CryptContext(
-    schemes=settings.HASH_ALGO, deprecated=["auto"]
-)  # current defaults: $argon2id$v=19$m=65536,t=3,p=4, "bcrypt" is deprecated
+    schemes=settings.HASH_ALGO,
+    deprecated=["auto"],
+    argon2__memory_cost=settings.HASH_MEMORY_COST,
+    argon2__rounds=settings.HASH_TIME_COST,
+    argon2__parallelism=settings.HASH_PARALLELISM,
+)  # defaults: $argon2id$v=19$m=65536,t=3,p=4, calibrate per host, "bcrypt" is deprecated
 totp_factory = TOTP.using(secrets={"1": settings.TOTP_SECRET_KEY}, issuer=settings.SERVER_NAME, alg=settings.TOTP_ALGO)
 
 
+def get_token_hash(token: str) -> str:
+    # Never keep raw bearer tokens in a cache
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenPayloadCache:
+    """
+    Verified token payloads, in process, keyed by token hash, so a client reusing its bearer token
+    skips the signature check and validation on every request after the first. Bounded to `maxsize`
+    entries, least recently used first out. An entry lasts until the token's `exp`, or `ttl` seconds
+    for tokens without one. Only the decode is cached: revocation is still checked on every request.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, TokenPayload]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[TokenPayload]:
+        key = get_token_hash(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, token: str, payload: TokenPayload) -> None:
+        expires = time.time() + self.ttl
+        if payload.exp:
+            expires = min(expires, payload.exp)
+        key = get_token_hash(token)
+        with self._lock:
+            self._entries[key] = (expires, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(get_token_hash(token), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenPayloadCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_SECONDS)
+
+
 def create_access_token(
     *,
     subject: Union[str, Any],
@@ -40,10 +106,11 @@ def create_access_token(
     expire = 0
     if settings.USE_REFRESH_TOKEN:
         if expires_delta:
-            expire = datetime.now(datetime.UTC) + expires_delta
+            expire = datetime.now(timezone.utc) + expires_delta
         else:
-            expire = datetime.now(datetime.UTC) + timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS)
-    to_encode = {"sub": str(subject), "totp": force_totp}
+            expire = datetime.now(timezone.utc) + timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS)
+    # Issued at, to the microsecond, so revoking a creator's tokens rejects exactly those issued before it
+    to_encode = {"sub": str(subject), "totp": force_totp, "iat": time.time()}
     if expire:
         to_encode["exp"] = expire
     if security_scopes and security_scopes.scopes:
@@ -56,9 +123,9 @@ def create_refresh_token(
     *, subject: Union[str, Any], expires_delta: timedelta = None, security_scopes: SecurityScopes = SecurityScopes([])
 ) -> str:
     if expires_delta:
-        expire = datetime.now(datetime.UTC) + expires_delta
+        expire = datetime.now(timezone.utc) + expires_delta
     else:
-        expire = datetime.now(datetime.UTC) + timedelta(seconds=settings.REFRESH_TOKEN_EXPIRE_SECONDS)
+        expire = datetime.now(timezone.utc) + timedelta(seconds=settings.REFRESH_TOKEN_EXPIRE_SECONDS)
     to_encode = {"exp": expire, "sub": str(subject), "refresh": True}
     if security_scopes and security_scopes.scopes:
         to_encode["scopes"] = security_scopes.scopes
@@ -68,9 +135,9 @@ def create_refresh_token(
 
 def create_magic_tokens(*, subject: Union[str, Any], expires_delta: timedelta = None) -> list[str]:
     if expires_delta:
-        expire = datetime.now(datetime.UTC) + expires_delta
+        expire = datetime.now(timezone.utc) + expires_delta
     else:
-        expire = datetime.now(datetime.UTC) + timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS)
+        expire = datetime.now(timezone.utc) + timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS)
     fingerprint = str(uuid.uuid4())
     magic_tokens = []
     # First sub is the creator.id, to be emailed. Second is the disposable id.
@@ -110,8 +177,17 @@ def verify_totp(*, token: str, secret: str, last_counter: int = None) -> Union[s
 
 
 def verify_password(*, plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    # Raises HashingRejected when the hashing pool is saturated
+    return hashing.run(pwd_context.verify, plain_password, hashed_password)
+
+
+def verify_and_update_password(*, plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify, and if the stored hash uses outdated parameters, also return a new hash of the password
+    made with the current ones. Both hashes run as one job on the hashing executor.
+    """
+    return hashing.run(pwd_context.verify_and_update, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return hashing.run(pwd_context.hash, password)
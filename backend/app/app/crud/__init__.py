@@ -2,6 +2,10 @@ from .crud_creator import creator  # noqa: F401
 from .crud_token import token  # noqa: F401
 from .crud_actor import actor  # noqa: F401
 from .crud_pub import pub  # noqa: F401
+from .crud_collection import collection  # noqa: F401
+from .crud_stats import stats  # noqa: F401
+from .crud_activity import activity  # noqa: F401
+from .crud_email import email  # noqa: F401
 
 
 # For a new basic set of CRUD operations you could just do
@@ -1,10 +1,16 @@
+import base64
+from datetime import datetime
 from typing import Any, Dict, Generic, Optional, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import ColumnElement, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.db.base_class import Base
+from app.db.types import ULIDType, ulid_floor, validate_ulid
 from app.core.config import settings
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -12,6 +18,20 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+def encode_cursor(key: Any) -> str:
+    """
+    Opaque, URL-safe pagination cursor for the primary key of the last row of a page.
+    """
+    return base64.urlsafe_b64encode(str(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid pagination cursor.")
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
@@ -27,13 +47,58 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         return db.query(self.model).filter(self.model.id == id).first()
 
-    def get_multi(self, db: Session, *, page: int = 0, page_break: bool = False) -> list[ModelType]:
-        db_objs = db.query(self.model)
+    async def aget(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return (await db.scalars(select(self.model).where(self.model.id == id))).first()
+
+    @property
+    def _cursor_key(self) -> Any:
+        # Keyset pagination on the primary key, which is time-ordered for ULIDs
+        return self.model.__mapper__.primary_key[0]
+
+    def _get_cursor_value(self, cursor: str) -> str:
+        value = decode_cursor(cursor)
+        if isinstance(self._cursor_key.type, ULIDType):
+            try:
+                return validate_ulid(value)
+            except ValueError:
+                raise ValueError("Invalid pagination cursor.")
+        return value
+
+    def get_multi(
+        self,
+        db: Session,
+        *,
+        cursor: str = "",
+        since: Optional[datetime] = None,
+        limit: int = 0,
+        page_break: bool = False,
+    ) -> list[ModelType]:
+        """
+        Rows ordered by primary key, starting after the row identified by `cursor`. Every page is
+        a single index range scan, however deep, so never paginate with OFFSET. For ULID keys,
+        `since` limits this to rows created since then, as a range on the same index.
+        """
+        stmt = select(self.model).order_by(self._cursor_key)
+        if cursor:
+            stmt = stmt.where(self._cursor_key > self._get_cursor_value(cursor))
+        if since is not None:
+            stmt = stmt.where(self._cursor_key >= ulid_floor(since))
         if not page_break:
-            if page > 0:
-                db_objs = db_objs.offset(page * settings.MULTI_MAX)
-            db_objs = db_objs.limit(settings.MULTI_MAX)
-        return db_objs.all()
+            stmt = stmt.limit(limit or settings.MULTI_MAX)
+        return list(db.scalars(stmt))
+
+    def get_page(self, db: Session, *, cursor: str = "") -> tuple[list[ModelType], str]:
+        """
+        A page of rows and the cursor for the next page, which is empty on the last page.
+        """
+        # Fetch one extra row to learn whether there is a next page
+        db_objs = self.get_multi(db, cursor=cursor, limit=settings.MULTI_MAX + 1)
+        return db_objs[: settings.MULTI_MAX], self.get_next_cursor(db_objs)
+
+    def get_next_cursor(self, db_objs: list[ModelType]) -> str:
+        if len(db_objs) <= settings.MULTI_MAX:
+            return ""
+        return encode_cursor(getattr(db_objs[settings.MULTI_MAX - 1], self._cursor_key.key))
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
@@ -50,17 +115,44 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
-            update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
+            update_data = obj_in.model_dump(exclude_unset=True)
+        mapper = self.model.__mapper__
+        columns = {k: v for k, v in update_data.items() if k in mapper.column_attrs}
+        db_obj = self.update_columns(db, db_obj=db_obj, values=columns)
+        # Relationships and hybrid properties go through the ORM, as before
+        others = {k: v for k, v in update_data.items() if k not in columns and k in mapper.all_orm_descriptors}
+        if others:
+            for field, value in others.items():
+                setattr(db_obj, field, value)
+            db.add(db_obj)
+            db.commit()
+            db.refresh(db_obj)
+        return db_obj
+
+    def update_columns(
+        self, db: Session, *, db_obj: ModelType, values: Dict[str, Any], where: Optional[ColumnElement] = None
+    ) -> Optional[ModelType]:
+        """
+        A single `UPDATE ... SET ... RETURNING` of only the given columns. The returned row repopulates
+        `db_obj` after the commit, so there is no serialization of the object and no refresh.
+        With `where`, the update is conditional and None is returned if it did not apply.
+        """
+        if not values:
+            return db_obj
+        # The identity is held on the instance, so an expired one is not refreshed just to find its key
+        stmt = update(self.model).where(self._cursor_key == inspect(db_obj).identity[0])
+        if where is not None:
+            stmt = stmt.where(where)
+        stmt = stmt.values(**values).returning(*self.model.__table__.columns)
+        row = db.execute(stmt, execution_options={"synchronize_session": False}).first()
         db.commit()
-        db.refresh(db_obj)
+        if row is None:
+            return None
+        for attr in self.model.__mapper__.column_attrs:
+            set_committed_value(db_obj, attr.key, row._mapping[attr.columns[0]])
         return db_obj
 
     def remove(self, db: Session, *, id: int) -> ModelType:
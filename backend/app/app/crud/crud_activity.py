@@ -0,0 +1,190 @@
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import Select, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ulid import ULID
+
+from app.crud.base import CRUDBase
+from app.core.config import settings
+from app.db.types import new_ulid, ulid_floor, validate_ulid
+from app.models import Activity
+from app.models.activity import PARTITION_NAME, PARTITION_PATTERN
+
+# Documents checked for duplicates and inserted per statement
+_INGEST_BATCH = 1000
+# Concurrent ingests of the same URI are serialised on one of these advisory locks, taken in order so two
+# ingests never deadlock, and bounded so a large ingest never exhausts the lock table
+_INGEST_LOCK_SLOTS = 256
+_INGEST_LOCK = text(
+    """
+    SELECT pg_advisory_xact_lock(hashtext('activity'), slot) FROM (
+        SELECT DISTINCT abs(hashtext(uri) % :slots) AS slot FROM unnest(CAST(:uris AS text[])) AS uri ORDER BY slot
+    ) AS slots
+    """
+)
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    month = moment.year * 12 + moment.month - 1 + months
+    return datetime(month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _get_bound(moment: datetime) -> str:
+    return str(ULID.from_str(ulid_floor(moment)).to_uuid())
+
+
+class CRUDActivity(CRUDBase[Activity, dict, dict]):
+    """
+    Received activities and objects. Lookups by activity, actor, object or reply URI are expression
+    index scans, one per partition, so they stay flat however large the store grows. Partitions are
+    created ahead of need, and retention drops whole months rather than deleting rows.
+    """
+
+    def _get_batches(self, documents: list[dict[str, Any]]) -> list[dict[str, dict]]:
+        # Batches of {URI: document}, the last copy of a URI winning. Documents without an id are never duplicates
+        return [
+            {document.get("id") or new_ulid(): document for document in documents[i : i + _INGEST_BATCH]}
+            for i in range(0, len(documents), _INGEST_BATCH)
+        ]
+
+    def _get_lock_params(self, batches: list[dict[str, dict]]) -> dict[str, Any]:
+        return {"slots": _INGEST_LOCK_SLOTS, "uris": [uri for batch in batches for uri in batch]}
+
+    def _get_existing_statement(self, uris: list[str]) -> Select:
+        return select(self.model.URI).where(self.model.URI.in_(uris))
+
+    def _get_rows(self, batch: dict[str, dict], existing: set[str]) -> list[dict[str, Any]]:
+        return [{"id": new_ulid(), "data": document} for uri, document in batch.items() if uri not in existing]
+
+    def ingest(self, db: Session, *, documents: list[dict[str, Any]]) -> list[str]:
+        """
+        Store many documents, skipping any whose `id` is already stored, as batched multi-row inserts.
+        Returns the ids of the new rows. Held until the commit, the lock on each URI means a concurrent
+        delivery of the same document sees this one as existing rather than inserting it again.
+        """
+        ids = []
+        batches = self._get_batches(documents)
+        db.execute(_INGEST_LOCK, self._get_lock_params(batches))
+        for batch in batches:
+            existing = set(db.scalars(self._get_existing_statement(list(batch))))
+            rows = self._get_rows(batch, existing)
+            if rows:
+                db.connection().execute(insert(self.model), rows)
+                ids.extend(row["id"] for row in rows)
+        db.commit()
+        return ids
+
+    async def aingest(self, db: AsyncSession, *, documents: list[dict[str, Any]]) -> list[str]:
+        ids = []
+        batches = self._get_batches(documents)
+        await db.execute(_INGEST_LOCK, self._get_lock_params(batches))
+        for batch in batches:
+            existing = set(await db.scalars(self._get_existing_statement(list(batch))))
+            rows = self._get_rows(batch, existing)
+            if rows:
+                await db.execute(insert(self.model), rows)
+                ids.extend(row["id"] for row in rows)
+        await db.commit()
+        return ids
+
+    def _get_by_uri_statement(self, uri: str) -> Select:
+        return select(self.model).where(self.model.URI == uri).order_by(self.model.id.desc()).limit(1)
+
+    def get_by_uri(self, db: Session, *, uri: str) -> Optional[Activity]:
+        return db.scalars(self._get_by_uri_statement(uri)).first()
+
+    async def aget_by_uri(self, db: AsyncSession, *, uri: str) -> Optional[Activity]:
+        return (await db.scalars(self._get_by_uri_statement(uri))).first()
+
+    def _get_newest_statement(self, *, where: Any, max_id: str = "", limit: int = 0) -> Select:
+        # Newest first, starting after the max_id cursor, as for collection pages
+        stmt = select(self.model).where(where)
+        if max_id:
+            stmt = stmt.where(self.model.id < validate_ulid(max_id))
+        return stmt.order_by(self.model.id.desc()).limit(limit or settings.MULTI_MAX)
+
+    def _get_newest(self, db: Session, *, where: Any, max_id: str = "", limit: int = 0) -> list[Activity]:
+        return list(db.scalars(self._get_newest_statement(where=where, max_id=max_id, limit=limit)))
+
+    def get_by_actor(self, db: Session, *, uri: str, max_id: str = "", limit: int = 0) -> list[Activity]:
+        return self._get_newest(db, where=self.model.actor == uri, max_id=max_id, limit=limit)
+
+    def get_by_object(self, db: Session, *, uri: str, max_id: str = "", limit: int = 0) -> list[Activity]:
+        return self._get_newest(db, where=self.model.object == uri, max_id=max_id, limit=limit)
+
+    def get_replies(self, db: Session, *, uri: str, max_id: str = "", limit: int = 0) -> list[Activity]:
+        return self._get_newest(db, where=self.model.inReplyTo == uri, max_id=max_id, limit=limit)
+
+    def get_partitions(self, db: Session) -> dict[str, datetime]:
+        """
+        Partition names and the start of the month each holds, oldest first.
+        """
+        stmt = text(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'activity'::regclass
+            """
+        )
+        partitions = {}
+        for name in db.scalars(stmt):
+            match = PARTITION_PATTERN.match(name)
+            if match:
+                partitions[name] = datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+        return dict(sorted(partitions.items(), key=lambda p: p[1]))
+
+    def create_partitions(
+        self, db: Session, *, start: Optional[datetime] = None, months: Optional[int] = None
+    ) -> list[str]:
+        """
+        Create the partition for the month of `start`, default now, and `months` more, default
+        `ACTIVITY_PARTITIONS_AHEAD`, if they do not exist. Returns the names created.
+        """
+        start = _add_months(start or datetime.now(timezone.utc), 0)
+        existing = self.get_partitions(db)
+        created = []
+        if months is None:
+            months = settings.ACTIVITY_PARTITIONS_AHEAD
+        for i in range(1 + months):
+            month = _add_months(start, i)
+            name = PARTITION_NAME.format(month)
+            if name in existing:
+                continue
+            db.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF activity "
+                    f"FOR VALUES FROM ('{_get_bound(month)}') TO ('{_get_bound(_add_months(month, 1))}')"
+                )
+            )
+            created.append(name)
+        db.commit()
+        return created
+
+    def drop_partitions(self, db: Session, *, before: datetime) -> list[str]:
+        """
+        Drop every partition that ends on or before the start of the month of `before`. Returns the names dropped.
+        """
+        before = _add_months(before, 0)
+        dropped = []
+        for name, month in self.get_partitions(db).items():
+            if month < before:
+                db.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+        db.commit()
+        return dropped
+
+    def maintain_partitions(self, db: Session) -> dict[str, list[str]]:
+        """
+        Create the coming months' partitions, and drop those past `ACTIVITY_RETENTION_MONTHS`, if set.
+        """
+        maintained = {"created": self.create_partitions(db), "dropped": []}
+        if settings.ACTIVITY_RETENTION_MONTHS:
+            before = _add_months(datetime.now(timezone.utc), -settings.ACTIVITY_RETENTION_MONTHS)
+            maintained["dropped"] = self.drop_partitions(db, before=before)
+        return maintained
+
+
+activity = CRUDActivity(Activity)
@@ -1,3 +1,11 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import case, func, select, tuple_, update, Row, Select
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.encoders import jsonable_encoder
 from fastapi import Request
@@ -7,13 +15,20 @@ import secrets
 import json
 
 from app.crud.base import CRUDBase
+from app.db.types import new_ulid, ulid_floor
 from app.core.config import settings
 from app.utilities import regex
-from app.models import Actor
-from app.schemas import activitypubdantic, ActorLocalCreate, ActorLocalUpdate
+from app.models import Activity, Actor
+from app.schemas import activitypubdantic, ActorLocalCreate, ActorLocalUpdate, ActorRemoteCreate
 from app.schema_types import ActorType
 
-# from app.core.config import settings
+# Postgres allows at most 65535 bind parameters in one statement
+_MAX_PARAMETERS = 65535
+_REMOTE_EXCLUDE = {"id", "created", "modified", "fetched", "creator_id", "privateKey"}
+# Stale actors considered per refresh, as a multiple of those refreshed
+_REFRESH_CANDIDATES = 4
+
+logger = logging.getLogger(__name__)
 
 
 class CRUDActor(CRUDBase[Actor, ActorLocalCreate, ActorLocalUpdate]):
@@ -22,8 +37,135 @@ class CRUDActor(CRUDBase[Actor, ActorLocalCreate, ActorLocalUpdate]):
             obj_in = ActorLocalCreate(**obj_in)
         return super().create(db, obj_in=obj_in)
 
+    def upsert_remote(self, db: Session, *, obj_in: list[ActorRemoteCreate | dict[str, Any]]) -> list[Row]:
+        """
+        Insert or refresh many remote actors, keyed on `URI`, in as few statements as the parameter
+        limit allows, returning `(id, URI)` for each distinct URI in input order. Only the supplied columns are
+        written, `fetched` is always bumped and any retry cleared, and `modified` only moves if something
+        actually changed.
+
+        Only a `URI` conflict is absorbed. A row that collides with a different actor on another unique
+        key, e.g. a reused `preferredUsername` on the same domain, is skipped and left out of the result.
+        """
+        # A statement may not touch the same row twice, so the last copy of a URI wins
+        rows = {}
+        for actor_in in obj_in:
+            if isinstance(actor_in, dict):
+                actor_in = ActorRemoteCreate(**actor_in)
+            data = actor_in.model_dump(mode="json", exclude_unset=True, exclude=_REMOTE_EXCLUDE)
+            data["URI"] = str(actor_in.URI)
+            data["type"] = actor_in.type
+            rows[data["URI"]] = data
+        # Rows supplying the same columns share a statement
+        groups = {}
+        for data in rows.values():
+            data["id"] = new_ulid()
+            groups.setdefault(tuple(sorted(data)), []).append(data)
+        db_objs = {}
+        for columns, group in groups.items():
+            stmt = insert(self.model)
+            updated = [c for c in columns if c not in ("id", "URI")]
+            changed = tuple_(*[self.model.__table__.c[c] for c in updated]).is_distinct_from(
+                tuple_(*[stmt.excluded[c] for c in updated])
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[self.model.URI],
+                set_={
+                    **{c: stmt.excluded[c] for c in updated},
+                    "fetched": func.now(),
+                    "retry_after": None,
+                    "modified": case((changed, func.now()), else_=self.model.modified),
+                },
+            ).returning(self.model.id, self.model.URI)
+            result = self._upsert_remote_batch(db, stmt=stmt, batch=group, page_size=_MAX_PARAMETERS // len(columns))
+            db_objs.update({row.URI: row for row in result})
+        db.commit()
+        return [db_objs[uri] for uri in rows if uri in db_objs]
+
+    def _upsert_remote_batch(self, db: Session, *, stmt: Insert, batch: list[dict], page_size: int) -> list[Row]:
+        # Batched into multi-row VALUES statements; returned rows are matched back on URI, not position
+        try:
+            with db.begin_nested():
+                return list(
+                    db.connection().execute(stmt, batch, execution_options={"insertmanyvalues_page_size": page_size})
+                )
+        except IntegrityError as e:
+            # A conflict on any other unique key fails the whole statement, so halve until it is isolated
+            if len(batch) == 1:
+                logger.warning(f"Remote actor {batch[0]['URI']} not upserted: {e.orig}")
+                return []
+            middle = len(batch) // 2
+            head = self._upsert_remote_batch(db, stmt=stmt, batch=batch[:middle], page_size=page_size)
+            return head + self._upsert_remote_batch(db, stmt=stmt, batch=batch[middle:], page_size=page_size)
+
+    def get_stale_remote(self, db: Session, *, limit: int = 0) -> list[Row]:
+        """
+        Remote actors due a refresh, as `(id, URI, etag, last_modified)`. The longest unfetched are
+        considered first, and of those the ones with the most activity received recently go first,
+        so busy accounts' keys and inboxes are refreshed ahead of dormant ones. An actor that could not
+        be fetched waits until its `retry_after`.
+        """
+        limit = limit or settings.ACTOR_REFRESH_BATCH
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.ACTOR_REFRESH_SECONDS)
+        candidates = (
+            select(self.model.id, self.model.URI, self.model.etag, self.model.last_modified, self.model.fetched)
+            .where(
+                self.model.privateKey.is_(None),
+                (self.model.fetched < stale) | self.model.fetched.is_(None),
+                (self.model.retry_after <= now) | self.model.retry_after.is_(None),
+            )
+            .order_by(self.model.fetched.asc().nulls_first())
+            .limit(limit * _REFRESH_CANDIDATES)
+            .subquery()
+        )
+        # Counted from the activity index on (actor, id), within the recent partitions only
+        since = ulid_floor(now - timedelta(days=settings.ACTOR_REFRESH_ACTIVITY_DAYS))
+        volume = (
+            select(func.count())
+            .where(Activity.actor == candidates.c.URI, Activity.id >= since)
+            .correlate(candidates)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(candidates.c.id, candidates.c.URI, candidates.c.etag, candidates.c.last_modified)
+            .order_by(volume.desc(), candidates.c.fetched.asc().nulls_first())
+            .limit(limit)
+        )
+        return list(db.execute(stmt))
+
+    def record_fetched(self, db: Session, *, ids: list[str]) -> None:
+        """
+        Bump `fetched` for actors the remote reports unchanged, so they wait out another interval
+        before being refetched.
+        """
+        if not ids:
+            return
+        # `modified` is set to itself, or its `onupdate` would move it
+        db.execute(
+            update(self.model)
+            .where(self.model.id.in_(ids))
+            .values(fetched=func.now(), retry_after=None, modified=self.model.modified)
+        )
+        db.commit()
+
+    def record_failed(self, db: Session, *, ids: list[str]) -> None:
+        """
+        Defer actors that could not be fetched for `ACTOR_REFRESH_RETRY_SECONDS`. `fetched` is left as
+        it was, so it still dates the copy stored.
+        """
+        if not ids:
+            return
+        retry_after = datetime.now(timezone.utc) + timedelta(seconds=settings.ACTOR_REFRESH_RETRY_SECONDS)
+        db.execute(
+            update(self.model)
+            .where(self.model.id.in_(ids))
+            .values(retry_after=retry_after, modified=self.model.modified)
+        )
+        db.commit()
+
     # Mostly for locals ...
-    def get_by_name(self, *, db: Session, preferredUsername: str, actortype: ActorType | str) -> Actor:
+    def _get_by_name_statement(self, *, preferredUsername: str, actortype: ActorType | str) -> Select | None:
         if isinstance(actortype, str):
             try:
                 actortype = ActorType(actortype)
@@ -31,12 +173,28 @@ class CRUDActor(CRUDBase[Actor, ActorLocalCreate, ActorLocalUpdate]):
                 return None
         if not regex.matches(regex.actornameStrict, preferredUsername):
             return None
-        return (
-            db.query(self.model)
-            .filter((self.model.preferredUsername == preferredUsername) & (self.model.type == actortype))
-            .first()
+        return select(self.model).where(
+            (self.model.preferredUsername == preferredUsername) & (self.model.type == actortype)
         )
 
+    def get_by_name(self, *, db: Session, preferredUsername: str, actortype: ActorType | str) -> Actor:
+        stmt = self._get_by_name_statement(preferredUsername=preferredUsername, actortype=actortype)
+        if stmt is None:
+            return None
+        return db.scalars(stmt).first()
+
+    async def aget_by_name(self, *, db: AsyncSession, preferredUsername: str, actortype: ActorType | str) -> Actor:
+        stmt = self._get_by_name_statement(preferredUsername=preferredUsername, actortype=actortype)
+        if stmt is None:
+            return None
+        return (await db.scalars(stmt)).first()
+
+    def get_inbox_by_uri(self, db: Session, *, uri: str) -> Row | None:
+        """
+        Resolve an actor URI to its `inbox` and `sharedInbox` for delivery, from the URI index alone.
+        """
+        return db.execute(select(self.model.inbox, self.model.sharedInbox).where(self.model.URI == uri)).first()
+
     def _get_actor_id(self, *, db_obj: Actor):
         return f"https://{db_obj.domain}/{db_obj.preferredUsername}"
 
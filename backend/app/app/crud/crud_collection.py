@@ -0,0 +1,118 @@
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.crud.base import CRUDBase
+from app.core.config import settings
+from app.db.types import validate_ulid
+from app.models import Collection, CollectionItem
+from app.schemas import activitypubdantic, CollectionCreate, CollectionUpdate
+
+
+class CRUDCollection(CRUDBase[Collection, CollectionCreate, CollectionUpdate]):
+    """
+    Persistent collections. Items are append-only rows ordered by their ULID, and `totalItems` is
+    maintained on every change, so adding, removing and rendering a page are all index lookups
+    and the collection is never loaded into memory.
+    """
+
+    def get_by_uri(self, db: Session, *, uri: str) -> Optional[Collection]:
+        return db.query(self.model).filter(self.model.URI == uri).first()
+
+    def get_or_create(self, db: Session, *, obj_in: CollectionCreate) -> Collection:
+        stmt = (
+            insert(self.model)
+            .values(**obj_in.model_dump(mode="json"))
+            .on_conflict_do_nothing(index_elements=[self.model.URI])
+        )
+        db.execute(stmt)
+        db.commit()
+        return self.get_by_uri(db, uri=obj_in.URI)
+
+    def add_item(self, db: Session, *, db_obj: Collection, item: str) -> bool:
+        """
+        Append an item URI. Returns False if it is already in the collection.
+        """
+        stmt = (
+            insert(CollectionItem)
+            .values(collection_id=db_obj.id, object=item)
+            .on_conflict_do_nothing(index_elements=[CollectionItem.collection_id, CollectionItem.object])
+            .returning(CollectionItem.id)
+        )
+        added = db.execute(stmt).scalar_one_or_none() is not None
+        if added:
+            self._update_total(db, db_obj=db_obj, change=1)
+        db.commit()
+        return added
+
+    def remove_item(self, db: Session, *, db_obj: Collection, item: str) -> bool:
+        """
+        Remove an item URI. Returns False if it was not in the collection.
+        """
+        stmt = (
+            delete(CollectionItem)
+            .where((CollectionItem.collection_id == db_obj.id) & (CollectionItem.object == item))
+            .returning(CollectionItem.id)
+        )
+        removed = db.execute(stmt).scalar_one_or_none() is not None
+        if removed:
+            self._update_total(db, db_obj=db_obj, change=-1)
+        db.commit()
+        return removed
+
+    def _update_total(self, db: Session, *, db_obj: Collection, change: int) -> None:
+        stmt = (
+            update(self.model)
+            .where(self.model.id == db_obj.id)
+            .values(totalItems=self.model.totalItems + change)
+            .returning(self.model.totalItems)
+        )
+        total = db.execute(stmt).scalar_one()
+        # Keep the loaded object consistent without a refresh, or marking it changed for the next flush
+        set_committed_value(db_obj, "totalItems", total)
+
+    def get_items(self, db: Session, *, db_obj: Collection, max_id: str = "", limit: int = 0) -> list[CollectionItem]:
+        """
+        Newest first, starting after the max_id cursor, i.e. the id of the last item of the previous page.
+        """
+        stmt = select(CollectionItem).where(CollectionItem.collection_id == db_obj.id)
+        if max_id:
+            stmt = stmt.where(CollectionItem.id < validate_ulid(max_id))
+        stmt = stmt.order_by(CollectionItem.id.desc()).limit(limit or settings.MULTI_MAX)
+        return list(db.scalars(stmt))
+
+    def get_collection_document(self, *, db_obj: Optional[Collection], uri: str) -> dict:
+        ordered = db_obj.ordered if db_obj else True
+        return activitypubdantic.get_model_data(
+            {
+                "id": uri,
+                "type": "OrderedCollection" if ordered else "Collection",
+                "totalItems": db_obj.totalItems if db_obj else 0,
+                "first": f"{uri}?page=true",
+            },
+            verbose=False,
+            output_json=True,
+        )
+
+    def get_page_document(self, db: Session, *, db_obj: Optional[Collection], uri: str, max_id: str = "") -> dict:
+        items = []
+        if db_obj:
+            # Fetch one extra row to learn whether there is a next page
+            items = self.get_items(db, db_obj=db_obj, max_id=max_id, limit=settings.MULTI_MAX + 1)
+        ordered = db_obj.ordered if db_obj else True
+        page = {
+            "id": f"{uri}?page=true&max_id={max_id}" if max_id else f"{uri}?page=true",
+            "type": "OrderedCollectionPage" if ordered else "CollectionPage",
+            "partOf": uri,
+            "totalItems": db_obj.totalItems if db_obj else 0,
+            "orderedItems" if ordered else "items": [i.object for i in items[: settings.MULTI_MAX]],
+        }
+        if len(items) > settings.MULTI_MAX:
+            page["next"] = f"{uri}?page=true&max_id={items[settings.MULTI_MAX - 1].id}"
+        return activitypubdantic.get_model_data(page, verbose=False, output_json=True)
+
+
+collection = CRUDCollection(Collection)
@@ -1,13 +1,18 @@
+import logging
 from typing import Any, Dict, Optional, Union
 
+from redis import RedisError
 from sqlalchemy.orm import Session
 
-from app.core.security import get_password_hash, verify_password
+from app.core.principal import principals
+from app.core.security import get_password_hash, verify_and_update_password
 from app.crud.base import CRUDBase
 from app.models.creator import Creator
-from app.schemas.creator import CreatorCreate, CreatorInDB, CreatorUpdate
+from app.schemas.creator import CreatorCreate, CreatorUpdate
 from app.schemas.totp import NewTOTP
 
+logger = logging.getLogger(__name__)
+
 
 class CRUDCreator(CRUDBase[Creator, CreatorCreate, CreatorUpdate]):
     def get_by_email(self, db: Session, *, email: str) -> Optional[Creator]:
@@ -35,39 +40,58 @@ class CRUDCreator(CRUDBase[Creator, CreatorCreate, CreatorUpdate]):
             update_data["hashed_password"] = hashed_password
         if update_data.get("email") and db_obj.email != update_data["email"]:
             update_data["email_validated"] = False
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        db_obj = super().update(db, db_obj=db_obj, obj_in=update_data)
+        self._invalidate_principals(db_obj.id)
+        return db_obj
+
+    def remove(self, db: Session, *, id: str) -> Creator:
+        db_obj = super().remove(db, id=id)
+        self._invalidate_principals(id)
+        return db_obj
+
+    def _invalidate_principals(self, creator_id: str) -> None:
+        # Cached principals expire within PRINCIPAL_CACHE_SECONDS regardless, so a failure here only delays the change
+        try:
+            principals.invalidate_creator(creator_id)
+        except RedisError as e:
+            logger.warning("Could not invalidate cached principals for creator %s: %s", creator_id, e)
 
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[Creator]:
         creator = self.get_by_email(db, email=email)
         if not creator:
             return None
-        if not verify_password(plain_password=password, hashed_password=creator.hashed_password):
+        verified, new_hash = verify_and_update_password(
+            plain_password=password, hashed_password=creator.hashed_password
+        )
+        if not verified:
             return None
+        if new_hash:
+            # Hashed with outdated parameters, so store the hash made with the current ones
+            creator = self.update_columns(db, db_obj=creator, values={"hashed_password": new_hash})
         return creator
 
     def validate_email(self, db: Session, *, db_obj: Creator) -> Creator:
-        obj_in = CreatorUpdate(**CreatorInDB.model_validate(db_obj).model_dump())
-        obj_in.email_validated = True
-        return self.update(db=db, db_obj=db_obj, obj_in=obj_in)
+        return self.update_columns(db, db_obj=db_obj, values={"email_validated": True})
 
-    def activate_totp(self, db: Session, *, db_obj: Creator, totp_in: NewTOTP) -> Creator:
-        obj_in = CreatorUpdate(**CreatorInDB.model_validate(db_obj).model_dump())
-        obj_in = obj_in.model_dump(exclude_unset=True)
-        obj_in["totp_secret"] = totp_in.secret
-        return self.update(db=db, db_obj=db_obj, obj_in=obj_in)
+    def activate_totp(
+        self, db: Session, *, db_obj: Creator, totp_in: NewTOTP, new_counter: Optional[int] = None
+    ) -> Creator:
+        values = {"totp_secret": totp_in.secret, "totp_counter": new_counter}
+        return self.update_columns(db, db_obj=db_obj, values=values)
 
     def deactivate_totp(self, db: Session, *, db_obj: Creator) -> Creator:
-        obj_in = CreatorUpdate(**CreatorInDB.model_validate(db_obj).model_dump())
-        obj_in = obj_in.model_dump(exclude_unset=True)
-        obj_in["totp_secret"] = None
-        obj_in["totp_counter"] = None
-        return self.update(db=db, db_obj=db_obj, obj_in=obj_in)
-
-    def update_totp_counter(self, db: Session, *, db_obj: Creator, new_counter: int) -> Creator:
-        obj_in = CreatorUpdate(**CreatorInDB.model_validate(db_obj).model_dump())
-        obj_in = obj_in.model_dump(exclude_unset=True)
-        obj_in["totp_counter"] = new_counter
-        return self.update(db=db, db_obj=db_obj, obj_in=obj_in)
+        return self.update_columns(db, db_obj=db_obj, values={"totp_secret": None, "totp_counter": None})
+
+    def update_totp_counter(self, db: Session, *, db_obj: Creator, new_counter: int) -> Optional[Creator]:
+        """
+        Only moves the counter forward, so a TOTP replayed concurrently is rejected by returning None.
+        """
+        return self.update_columns(
+            db,
+            db_obj=db_obj,
+            values={"totp_counter": new_counter},
+            where=(Creator.totp_counter.is_(None) | (Creator.totp_counter < new_counter)),
+        )
 
     def toggle_creator_state(self, db: Session, *, obj_in: Union[CreatorUpdate, Dict[str, Any]]) -> Creator:
         db_obj = self.get_by_email(db, email=obj_in.email)
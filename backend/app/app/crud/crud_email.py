@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.core.config import settings
+from app.models import OutboxEmail
+
+
+class CRUDEmail(CRUDBase[OutboxEmail, dict, dict]):
+    """
+    The email outbox, as drained by the worker. Requests only add rendered messages, through
+    `send_email`. Pending ones are claimed most urgent first, with `SKIP LOCKED` so concurrent drains
+    never send a message twice, and a claim holds its rows until the attempt's result is committed.
+    """
+
+    def claim(self, db: Session, *, limit: int = 0) -> list[OutboxEmail]:
+        stmt = (
+            select(self.model)
+            .where(
+                self.model.sent.is_(None),
+                self.model.attempts < settings.EMAIL_MAX_ATTEMPTS,
+                self.model.next_attempt <= func.now(),
+            )
+            .order_by(self.model.priority, self.model.next_attempt)
+            .limit(limit or settings.EMAIL_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        return list(db.scalars(stmt))
+
+    def record_sent(self, *, db_obj: OutboxEmail) -> None:
+        db_obj.sent = datetime.now(timezone.utc)
+        db_obj.error = None
+
+    def record_failed(self, *, db_obj: OutboxEmail, error: str) -> None:
+        db_obj.error = error
+        db_obj.next_attempt = datetime.now(timezone.utc) + timedelta(
+            seconds=settings.EMAIL_RETRY_SECONDS * 2**db_obj.attempts
+        )
+        db_obj.attempts += 1
+
+    def purge(self, db: Session, *, before: Optional[datetime] = None) -> int:
+        """
+        Delete messages sent, or abandoned after their last attempt, before `before`.
+        """
+        if not before:
+            before = datetime.now(timezone.utc) - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+        stmt = delete(self.model).where(
+            or_(
+                self.model.sent < before,
+                (self.model.attempts >= settings.EMAIL_MAX_ATTEMPTS) & (self.model.created < before),
+            )
+        )
+        count = db.execute(stmt).rowcount
+        db.commit()
+        return count
+
+
+email = CRUDEmail(OutboxEmail)
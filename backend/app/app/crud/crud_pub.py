@@ -1,14 +1,17 @@
+from sqlalchemy import select, Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.encoders import jsonable_encoder
 from fastapi import Request
 import bovine
 from bovine.crypto.types import CryptographicIdentifier
 import secrets
-from datetime import date, timedelta
 
 # from app.crud.base import CRUDBase
 from app.core.config import settings
+from app.crud.crud_stats import stats
 from app.models import Actor
+from app.schema_types import NodeStatType
 from app.schemas import activitypubdantic, NodeInfo
 from app.utilities import regex
 
@@ -18,20 +21,39 @@ from app.utilities import regex
 
 class CRUDActivityPub:
 
-    def get_actor_by_resource(self, *, db: Session, resource: str) -> Actor:
+    def _get_actor_by_resource_statement(self, *, resource: str, columns: tuple = ()) -> Select | None:
+        stmt = select(*columns) if columns else select(Actor)
         # Check if the resource encapsulates a webfinger query
         preferredUsername, domain = bovine.utils.parse_fediverse_handle(resource)
         if preferredUsername and domain:
-            return (
-                db.query(Actor)
-                .filter((Actor.preferredUsername == preferredUsername) & (Actor.domain == domain))
-                .first()
-            )
+            return stmt.where((Actor.preferredUsername == preferredUsername) & (Actor.domain == domain))
         # Check if the resource is the actor URL
         if regex.url_validates(resource):
-            return db.query(Actor).filter(Actor.URL == resource).first()
+            return stmt.where(Actor.URL == resource)
         return None
 
+    def get_actor_by_resource(self, *, db: Session, resource: str) -> Actor:
+        stmt = self._get_actor_by_resource_statement(resource=resource)
+        if stmt is None:
+            return None
+        return db.scalars(stmt).first()
+
+    def get_webfinger_by_resource(self, *, db: Session, resource: str) -> Row | None:
+        """
+        Only the columns webfinger needs, all held in the lookup indexes, so this never reads the table.
+        """
+        columns = (Actor.preferredUsername, Actor.domain, Actor.URI)
+        stmt = self._get_actor_by_resource_statement(resource=resource, columns=columns)
+        if stmt is None:
+            return None
+        return db.execute(stmt).first()
+
+    async def aget_actor_by_resource(self, *, db: AsyncSession, resource: str) -> Actor:
+        stmt = self._get_actor_by_resource_statement(resource=resource)
+        if stmt is None:
+            return None
+        return (await db.scalars(stmt)).first()
+
     def _make_requests_id(self, *, db_obj: Actor):
         return f"{db_obj.domain}{secrets.token_urlsafe(6)}"
 
@@ -86,7 +108,7 @@ class CRUDActivityPub:
             secret=db_obj.privateKey,
         )
 
-    def get_wellknown_webfinger(self, *, db_obj: Actor):
+    def get_wellknown_webfinger(self, *, db_obj: Actor | Row):
         return bovine.utils.webfinger_response_json(f"acct:{db_obj.preferredUsername}@{db_obj.domain}", db_obj.URI)
 
     def get_wellknown_actor(self, *, db_obj: Actor):
@@ -101,16 +123,15 @@ class CRUDActivityPub:
         ).build()
 
     def get_wellknown_nodeinfo(self, *, db: Session) -> NodeInfo:
-        # Get usage and return defaults
-        activeMonth = date.today() - timedelta(30)
-        activeHalf = date.today() - timedelta(180)
+        # Usage comes from the maintained counters, never from counting tables
+        values = stats.get_all(db)
         usage = {
             "users": {
-                "total": db.query(Actor).count(),
-                "activeMonth": db.query(Actor).filter(Actor.fetched >= activeMonth).count(),
-                "activeHalfyear": db.query(Actor).filter(Actor.fetched >= activeHalf).count(),
+                "total": values[NodeStatType.users_total.value],
+                "activeMonth": values[NodeStatType.users_active_month.value],
+                "activeHalfyear": values[NodeStatType.users_active_halfyear.value],
             },
-            "localPosts": 0,
+            "localPosts": values[NodeStatType.local_posts.value],
         }
         return NodeInfo(**{"usage": usage})
 
@@ -0,0 +1,66 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Actor, Collection, CollectionItem, NodeStat
+from app.schema_types import NodeStatType
+
+
+class CRUDNodeStats:
+    """
+    Server counters for NodeInfo. Reading them is a primary key lookup on a handful of rows, cached
+    in process for `NODEINFO_CACHE_SECONDS`, so crawlers never cause a table scan. Only `refresh`
+    counts anything, and it runs as a periodic worker job.
+    """
+
+    def __init__(self) -> None:
+        self._cache: dict[str, int] = {}
+        self._expires = 0.0
+
+    def get_all(self, db: Session) -> dict[str, int]:
+        if self._cache and time.monotonic() < self._expires:
+            return self._cache
+        stats = {stat.value: 0 for stat in NodeStatType}
+        stats.update(db.execute(select(NodeStat.name, NodeStat.value)).tuples().all())
+        self._cache = stats
+        self._expires = time.monotonic() + settings.NODEINFO_CACHE_SECONDS
+        return stats
+
+    def clear_cache(self) -> None:
+        self._cache = {}
+
+    def refresh(self, db: Session) -> dict[str, int]:
+        """
+        Recount everything: the rolling activity windows, and the trigger-maintained totals to correct any drift.
+        """
+        now = datetime.now(timezone.utc)
+        local = Actor.creator_id.is_not(None)
+        actors = select(func.count()).select_from(Actor).where(local)
+        posts = (
+            select(func.count())
+            .select_from(CollectionItem)
+            .join(Collection, Collection.id == CollectionItem.collection_id)
+            .join(Actor, Actor.id == Collection.actor_id)
+            .where(local & (Collection.URI == Actor.outbox))
+        )
+        values = {
+            NodeStatType.users_total.value: db.scalar(actors),
+            NodeStatType.users_active_month.value: db.scalar(actors.where(Actor.fetched >= now - timedelta(30))),
+            NodeStatType.users_active_halfyear.value: db.scalar(actors.where(Actor.fetched >= now - timedelta(180))),
+            NodeStatType.local_posts.value: db.scalar(posts),
+        }
+        stmt = insert(NodeStat).values([{"name": name, "value": value} for name, value in values.items()])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[NodeStat.name], set_={"value": stmt.excluded.value, "modified": func.now()}
+        )
+        db.execute(stmt)
+        db.commit()
+        self.clear_cache()
+        return values
+
+
+stats = CRUDNodeStats()
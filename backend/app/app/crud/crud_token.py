@@ -1,10 +1,15 @@
 from __future__ import annotations
+import jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.crud.base import CRUDBase
+from app.crud.base import CRUDBase, decode_cursor
 from app.models import Creator, Token
 from app.schemas import TokenCreate, TokenUpdate
 from app.core.config import settings
+from app.core.principal import principals
+from app.core.security import token_cache
 
 
 class CRUDToken(CRUDBase[Token, TokenCreate, TokenUpdate]):
@@ -19,18 +24,38 @@ class CRUDToken(CRUDBase[Token, TokenCreate, TokenUpdate]):
     def get(self, db: Session, token: str) -> Token:
         return db.query(self.model).filter(self.model.token == token).first()
 
+    async def aget(self, db: AsyncSession, token: str) -> Token:
+        return (await db.scalars(select(self.model).where(self.model.token == token))).first()
+
     def get_by_creator(self, *, creator: Creator, token: str) -> Token:
         return creator.tokens.filter(self.model.token == token).first()
 
-    def get_multi(self, *, creator: Creator, page: int = 0, page_break: bool = False) -> list[Token]:
-        db_objs = creator.tokens
+    async def aget_by_creator(self, db: AsyncSession, *, creator: Creator, token: str) -> Token:
+        # The dynamic relationship on Creator is sync-only, so query the token directly
+        stmt = select(self.model).where((self.model.authenticates_id == creator.id) & (self.model.token == token))
+        return (await db.scalars(stmt)).first()
+
+    def get_multi_by_creator(
+        self, *, creator: Creator, cursor: str = "", limit: int = 0, page_break: bool = False
+    ) -> list[Token]:
+        db_objs = creator.tokens.order_by(self.model.token)
+        if cursor:
+            db_objs = db_objs.filter(self.model.token > decode_cursor(cursor))
         if not page_break:
-            if page > 0:
-                db_objs = db_objs.offset(page * settings.MULTI_MAX)
-            db_objs = db_objs.limit(settings.MULTI_MAX)
+            db_objs = db_objs.limit(limit or settings.MULTI_MAX)
         return db_objs.all()
 
+    def get_page_by_creator(self, *, creator: Creator, cursor: str = "") -> tuple[list[Token], str]:
+        db_objs = self.get_multi_by_creator(creator=creator, cursor=cursor, limit=settings.MULTI_MAX + 1)
+        return db_objs[: settings.MULTI_MAX], self.get_next_cursor(db_objs)
+
     def remove(self, db: Session, *, db_obj: Token) -> None:
+        # Revoke as well as delete, so neither this refresh token nor the access tokens issued with it
+        # are accepted again, cached principal or not
+        expires = jwt.decode(db_obj.token, options={"verify_signature": False}).get("exp")
+        principals.revoke(db_obj.token, expires=expires)
+        principals.revoke_creator(db_obj.authenticates_id)
+        token_cache.discard(db_obj.token)
         db.delete(db_obj)
         db.commit()
         return None
@@ -3,3 +3,8 @@
 from app.db.base_class import Base  # noqa
 from app.models.creator import Creator  # noqa
 from app.models.token import Token  # noqa
+from app.models.actor import Actor  # noqa
+from app.models.collection import Collection, CollectionItem  # noqa
+from app.models.stats import NodeStat  # noqa
+from app.models.activity import Activity  # noqa
+from app.models.email import OutboxEmail  # noqa
@@ -0,0 +1,160 @@
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.core.config import settings
+
+
+class PoolMetrics:
+    """
+    Counters for a single engine's connection pool, per process. `wait` is the time spent inside
+    the pool waiting for a connection, so a growing average means the pool is too small for the load.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.checked_out = 0
+            self.overflow_checkouts = 0
+            self.peak_checked_out = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_checkout(self, *, overflow: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+            if overflow:
+                self.overflow_checkouts += 1
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "pool_size": settings.POSTGRES_POOL_SIZE,
+                "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "overflow_checkouts": self.overflow_checkouts,
+                "wait_total": self.wait_total,
+                "wait_max": self.wait_max,
+                "wait_avg": self.wait_total / self.checkouts if self.checkouts else 0.0,
+            }
+
+
+class _TimedPoolMixin:
+    # The pool has no "checkout started" event, so time the wait for a connection here
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Per pool, so each engine's connections are counted separately
+        self.metrics = PoolMetrics()
+
+    def recreate(self) -> Pool:
+        # Engine.dispose() replaces the pool, and its counters carry on
+        pool = super().recreate()  # type: ignore[misc]
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# Engines reported by get_pool_metrics, by name
+_instrumented: dict[str, Engine] = {}
+
+
+def get_engine_options(*, asynchronous: bool = False) -> dict[str, Any]:
+    """
+    Keyword arguments for `create_engine` / `create_async_engine` from settings. With
+    `POSTGRES_PGBOUNCER`, connections are handed between clients on every transaction, so
+    psycopg must not prepare statements on the server, and PgBouncer does the pooling itself.
+    """
+    options: dict[str, Any] = {"pool_pre_ping": settings.POSTGRES_POOL_PRE_PING}
+    if settings.POSTGRES_PGBOUNCER:
+        options["connect_args"] = {"prepare_threshold": None}
+    if settings.POSTGRES_PGBOUNCER and settings.POSTGRES_POOL_SIZE == 0:
+        options["poolclass"] = NullPool
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+        pool_size=settings.POSTGRES_POOL_SIZE,
+        max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+        pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+        pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+        pool_use_lifo=True,
+    )
+    return options
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Record connects, checkouts and checkins for an engine built with `get_engine_options`, and
+    report them under `name`.
+    """
+    pool = engine.pool
+    metrics = getattr(pool, "metrics", None)
+    if metrics is None:
+        return
+
+    # Listeners move to the replacement pool on Engine.dispose(), so read the engine's current one
+    @event.listens_for(pool, "connect")
+    def _connect(dbapi_connection: Any, connection_record: Any) -> None:
+        metrics.record_connect()
+
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        metrics.record_checkout(overflow=engine.pool.overflow() > 0)  # type: ignore[attr-defined]
+
+    @event.listens_for(pool, "checkin")
+    def _checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        metrics.record_checkin()
+
+    _instrumented[name] = engine
+
+
+def get_pool_metrics() -> dict[str, dict[str, Any]]:
+    """
+    Pool metrics for this process, for each instrumented engine.
+    """
+    return {name: engine.pool.metrics.as_dict() for name, engine in _instrumented.items()}  # type: ignore[attr-defined]
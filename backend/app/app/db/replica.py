@@ -0,0 +1,179 @@
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+
+from app.core.config import settings
+from app.db.pool import get_engine_options, instrument_engine
+from app.db.session import AsyncSessionLocal, SessionLocal
+
+STICKY_COOKIE = "db_primary_until"
+# Seconds of replay lag; zero when the replica has replayed everything it received, or is not in recovery at all
+_LAG_QUERY = text(
+    """
+    SELECT COALESCE(
+        CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END,
+        0
+    )
+    """
+)
+# Per request: {"sticky_until": float, "wrote": bool}. A mutable dict, so that writes from the
+# threadpool, which runs with a copy of the context, are still seen by the middleware.
+_request_state: ContextVar[Optional[dict]] = ContextVar("db_request_state", default=None)
+
+
+def is_sticky() -> bool:
+    state = _request_state.get()
+    return bool(state and state["sticky_until"] > time.time())
+
+
+def mark_written() -> None:
+    state = _request_state.get()
+    if state is not None:
+        state["wrote"] = True
+        state["sticky_until"] = time.time() + settings.POSTGRES_STICKY_SECONDS
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush(session: Session, flush_context: Any) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_execute(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_commit(session: Session) -> None:
+    if session.info.pop("wrote", False):
+        mark_written()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_rollback(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+
+class Replica:
+    def __init__(self, uri: str):
+        self.uri = uri
+        sync_options = get_engine_options()
+        async_options = get_engine_options(asynchronous=True)
+        # Fail fast, so an unreachable replica is skipped rather than holding up the request
+        for options in (sync_options, async_options):
+            options["connect_args"] = {**options.get("connect_args", {}), "connect_timeout": 2}
+        self.engine = create_engine(uri, **sync_options)
+        self.async_engine = create_async_engine(uri, **async_options)
+        # Reported apart from the primary's pools, one pair per replica
+        name = f"replica:{self.engine.url.host}:{self.engine.url.port}"
+        instrument_engine(self.engine, f"{name}:sync")
+        instrument_engine(self.async_engine.sync_engine, f"{name}:async")
+        self.session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.async_session = async_sessionmaker(autoflush=False, expire_on_commit=False, bind=self.async_engine)
+        self.lag: Optional[float] = None  # None until checked, or while unreachable
+
+
+class ReplicaRouter:
+    """
+    Route read-only sessions to a replica, round robin across those within `POSTGRES_REPLICA_MAX_LAG`,
+    falling back to the primary if none are, or if the client wrote within `POSTGRES_STICKY_SECONDS`.
+    Lag is checked at most every `POSTGRES_REPLICA_LAG_CHECK` seconds, not per request.
+    """
+
+    def __init__(self, uris: list[str]):
+        self.replicas = [Replica(uri) for uri in uris]
+        self._next = itertools.count()
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _check_due(self) -> bool:
+        return time.monotonic() - self._checked >= settings.POSTGRES_REPLICA_LAG_CHECK
+
+    def check_lag(self) -> None:
+        if not self._lock.acquire(blocking=False):
+            return  # Another request is checking, use the current values
+        try:
+            for replica in self.replicas:
+                try:
+                    with replica.engine.connect() as connection:
+                        replica.lag = float(connection.execute(_LAG_QUERY).scalar_one())
+                except DBAPIError:
+                    replica.lag = None
+            self._checked = time.monotonic()
+        finally:
+            self._lock.release()
+
+    async def acheck_lag(self) -> None:
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            for replica in self.replicas:
+                try:
+                    async with replica.async_engine.connect() as connection:
+                        replica.lag = float((await connection.execute(_LAG_QUERY)).scalar_one())
+                except (DBAPIError, OSError):
+                    replica.lag = None
+            self._checked = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def _choose(self) -> Optional[Replica]:
+        healthy = [r for r in self.replicas if r.lag is not None and r.lag <= settings.POSTGRES_REPLICA_MAX_LAG]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    def get_session(self) -> Session:
+        if not self.replicas or is_sticky():
+            return SessionLocal()
+        if self._check_due():
+            self.check_lag()
+        replica = self._choose()
+        return replica.session() if replica else SessionLocal()
+
+    async def aget_session(self) -> AsyncSession:
+        if not self.replicas or is_sticky():
+            return AsyncSessionLocal()
+        if self._check_due():
+            await self.acheck_lag()
+        replica = self._choose()
+        return replica.async_session() if replica else AsyncSessionLocal()
+
+
+replicas = ReplicaRouter([str(uri) for uri in settings.SQLALCHEMY_REPLICA_URIS])
+
+
+async def read_your_writes(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """
+    HTTP middleware: a client that has just written reads from the primary until its cookie expires,
+    so it never sees a replica that has not caught up with its own change.
+    """
+    try:
+        sticky_until = float(request.cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        sticky_until = 0.0
+    state = {"sticky_until": sticky_until, "wrote": False}
+    token = _request_state.set(state)
+    try:
+        response = await call_next(request)
+    finally:
+        _request_state.reset(token)
+    if state["wrote"] and replicas.replicas:
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(state["sticky_until"]),
+            max_age=settings.POSTGRES_STICKY_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
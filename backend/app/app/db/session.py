@@ -1,7 +1,15 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.pool import get_engine_options, instrument_engine
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), pool_pre_ping=True)
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **get_engine_options())
+instrument_engine(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# psycopg 3 drives both engines from the same URI; use in async endpoints so queries never block the event loop
+async_engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI), **get_engine_options(asynchronous=True))
+instrument_engine(async_engine.sync_engine, "async")
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False, bind=async_engine)
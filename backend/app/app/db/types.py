@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import types
+from sqlalchemy.dialects.postgresql import UUID
+from ulid import ULID
+
+
+class ULIDType(types.TypeDecorator):
+    """
+    A ULID, stored in a 16-byte `uuid` column but read and written as its 26 character string.
+    The uuid bytes sort in the same order as the ULID, i.e. by creation time, so primary key
+    ranges are time ranges.
+    """
+
+    impl = UUID(as_uuid=True)
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Optional[uuid.UUID]:
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        if isinstance(value, ULID):
+            return value.to_uuid()
+        return ULID.from_str(str(value)).to_uuid()
+
+    def process_result_value(self, value: Optional[uuid.UUID], dialect: Any) -> Optional[str]:
+        if value is None:
+            return None
+        return str(ULID.from_uuid(value))
+
+
+def new_ulid() -> str:
+    return str(ULID())
+
+
+def validate_ulid(value: Any) -> str:
+    try:
+        return str(ULID.from_str(str(value)))
+    except ValueError:
+        raise ValueError(f"Invalid id: {value}.")
+
+
+def ulid_floor(moment: datetime) -> str:
+    """
+    The smallest ULID for a moment, as the lower bound of a primary key time range. ULIDs are
+    stamped in UTC, so a naive moment is taken to be UTC rather than server local time.
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return str(ULID.from_bytes(int(moment.timestamp() * 1000).to_bytes(6, "big") + bytes(10)))
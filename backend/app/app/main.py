@@ -1,8 +1,11 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.api_v1.api import api_router, root_router
 from app.core.config import settings
+from app.core.hashing import HashingRejected
+from app.db.replica import read_your_writes
 
 app = FastAPI(title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json")
 
@@ -14,7 +17,20 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
 
+app.middleware("http")(read_your_writes)
+
+
+@app.exception_handler(HashingRejected)
+def shed_hashing_load(request: Request, exc: HashingRejected) -> JSONResponse:
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(max(int(settings.HASH_QUEUE_TIMEOUT), 1))},
+    )
+
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 app.include_router(root_router)
@@ -1,3 +1,7 @@
 from .creator import Creator  # noqa: F401
 from .token import Token  # noqa: F401
 from .actor import Actor  # noqa: F401
+from .collection import Collection, CollectionItem  # noqa: F401
+from .stats import NodeStat  # noqa: F401
+from .activity import Activity  # noqa: F401
+from .email import OutboxEmail  # noqa: F401
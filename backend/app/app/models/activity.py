@@ -0,0 +1,104 @@
+from __future__ import annotations
+import re
+from typing import Any, Optional
+from datetime import datetime
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy import DateTime, Index, Text, literal_column
+from sqlalchemy.sql import func
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.base_class import Base
+from app.db.types import ULIDType, new_ulid
+
+# One partition per calendar month of the ULID time, e.g. activity_p202610
+PARTITION_NAME = "activity_p{:%Y%m}"
+PARTITION_PATTERN = re.compile(r"^activity_p(\d{4})(\d{2})$")
+
+
+def _get_path(column: Any, *path: str) -> ColumnElement[str]:
+    # Keys are rendered inline rather than bound, so queries match the expression indexes exactly
+    for key in path[:-1]:
+        column = column.op("->", return_type=JSONB)(literal_column(f"'{key}'"))
+    return column.op("->>", return_type=Text)(literal_column(f"'{path[-1]}'"))
+
+
+def _get_ref_path(column: Any, key: str) -> ColumnElement[str]:
+    return func.coalesce(_get_path(column, key, "id"), _get_path(column, key))
+
+
+def _get_ref(value: Any) -> Optional[str]:
+    # A reference may be a URI, or an embedded object with an id
+    if isinstance(value, dict):
+        return value.get("id")
+    return value
+
+
+class Activity(Base):
+    """
+    Received ActivityPub activities and objects, stored as the parsed JSON-LD document. Range
+    partitioned by month on the ULID, so retention drops whole partitions instead of deleting rows.
+    """
+
+    id: Mapped[str] = mapped_column(ULIDType, primary_key=True, default=new_ulid)
+    created: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    data: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    @hybrid_property
+    def URI(self) -> Optional[str]:
+        return self.data.get("id")
+
+    @URI.inplace.expression
+    @classmethod
+    def _URI_expression(cls) -> ColumnElement[str]:
+        return _get_path(cls.data, "id")
+
+    @hybrid_property
+    def actor(self) -> Optional[str]:
+        return _get_ref(self.data.get("actor"))
+
+    @actor.inplace.expression
+    @classmethod
+    def _actor_expression(cls) -> ColumnElement[str]:
+        return _get_ref_path(cls.data, "actor")
+
+    @hybrid_property
+    def object(self) -> Optional[str]:
+        return _get_ref(self.data.get("object"))
+
+    @object.inplace.expression
+    @classmethod
+    def _object_expression(cls) -> ColumnElement[str]:
+        return _get_ref_path(cls.data, "object")
+
+    @hybrid_property
+    def inReplyTo(self) -> Optional[str]:
+        # The embedded object's, e.g. for a Create, or the document's own
+        embedded = self.data.get("object")
+        if isinstance(embedded, dict) and embedded.get("inReplyTo"):
+            return _get_ref(embedded["inReplyTo"])
+        return _get_ref(self.data.get("inReplyTo"))
+
+    @inReplyTo.inplace.expression
+    @classmethod
+    def _inReplyTo_expression(cls) -> ColumnElement[str]:
+        # Each reference may itself be embedded, so its id is tried first, as in `_get_ref_path`
+        return func.coalesce(
+            _get_path(cls.data, "object", "inReplyTo", "id"),
+            _get_path(cls.data, "object", "inReplyTo"),
+            _get_path(cls.data, "inReplyTo", "id"),
+            _get_path(cls.data, "inReplyTo"),
+        )
+
+    @declared_attr.directive
+    def __table_args__(cls) -> tuple:
+        # Indexes on a partitioned table are created on every partition, including those made later.
+        # Each ends in id, so newest-first pages by actor, object or reply read in index order and stop at the limit
+        return (
+            Index("ix_activity_URI", cls.URI, "id"),
+            Index("ix_activity_actor", cls.actor, "id"),
+            Index("ix_activity_object", cls.object, "id", postgresql_where=cls.object.is_not(None)),
+            Index("ix_activity_inReplyTo", cls.inReplyTo, "id", postgresql_where=cls.inReplyTo.is_not(None)),
+            {"postgresql_partition_by": "RANGE (id)"},
+        )
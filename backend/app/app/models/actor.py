@@ -3,12 +3,12 @@ from typing import TYPE_CHECKING, Optional
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import ForeignKey
-from sqlalchemy import DateTime, UniqueConstraint
+from sqlalchemy import DateTime, Index, text
 from sqlalchemy.sql import func
-from ulid import ULID
 from sqlalchemy.dialects.postgresql import ENUM
 
 from app.db.base_class import Base
+from app.db.types import ULIDType, new_ulid
 from app.schema_types import ActorType
 
 if TYPE_CHECKING:
@@ -16,17 +16,36 @@ if TYPE_CHECKING:
 
 
 class Actor(Base):
-    id: Mapped[str] = mapped_column(primary_key=True, index=True, default=str(ULID()))
+    __table_args__ = (
+        # Webfinger by handle, and username and domain unique *with* each other; INCLUDE makes lookups index-only
+        Index(
+            "ix_actor_preferredUsername_domain", "preferredUsername", "domain", unique=True, postgresql_include=["URI"]
+        ),
+        # Webfinger by profile URL
+        Index("ix_actor_URL", "URL", unique=True, postgresql_include=["preferredUsername", "domain", "URI"]),
+        # Inbox resolution for delivery
+        Index("ix_actor_URI", "URI", unique=True, postgresql_include=["inbox", "sharedInbox"]),
+        # Local actor routes by name and type
+        Index("ix_actor_preferredUsername_type", "preferredUsername", "type"),
+        # Stale remote actors, oldest fetch first, for background refresh
+        Index("ix_actor_fetched_remote", "fetched", postgresql_where=text('"privateKey" IS NULL')),
+    )
+
+    id: Mapped[str] = mapped_column(ULIDType, primary_key=True, index=True, default=new_ulid)
     # ACTIVITY
     created: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     modified: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
     fetched: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=True)
+    etag: Mapped[Optional[str]] = mapped_column(nullable=True)  # of the remote document as last fetched
+    last_modified: Mapped[Optional[str]] = mapped_column(nullable=True)  # Last-Modified, as the remote sent it
+    # A remote that could not be fetched is tried again from then, without waiting out a whole interval
+    retry_after: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     # REQUIRED ACTIVITYSTREAMS PROPERTIES
     type: Mapped[ENUM[ActorType]] = mapped_column(ENUM(ActorType), nullable=False, default=ActorType.Person)
     name: Mapped[str] = mapped_column(index=True, nullable=True)
-    preferredUsername: Mapped[str] = mapped_column(index=True, nullable=False)
+    preferredUsername: Mapped[str] = mapped_column(nullable=False)
     domain: Mapped[Optional[str]] = mapped_column(index=True, nullable=True)
     # RECOMMENDED ACTIVITYSTREAMS PROPERTIES
     inbox: Mapped[str] = mapped_column(nullable=False)
@@ -36,13 +55,12 @@ class Actor(Base):
     followers: Mapped[Optional[str]] = mapped_column(unique=True, nullable=True)
     liked: Mapped[Optional[str]] = mapped_column(unique=True, nullable=True)
     # OPTIONAL ACTIVITYSTREAMS PROPERTIES
-    URI: Mapped[Optional[str]] = mapped_column(index=True, unique=True, nullable=False)  # ActivityPub URI
-    URL: Mapped[Optional[str]] = mapped_column(unique=True, nullable=True)  # Actor Profile URL
+    URI: Mapped[Optional[str]] = mapped_column(nullable=False)  # ActivityPub URI
+    URL: Mapped[Optional[str]] = mapped_column(nullable=True)  # Actor Profile URL
     # AUTHENTICATION AND PERSISTENCE
     privateKey: Mapped[Optional[str]] = mapped_column(unique=True, nullable=True)
     publicKey: Mapped[str] = mapped_column(unique=True, nullable=False)
     publicKeyURI: Mapped[str] = mapped_column(unique=True, nullable=False)
     # UNIQUENESS CONSTRAINT
-    creator_id: Mapped[Optional[str]] = mapped_column(ForeignKey("creator.id"), nullable=True)
+    creator_id: Mapped[Optional[str]] = mapped_column(ULIDType, ForeignKey("creator.id"), nullable=True)
     creator: Mapped[Optional["Creator"]] = relationship(back_populates="actors", foreign_keys=[creator_id])
-    UniqueConstraint("preferredUsername", "domain")
@@ -0,0 +1,43 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+from app.db.types import ULIDType, new_ulid
+
+if TYPE_CHECKING:
+    from actor import Actor  # noqa: F401
+
+
+class Collection(Base):
+    id: Mapped[str] = mapped_column(ULIDType, primary_key=True, index=True, default=new_ulid)
+    # ACTIVITY
+    created: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    modified: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    # ACTIVITYSTREAMS PROPERTIES
+    URI: Mapped[str] = mapped_column(index=True, unique=True, nullable=False)
+    ordered: Mapped[bool] = mapped_column(default=True, nullable=False)
+    # Maintained on every add and remove, so rendering never counts the items
+    totalItems: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+    # OWNERSHIP
+    actor_id: Mapped[Optional[str]] = mapped_column(ULIDType, ForeignKey("actor.id", ondelete="CASCADE"), nullable=True)
+    actor: Mapped[Optional["Actor"]] = relationship(foreign_keys=[actor_id])
+
+
+class CollectionItem(Base):
+    # Append-only: ULIDs sort by creation time, so (collection_id, id) is the page order
+    id: Mapped[str] = mapped_column(ULIDType, primary_key=True, default=new_ulid)
+    created: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    collection_id: Mapped[str] = mapped_column(
+        ULIDType, ForeignKey("collection.id", ondelete="CASCADE"), nullable=False
+    )
+    object: Mapped[str] = mapped_column(nullable=False)  # ActivityPub URI of the item
+    __table_args__ = (
+        UniqueConstraint("collection_id", "object"),
+        Index("ix_collectionitem_collection_id_id", "collection_id", "id"),
+    )
@@ -6,9 +6,8 @@ from sqlalchemy import DateTime
 from sqlalchemy.sql import func
 from sqlalchemy_utils import LocaleType
 from babel import Locale
-from ulid import ULID
-
 from app.db.base_class import Base
+from app.db.types import ULIDType, new_ulid
 
 if TYPE_CHECKING:
     from token import Token  # noqa: F401
@@ -16,7 +15,7 @@ if TYPE_CHECKING:
 
 
 class Creator(Base):
-    id: Mapped[str] = mapped_column(primary_key=True, index=True, default=str(ULID()))
+    id: Mapped[str] = mapped_column(ULIDType, primary_key=True, index=True, default=new_ulid)
     # ACTIVITY
     # https://github.com/sqlalchemy/sqlalchemy/discussions/10189
     created: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Index, SmallInteger, Text, text
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+from app.db.types import ULIDType, new_ulid
+
+
+class OutboxEmail(Base):
+    """
+    Rendered email waiting for, or kept after, delivery by the worker. Pending messages are claimed in
+    priority order, and a failed attempt is retried after a backoff until `EMAIL_MAX_ATTEMPTS`.
+    """
+
+    id: Mapped[str] = mapped_column(ULIDType, primary_key=True, default=new_ulid)
+    created: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    email_to: Mapped[str] = mapped_column(nullable=False)
+    subject: Mapped[str] = mapped_column(nullable=False)
+    html: Mapped[str] = mapped_column(Text, nullable=False)
+    priority: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    attempts: Mapped[int] = mapped_column(SmallInteger, default=0, server_default="0", nullable=False)
+    next_attempt: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_outboxemail_pending", "priority", "next_attempt", postgresql_where=text("sent IS NULL")),
+    )
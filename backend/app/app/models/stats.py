@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, DateTime
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class NodeStat(Base):
+    # Totals are kept current by database triggers, rolling activity windows by a periodic worker job
+    name: Mapped[str] = mapped_column(primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0", nullable=False)
+    modified: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
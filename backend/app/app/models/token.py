@@ -4,6 +4,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import ForeignKey
 
 from app.db.base_class import Base
+from app.db.types import ULIDType
 
 if TYPE_CHECKING:
     from .creator import Creator  # noqa: F401
@@ -12,5 +13,5 @@ if TYPE_CHECKING:
 class Token(Base):
     token: Mapped[str] = mapped_column(primary_key=True, index=True)
     scopes: Mapped[Optional[str]] = mapped_column(nullable=True)
-    authenticates_id: Mapped[str] = mapped_column(ForeignKey("creator.id"))
+    authenticates_id: Mapped[str] = mapped_column(ULIDType, ForeignKey("creator.id"))
     authenticates: Mapped["Creator"] = relationship(back_populates="tokens")
@@ -1,2 +1,5 @@
 from .base import BaseEnum  # noqa: F401
 from .actor import ActorType  # noqa: F401
+from .collection import CollectionType  # noqa: F401
+from .stats import NodeStatType  # noqa: F401
+from .email import EmailPriority  # noqa: F401
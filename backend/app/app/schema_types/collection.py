@@ -0,0 +1,10 @@
+from enum import auto
+
+from app.schema_types.base import BaseEnum
+
+
+class CollectionType(BaseEnum):
+    outbox = auto()
+    followers = auto()
+    following = auto()
+    liked = auto()
@@ -0,0 +1,8 @@
+from enum import IntEnum
+
+
+class EmailPriority(IntEnum):
+    # Lower is sent first: a creator is waiting on anything urgent to log in
+    urgent = 0
+    normal = 1
+    bulk = 2
@@ -0,0 +1,10 @@
+from enum import auto
+
+from app.schema_types.base import BaseEnum
+
+
+class NodeStatType(BaseEnum):
+    users_total = auto()
+    users_active_month = auto()
+    users_active_halfyear = auto()
+    local_posts = auto()
@@ -11,6 +11,7 @@ from .token import (  # noqa: F401
     TokenUpdate,
     TokenData,
     TokenPayload,
+    Principal,
     MagicTokenPayload,
     WebToken,
 )
@@ -19,4 +20,5 @@ from .creator import Creator, CreatorCreate, CreatorInDB, CreatorUpdate, Creator
 from .emails import EmailContent, EmailValidation  # noqa: F401
 from .totp import NewTOTP, EnableTOTP  # noqa: F401
 from .activitypubdantic import models  # noqa: F401
-from .actor import ActorBase, ActorLocalCreate, ActorLocalUpdate  # noqa: F401
+from .actor import ActorBase, ActorLocalCreate, ActorLocalUpdate, ActorRemoteCreate  # noqa: F401
+from .collection import CollectionCreate, CollectionUpdate  # noqa: F401
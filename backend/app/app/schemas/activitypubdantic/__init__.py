@@ -12,4 +12,5 @@ is available here: https://github.com/joewlos/activitypubdantic
 """
 # from . import models  # noqa: F401
 from .get_class import get_class, get_class_from_model  # noqa: F401
-from .get_model import get_model, get_model_data, get_model_json  # noqa: F401
+from .get_model import build_models, get_model, get_model_data, get_model_json  # noqa: F401
+from .get_stream import CollectionPageParser, get_collection_items, get_item_model, get_page_items  # noqa: F401
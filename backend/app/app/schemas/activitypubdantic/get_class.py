@@ -4,7 +4,7 @@ FUNCTIONS FOR SELECTING CLASSES TO PERFORM ACTIONS
 """
 # Import Pydantic models and their functions
 from .models import ActivityModel, ActorModel, CollectionModel, LinkModel, ObjectModel
-from .get_model import get_model, get_model_data, get_model_json
+from .get_model import get_model, get_model_data, get_model_dump, get_model_json
 
 # Import other packages
 from datetime import datetime
@@ -23,7 +23,7 @@ _DEFAULT_MAP_FIELDS = {
     "summary_map": "summary",
     "name_map": "name",
 }
-_DEFAULT_PROTECTED_FIELDS = ["data", "model", "input_json", "_data", "json"]
+_DEFAULT_PROTECTED_FIELDS = ["data", "model", "json", "_mapped"]
 
 
 """
@@ -34,39 +34,56 @@ CLASSES
 class Base:
     """
     Base extends default functions to all other classes.
+    The validated model is the only copy of the data. Its fields are exposed as attributes
+    of the class, and assigning to an attribute updates the model.
     """
 
+    __slots__ = ("model", "_mapped")
+
     def __init__(
         self,
         model: Union[ActivityModel, ActorModel, CollectionModel, LinkModel, ObjectModel],
-        input_json: dict,  # TODO: There's no way this could be a list, right?
         default_languages: list = _DEFAULT_LANGUAGES,
     ):
-        self.model = model
-        self.input_json = input_json
-        self._data = self.data(
-            exclude_none=False, by_alias=False, use_input_json=True
-        )  # Use underscore to avoid conflict with data() function
-
-        # For each key,value pair in the input_json, set the class attribute
-        for k, v in self._data.items():
-            if k not in _DEFAULT_PROTECTED_FIELDS:
-                setattr(self, k, v)
-
-        # For mapped fields, update their corresponding value with the default language
+        object.__setattr__(self, "model", model)
+
+        # For mapped fields, read their corresponding value in the default language
+        # The model keeps the values as input, e.g. for data(use_input_json=True)
+        mapped = {}
         for k, v in _DEFAULT_MAP_FIELDS.items():
-            if k in self._data:
+            values = getattr(model, k, None)
+            if values:
                 for language in default_languages:
-                    if self._data[k] and language in self._data[k]:
-                        setattr(self, v, self._data[k][language])
+                    if language in values:
+                        mapped[v] = values[language]
                         break
+        object.__setattr__(self, "_mapped", mapped)
+
+    def __getattr__(self, name: str):
+        # Only called for names which are not class attributes, i.e. model fields
+        if name in _DEFAULT_PROTECTED_FIELDS:
+            raise AttributeError(name)
+        if name in self._mapped:
+            return self._mapped[name]
+        return getattr(self.model, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        if name in _DEFAULT_PROTECTED_FIELDS:
+            raise AttributeError(f"{name} is protected.")
+        # An assigned value replaces the one in the default language
+        self._mapped.pop(name, None)
+        setattr(self.model, name, value)
+
+    def __reduce__(self):
+        # Slotted classes have no __dict__, so pickle (e.g. for worker queues) by model
+        return (self.__class__, (self.model,))
 
     def _internal_data(self):
         """
         Get the internal data dictionary of unprotected and not null fields.
         """
         clean_data = {}
-        for k, v in self.__dict__.items():
+        for k, v in {**self.model.model_dump(exclude_none=True), **self._mapped}.items():
             if k not in _DEFAULT_PROTECTED_FIELDS and v:
                 clean_data[k] = v
         return clean_data
@@ -79,10 +96,13 @@ class Base:
         use_input_json: bool = False,
     ):
         """
-        Return the class input_json as a Python dictionary or list with settings.
+        Return the class data as a Python dictionary or list with settings.
+        Use input_json to dump the model as validated, without validating the current data again.
         """
+        if use_input_json:
+            return get_model_dump(self.model, by_alias=by_alias, exclude_none=exclude_none, verbose=verbose)
         return get_model_data(
-            self.input_json if use_input_json else self._internal_data(),
+            self._internal_data(),
             by_alias=by_alias,
             exclude_none=exclude_none,
             verbose=verbose,
@@ -97,10 +117,17 @@ class Base:
         use_input_json: bool = False,
     ):
         """
-        Return the class input_json as a JSON string with settings.
+        Return the class data as a JSON string with settings.
         """
+        if use_input_json:
+            return json.dumps(
+                get_model_dump(
+                    self.model, by_alias=by_alias, exclude_none=exclude_none, verbose=verbose, output_json=True
+                ),
+                indent=indent,
+            )
         return get_model_json(
-            self.input_json if use_input_json else self._internal_data(),
+            self._internal_data(),
             by_alias=by_alias,
             exclude_none=exclude_none,
             verbose=verbose,
@@ -113,6 +140,8 @@ class Link(Base):
     Link data and associated functions.
     """
 
+    __slots__ = ()
+
     # Core type
     core_type = "Link"
 
@@ -122,6 +151,8 @@ class Object(Base):
     Object data and associated functions.
     """
 
+    __slots__ = ()
+
     # Core type
     core_type = "Object"
 
@@ -232,6 +263,8 @@ class Activity(Object):
     Activity data and associated functions.
     """
 
+    __slots__ = ()
+
     # Core type
     core_type = "Activity"
 
@@ -253,6 +286,8 @@ class Actor(Object):
     Actor data and associated functions.
     """
 
+    __slots__ = ()
+
     # Core type
     core_type = "Actor"
 
@@ -275,8 +310,12 @@ class Actor(Object):
 class Collection(Object):
     """
     Collection data and associated functions.
+    These act on the in-memory document only. Persistent collections are stored and paged
+    through `crud.collection`, which never loads the whole collection.
     """
 
+    __slots__ = ()
+
     # Core type
     core_type = "Collection"
 
@@ -288,10 +327,10 @@ class Collection(Object):
             raise ValueError("Cannot add an empty Object.")
 
         # Use the items or ordered_items fields
-        if "items" in self._internal_data():
+        if self.model.items:
             self.items.insert(0, object.data())
             items_count = len(self.items)
-        elif "ordered_items" in self._internal_data():
+        elif self.model.ordered_items:
             self.ordered_items.insert(0, object.data())
             items_count = len(self.ordered_items)
 
@@ -309,11 +348,11 @@ class Collection(Object):
             raise ValueError("Cannot remove an Object without an ID.")
 
         # Use the items or ordered_items fields
-        if "items" in self._internal_data():
-            self.items = [i for i in self.items if "id" in i and i["id"] != object.id]
+        if self.model.items:
+            self.items = [i for i in self.items if _get_item_id(i) and _get_item_id(i) != object.id]
             items_count = len(self.items)
-        elif "ordered_items" in self._internal_data():
-            self.ordered_items = [i for i in self.ordered_items if "id" in i and i["id"] != object.id]
+        elif self.model.ordered_items:
+            self.ordered_items = [i for i in self.ordered_items if _get_item_id(i) and _get_item_id(i) != object.id]
             items_count = len(self.ordered_items)
 
         # Update total items
@@ -389,6 +428,13 @@ FUNCTIONS
 """
 
 
+def _get_item_id(item: Union[dict, LinkModel, ObjectModel]):
+    # Items validated with the collection are models, those added since are dictionaries
+    if isinstance(item, dict):
+        return item.get("id")
+    return getattr(item, "id", None)
+
+
 def get_class(
     input_json: Union[dict, str]  # If string, assume it is JSON
 ) -> Union[Activity, Actor, Collection, Link, Object]:
@@ -404,7 +450,7 @@ def get_class(
 
     # Return a class which includes possible actions for the ActivityPub JSON
     output_class = _CLASS_MAPPINGS[output_model.type]
-    return output_class(output_model, input_json)
+    return output_class(output_model)
 
 
 def get_class_from_model(
@@ -415,7 +461,4 @@ def get_class_from_model(
     This function assumes any input is a Pydantic model, with no further validation required.
     """
     output_class = _CLASS_MAPPINGS[input_model.type]
-    return output_class(
-        input_model,
-        json.loads(input_model.model_dump_json(by_alias=True, exclude_none=True)),
-    )
+    return output_class(input_model)
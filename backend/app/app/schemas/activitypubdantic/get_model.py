@@ -60,6 +60,7 @@ from .models import (
     TombstoneModel,
     VideoModel,
 )
+from .models import core
 
 # Import other packages
 import json
@@ -131,6 +132,10 @@ _MODEL_MAPPINGS = {
 }
 
 
+# Core annotations are postponed, so fields a model inherits from core are resolved against its namespace
+_TYPES_NAMESPACE = vars(core)
+
+
 """
 FUNCTIONS
 """
@@ -145,7 +150,7 @@ def get_model(
     """
     output = None
     if "type" in input_json and input_json["type"] in _MODEL_MAPPINGS:
-        output = _MODEL_MAPPINGS[input_json["type"]](**input_json)
+        output = _get_built_model(input_json["type"])(**input_json)
 
     # If there is no type, throw an error – this is required
     elif "type" not in input_json:
@@ -159,6 +164,26 @@ def get_model(
     return output
 
 
+def _get_built_model(
+    model_type: str,
+) -> type[Union[ActivityModel, CollectionModel, LinkModel, ObjectModel]]:
+    """
+    Return the model for a type, building its deferred Pydantic core schema on first use.
+    """
+    model = _MODEL_MAPPINGS[model_type]
+    model.model_rebuild(_types_namespace=_TYPES_NAMESPACE)
+    return model
+
+
+def build_models() -> None:
+    """
+    Build every deferred Pydantic core schema now, rather than on first use.
+    Call in a parent process before it forks so that each child inherits the built schemas.
+    """
+    for model_type in _MODEL_MAPPINGS:
+        _get_built_model(model_type)
+
+
 def get_model_data(
     input_json: dict,
     by_alias: bool = True,
@@ -170,8 +195,26 @@ def get_model_data(
     Return the Pydantic model as a dictionary.
     Formatting may be specified in the keyword arguments.
     """
-    model_output = get_model(input_json)
+    return get_model_dump(
+        get_model(input_json),
+        by_alias=by_alias,
+        exclude_none=exclude_none,
+        verbose=verbose,
+        output_json=output_json,
+    )
+
 
+def get_model_dump(
+    model_output: Union[ActivityModel, CollectionModel, LinkModel, ObjectModel],
+    by_alias: bool = True,
+    exclude_none: bool = True,
+    verbose: bool = True,
+    output_json: bool = False,
+) -> dict:
+    """
+    Return an already validated Pydantic model as a dictionary.
+    Formatting may be specified in the keyword arguments.
+    """
     # Dump the model with settings
     if not output_json:
         output = model_output.model_dump(by_alias=by_alias, exclude_none=exclude_none)
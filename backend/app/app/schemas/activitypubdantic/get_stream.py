@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+FUNCTIONS FOR STREAMING ITEMS FROM LARGE COLLECTIONS
+"""
+# Import Pydantic models and their functions
+from .models import LinkModel, ObjectModel
+from .get_model import _MODEL_MAPPINGS, get_model
+
+# Import other packages
+import codecs
+import json
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, Union
+
+import httpx
+
+
+"""
+DEFAULTS
+"""
+
+
+_DEFAULT_MAX_ITEM_SIZE = 1024 * 50  # 50 KB, no single item or property may be larger than this
+_DEFAULT_MAX_PAGES = 1000
+_DEFAULT_ACCEPT = 'application/activity+json, application/ld+json; profile="https://www.w3.org/ns/activitystreams"'
+_DEFAULT_ITEM_FIELDS = ["orderedItems", "items"]
+_DEFAULT_PAGE_FIELD = "first"  # a Collection may embed its first page, whose items are streamed as its own
+_WHITESPACE = " \t\n\r"
+
+
+"""
+CLASSES
+"""
+
+
+class CollectionPageParser:
+    """
+    Incremental, push-based parser for a single Collection or CollectionPage document.
+    Bytes are fed in as they arrive and validated items are returned as soon as each is complete.
+    Only the unconsumed tail of the stream is kept in memory, so the peak is bounded by the
+    largest single item or property, not by the size of the page.
+    Every other top-level property (e.g. `next`, `first`, `totalItems`) is kept in `properties`.
+    An embedded `first` page is parsed the same way: its items are returned as they complete,
+    and its other properties are kept in `properties["first"]`.
+    """
+
+    def __init__(self, max_item_size: int = _DEFAULT_MAX_ITEM_SIZE):
+        self.max_item_size = max_item_size
+        self.properties: dict[str, Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = "start"
+        self._key: Optional[str] = None
+        # The objects being parsed, outermost first
+        self._objects: list[dict[str, Any]] = []
+
+    def feed(self, chunk: bytes, final: bool = False) -> list:
+        """
+        Add a chunk of bytes and return the list of items completed by it.
+        """
+        self._buffer += self._text.decode(chunk, final=final)
+        items = []
+        pos = 0
+        while True:
+            pos = self._skip_whitespace(pos)
+            if pos >= len(self._buffer):
+                break
+            char = self._buffer[pos]
+            if self._state == "start":
+                if char != "{":
+                    raise ValueError("Collection must be a JSON object.")
+                self._objects.append(self.properties)
+                self._state = "key"
+                pos += 1
+            elif self._state == "key":
+                if char == "}":
+                    self._close_object()
+                    pos += 1
+                    continue
+                value, end = self._decode(pos, final)
+                if end is None:
+                    break
+                if not isinstance(value, str):
+                    raise ValueError("Collection property names must be strings.")
+                self._key = value
+                self._state = "colon"
+                pos = end
+            elif self._state == "colon":
+                if char != ":":
+                    raise ValueError(f"Expected ':' after property {self._key}.")
+                self._state = "value"
+                pos += 1
+            elif self._state == "value":
+                if self._key in _DEFAULT_ITEM_FIELDS and char == "[":
+                    self._state = "item"
+                    pos += 1
+                    continue
+                if self._key == _DEFAULT_PAGE_FIELD and char == "{" and len(self._objects) == 1:
+                    self.properties[self._key] = {}
+                    self._objects.append(self.properties[self._key])
+                    self._state = "key"
+                    pos += 1
+                    continue
+                value, end = self._decode(pos, final)
+                if end is None:
+                    break
+                if self._key in _DEFAULT_ITEM_FIELDS:
+                    # A single item need not be wrapped in a list
+                    if value:
+                        items.append(get_item_model(value))
+                else:
+                    self._objects[-1][self._key] = value
+                self._state = "separator"
+                pos = end
+            elif self._state == "item":
+                if char == "]":
+                    self._state = "separator"
+                    pos += 1
+                    continue
+                value, end = self._decode(pos, final)
+                if end is None:
+                    break
+                if value:
+                    items.append(get_item_model(value))
+                self._state = "item_separator"
+                pos = end
+            elif self._state == "item_separator":
+                if char == ",":
+                    self._state = "item"
+                elif char == "]":
+                    self._state = "separator"
+                else:
+                    raise ValueError("Expected ',' or ']' between collection items.")
+                pos += 1
+            elif self._state == "separator":
+                if char == ",":
+                    self._state = "key"
+                elif char == "}":
+                    self._close_object()
+                else:
+                    raise ValueError("Expected ',' or '}' between collection properties.")
+                pos += 1
+            else:  # done, ignore trailing whitespace only
+                raise ValueError("Unexpected data after the end of the collection.")
+
+        # Discard everything consumed, keeping memory bounded to the unfinished tail
+        self._buffer = self._buffer[pos:]
+        # A character is at most four bytes, so only a long enough tail need be encoded to measure it
+        if len(self._buffer) * 4 > self.max_item_size and len(self._buffer.encode("utf-8")) > self.max_item_size:
+            raise ValueError(f"Collection item or property exceeds {self.max_item_size} bytes.")
+        if final and self._state != "done":
+            raise ValueError("Collection ended unexpectedly.")
+        return items
+
+    def close(self) -> list:
+        """
+        Signal the end of the stream and return any remaining items.
+        """
+        return self.feed(b"", final=True)
+
+    def _close_object(self) -> None:
+        self._objects.pop()
+        self._state = "separator" if self._objects else "done"
+
+    def _skip_whitespace(self, pos: int) -> int:
+        while pos < len(self._buffer) and self._buffer[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+    def _decode(self, pos: int, final: bool) -> tuple:
+        """
+        Decode one JSON value at pos. Returns (None, None) if more data is needed.
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError("Collection contains invalid JSON.")
+            return None, None
+        # A number at the very end of the buffer may be truncated
+        if end == len(self._buffer) and not final and isinstance(value, (int, float)):
+            return None, None
+        return value, end
+
+
+"""
+FUNCTIONS
+"""
+
+
+def get_item_model(item: Union[dict, str]) -> Union[LinkModel, ObjectModel]:
+    """
+    Validate a single collection item in the same way as the Collection models,
+    but use the specific model if the item declares a supported type.
+    """
+    if isinstance(item, str):  # If a string, default to Object
+        return ObjectModel(id=item)
+    if not isinstance(item, dict):
+        raise ValueError("Collection items must be Links or Objects.")
+    if "href" in item:  # Use Link if there's an href
+        return LinkModel(**item)
+    if item.get("type") in _MODEL_MAPPINGS:
+        return get_model(item)
+    return ObjectModel(**item)
+
+
+def get_page_items(
+    chunks: Iterable[bytes],
+    max_item_size: int = _DEFAULT_MAX_ITEM_SIZE,
+    parser: Optional[CollectionPageParser] = None,
+) -> Iterator[Union[LinkModel, ObjectModel]]:
+    """
+    Yield validated items one at a time from a Collection or CollectionPage byte stream.
+    Pass a parser to read the page properties (e.g. `next`) once the stream is exhausted.
+    """
+    parser = parser or CollectionPageParser(max_item_size=max_item_size)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def _get_link_id(v: Union[None, dict, str]) -> Optional[str]:
+    # `next` and `first` may be a URL, a Link, or an embedded page
+    if isinstance(v, dict):
+        return v.get("id") or v.get("href")
+    return v
+
+
+async def get_collection_items(
+    url: str,
+    client: httpx.AsyncClient,
+    headers: Optional[dict] = None,
+    max_item_size: int = _DEFAULT_MAX_ITEM_SIZE,
+    max_pages: int = _DEFAULT_MAX_PAGES,
+) -> AsyncIterator[Union[LinkModel, ObjectModel]]:
+    """
+    Stream a remote Collection or OrderedCollection, following `first` and `next` links
+    and yielding validated items one at a time. Memory stays bounded by a single item,
+    however many pages or items the collection holds.
+    """
+    request_headers = {"Accept": _DEFAULT_ACCEPT}
+    request_headers.update(headers or {})
+    seen: set[str] = set()
+    while url and url not in seen and len(seen) < max_pages:
+        seen.add(url)
+        parser = CollectionPageParser(max_item_size=max_item_size)
+        async with client.stream("GET", url, headers=request_headers) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                for item in parser.feed(chunk):
+                    yield item
+        for item in parser.close():
+            yield item
+
+        # An embedded first page's items were streamed with the collection, so continue from its next link
+        first = parser.properties.get("first")
+        if isinstance(first, dict):
+            url = _get_link_id(first.get("next"))
+        else:
+            url = _get_link_id(parser.properties.get("next")) or _get_link_id(first)
@@ -3,7 +3,7 @@
 LANGUAGE TYPES
 """
 # Import types
-from typing import Literal
+from typing import get_args, Literal, Optional
 
 # Used in Pydantic models as a literal type
 language_types = Literal[
@@ -91,3 +91,28 @@ language_types = Literal[
     "zh",
     "und",  # Undefined
 ]
+
+
+# Compiled once for validation, keyed by lower case so lookups are case and separator insensitive
+language_tags = frozenset(get_args(language_types))
+_language_lookup = {tag.lower(): tag for tag in language_tags}
+
+
+def normalize_language(tag: str) -> Optional[str]:
+    """
+    Return the canonical form of a BCP-47 tag (e.g. `en_us` and `EN-US` become `en-US`),
+    or None if its primary language is not a defined language type.
+    """
+    key = tag.strip().replace("_", "-").lower()
+    if key in _language_lookup:
+        return _language_lookup[key]
+    # Undefined regions or scripts of a known language, e.g. `fr-LU` or `zh-Hant`
+    subtags = key.split("-")
+    if subtags[0] not in _language_lookup or not all(subtags[1:]):
+        return None
+    for i, subtag in enumerate(subtags[1:], start=1):
+        if len(subtag) == 2:
+            subtags[i] = subtag.upper()  # Region
+        elif len(subtag) == 4 and subtag.isalpha():
+            subtags[i] = subtag.title()  # Script
+    return "-".join(subtags)
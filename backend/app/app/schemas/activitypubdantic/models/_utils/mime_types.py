@@ -3,7 +3,7 @@
 COMMON MIME MEDIA TYPES
 """
 # Import types
-from typing import Literal
+from typing import get_args, Literal, Optional
 
 # Used in Pydantic models as a literal type
 mime_types = Literal[
@@ -79,9 +79,26 @@ mime_types = Literal[
     "application/x-7z-compressed",
 ]
 
-# Used in Pydantic models as a validator, so handle as list not literal
-image_mime_types = [
-    "image/png",
-    "image/jpeg",
-    "image/gif",
-]
+# Used in Pydantic models as a validator, so handle as set not literal
+image_mime_types = frozenset(
+    [
+        "image/png",
+        "image/jpeg",
+        "image/gif",
+    ]
+)
+
+# Compiled once for validation
+mime_type_set = frozenset(get_args(mime_types))
+
+
+def normalize_mime_type(media_type: str) -> Optional[str]:
+    """
+    Return the media type in lower case, keeping any parameters (e.g. `; charset=utf-8`),
+    or None if it is not a defined mime type.
+    """
+    base, sep, parameters = media_type.partition(";")
+    base = base.strip().lower()
+    if base not in mime_type_set:
+        return None
+    return base + sep + parameters
@@ -68,7 +68,7 @@ class EndpointsModel(BaseModel):
     """
 
     # Ensure camel case for all aliases
-    model_config = ConfigDict(alias_generator=_must_be_camel, populate_by_name=True)
+    model_config = ConfigDict(alias_generator=_must_be_camel, populate_by_name=True, defer_build=True)
 
     # Properties
     proxy_url: Union[None, HttpUrl] = None
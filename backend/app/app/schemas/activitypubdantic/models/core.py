@@ -6,12 +6,12 @@ Documentation: https://www.w3.org/TR/activitystreams-vocabulary/#types
 # Import Pydantic models and types
 from __future__ import annotations
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict, Field, field_validator, HttpUrl
-from typing import get_args, List, Literal, Union
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, field_validator, HttpUrl
+from typing import Annotated, List, Literal, Union
 
 # Import utils
-from ._utils.language_types import language_types
-from ._utils.mime_types import image_mime_types, mime_types
+from ._utils.language_types import normalize_language
+from ._utils.mime_types import image_mime_types, normalize_mime_type
 
 
 """
@@ -54,22 +54,44 @@ def _must_be_camel(v):
     return "".join(x if i == 0 else x.capitalize() for i, x in enumerate(v.split("_")))
 
 
+# Language tags must be defined language types, normalized to their canonical form
+def _must_be_language(v):
+    language = normalize_language(v)
+    if language is None:
+        raise ValueError(f"Key {v} is not a defined language type.")
+    return language
+
+
+# Media types must be defined mime types, normalized to lower case
+def _must_be_mime_type(v):
+    media_type = normalize_mime_type(v)
+    if media_type is None:
+        raise ValueError(f"Media type {v} is not a defined mime type.")
+    return media_type
+
+
+# Checked against precompiled sets, rather than as very large Literal types
+LanguageType = Annotated[str, AfterValidator(_must_be_language)]
+MimeType = Annotated[str, AfterValidator(_must_be_mime_type)]
+
+
 # For certain fields, the keys in their dictionaries must be defined language types
 def _must_be_language_keys(v):
-    if v is not None and v is dict:
-        for key in v.keys():
-            if key not in list(get_args(language_types)):
-                raise ValueError(f"Key {key} is not a defined language type.")
-            if type(v[key]) != str:  # TODO: Attempt conversion to string
-                raise ValueError(f"Key {key} value {v[key]} is not a string.")
+    if v is not None and isinstance(v, dict):
+        languages = {}
+        for key, value in v.items():
+            if type(value) != str:  # TODO: Attempt conversion to string
+                raise ValueError(f"Key {key} value {value} is not a string.")
+            languages[_must_be_language(key)] = value
+        return languages
     return v
 
 
 # Sometimes media must be of the image mime type
 def _must_be_image_types(v):
     if v is not None:
-        if "media_type" in v and v["media_type"] not in image_mime_types:
-            raise ValueError(f"Media type {v.media_type} is not a defined image type.")
+        if "media_type" in v and v["media_type"].partition(";")[0].strip().lower() not in image_mime_types:
+            raise ValueError(f"Media type {v['media_type']} is not a defined image type.")
     return v
 
 
@@ -404,10 +426,12 @@ class CoreModel(BaseModel):
     """
 
     # Ensure camel case for all aliases
+    # Defer building each core schema until the model is first used, rather than at import
     model_config = ConfigDict(
         alias_generator=_must_be_camel,
         populate_by_name=True,
         extra="allow",  # Allow extra fields for flexibility
+        defer_build=True,
     )
 
     # Context
@@ -432,10 +456,10 @@ class LinkModel(CoreModel):
 
     # Properties
     rel: Union[None, List[Union[None, str]]] = None
-    media_type: Union[None, mime_types] = None
+    media_type: Union[None, MimeType] = None
     name: Union[None, str] = None
     name_map: Union[None, dict] = None  # Dictionary of language keys and name values, validated below
-    hreflang: Union[None, language_types] = _DEFAULT_LANGUAGE
+    hreflang: Union[None, LanguageType] = _DEFAULT_LANGUAGE
     height: Union[None, int] = Field(None, ge=0)
     width: Union[None, int] = Field(None, ge=0)
     preview: Union[None, List[Union[None, LinkModel, ObjectModel]]] = None
@@ -500,7 +524,7 @@ class ObjectModel(CoreModel):
     bto: Union[None, List[Union[None, LinkModel, ObjectModel]]] = None
     cc: Union[None, List[Union[None, LinkModel, ObjectModel]]] = None
     bcc: Union[None, List[Union[None, LinkModel, ObjectModel]]] = None
-    media_type: Union[None, mime_types] = None
+    media_type: Union[None, MimeType] = None
     duration: Union[None, str] = None  # TODO: Validate the duration string.
 
     # Necessary for ActivityPub but not ActivityStreams
@@ -188,3 +188,13 @@ class ActorLocalCreate(ActorBase):
 
 class ActorLocalUpdate(ActorBase):
     pass
+
+
+class ActorRemoteCreate(ActorBase):
+    # Remote actors are stored as fetched, so there are no local keys or endpoints to generate
+    domain: str = Field(..., description="Domain of the remote account, e.g. ``example.org``.")
+    URI: HttpUrl = Field(..., description="ActivityPub URI for this account, unique across the fediverse.")
+    etag: Optional[str] = Field(None, description="ETag of the remote document, for conditional refetches.")
+    last_modified: Optional[str] = Field(
+        None, description="Last-Modified of the remote document, for conditional refetches."
+    )
@@ -0,0 +1,19 @@
+from typing import Optional
+from pydantic import ConfigDict, BaseModel, Field
+from ulid import ULID
+
+
+# NOTE: this is to support the database, not ActivityPub
+class CollectionBase(BaseModel):
+    URI: str = Field(..., description="ActivityPub URI of the collection, e.g. an actor's outbox or followers.")
+    ordered: bool = Field(True, description="Is this an OrderedCollection?")
+    actor_id: Optional[ULID] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CollectionCreate(CollectionBase):
+    pass
+
+
+class CollectionUpdate(CollectionBase):
+    pass
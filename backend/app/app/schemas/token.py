@@ -30,6 +30,16 @@ class TokenPayload(BaseModel):
     refresh: Optional[bool] = False
     scopes: Optional[list[str]] = []
     totp: Optional[bool] = False
+    exp: Optional[int] = None
+    iat: Optional[float] = None
+
+
+class Principal(BaseModel):
+    # Everything authorisation needs about the bearer of an access token, cached so requests need no db lookup
+    id: ULID
+    is_active: bool
+    is_admin: bool
+    scopes: list[str] = []
 
 
 class MagicTokenPayload(BaseModel):
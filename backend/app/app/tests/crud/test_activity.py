@@ -0,0 +1,132 @@
+import os
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ulid import ULID
+
+from app import crud
+from app.db.session import SessionLocal
+from app.models import Activity
+from app.tests.utils.utils import random_lower_string
+
+DOMAIN = "https://example.com"
+BENCHMARK_SIZE = int(os.getenv("ACTIVITY_BENCHMARK_SIZE", "100000"))
+
+
+def _get_plan(db: Session, stmt) -> str:
+    compiled = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    return "\n".join(db.execute(text(f"EXPLAIN {compiled}")).scalars())
+
+
+def _create_note(actor: str, in_reply_to: str = None) -> dict:
+    uri = f"{DOMAIN}/{random_lower_string()}"
+    note = {"id": f"{uri}/note", "type": "Note", "attributedTo": actor, "content": "Hello"}
+    if in_reply_to:
+        note["inReplyTo"] = in_reply_to
+    return {"id": f"{uri}/create", "type": "Create", "actor": {"id": actor, "type": "Person"}, "object": note}
+
+
+def test_ingest_skips_duplicates(db: Session) -> None:
+    actor = f"{DOMAIN}/users/{random_lower_string()}"
+    documents = [_create_note(actor) for _ in range(5)]
+    ids = crud.activity.ingest(db, documents=documents + documents[:2])
+    assert len(ids) == 5
+    assert crud.activity.ingest(db, documents=documents) == []
+    db_obj = crud.activity.get_by_uri(db, uri=documents[0]["id"])
+    assert db_obj.data == documents[0]
+    assert db_obj.actor == actor
+    assert db_obj.object == documents[0]["object"]["id"]
+
+
+def test_concurrent_ingest_stores_once(db: Session) -> None:
+    actor = f"{DOMAIN}/users/{random_lower_string()}"
+    documents = [_create_note(actor) for _ in range(200)]
+    start = threading.Barrier(4)
+    ids = []
+
+    def deliver() -> None:
+        with SessionLocal() as session:
+            start.wait()
+            ids.extend(crud.activity.ingest(session, documents=documents))
+
+    threads = [threading.Thread(target=deliver) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(ids) == len(documents)
+    assert len(crud.activity.get_by_actor(db, uri=actor, limit=1000)) == len(documents)
+
+
+def test_lookups(db: Session) -> None:
+    actor = f"{DOMAIN}/users/{random_lower_string()}"
+    original = _create_note(actor)
+    note = original["object"]["id"]
+    replies = [_create_note(f"{DOMAIN}/users/{random_lower_string()}", note) for _ in range(3)]
+    # A reply may embed the object it replies to
+    replies[0]["object"]["inReplyTo"] = {"id": note, "type": "Note"}
+    like = {"id": f"{DOMAIN}/{random_lower_string()}", "type": "Like", "actor": actor, "object": note}
+    crud.activity.ingest(db, documents=[original, *replies, like])
+    assert {a.URI for a in crud.activity.get_by_actor(db, uri=actor)} == {like["id"], original["id"]}
+    assert {a.URI for a in crud.activity.get_by_object(db, uri=note)} == {like["id"], original["id"]}
+    found = crud.activity.get_replies(db, uri=note)
+    assert {a.URI for a in found} == {r["id"] for r in replies}
+    assert [a.id for a in found] == sorted((a.id for a in found), reverse=True)
+    page = crud.activity.get_replies(db, uri=note, max_id=found[0].id)
+    assert [a.id for a in page] == [a.id for a in found[1:]]
+
+
+def test_partitions_created_and_dropped(db: Session) -> None:
+    start = datetime(2001, 1, 1, tzinfo=timezone.utc)
+    created = crud.activity.create_partitions(db, start=start, months=1)
+    assert created == ["activity_p200101", "activity_p200102"]
+    assert crud.activity.create_partitions(db, start=start, months=1) == []
+    # A row lands in the partition for the month of its ULID
+    old = ULID.from_datetime(datetime(2001, 1, 15, tzinfo=timezone.utc))
+    crud.activity.create(db, obj_in={"id": str(old), "data": {}})
+    assert db.scalar(text("SELECT count(*) FROM activity_p200101")) == 1
+    dropped = crud.activity.drop_partitions(db, before=datetime(2001, 2, 15, tzinfo=timezone.utc))
+    assert dropped == ["activity_p200101"]
+    assert crud.activity.drop_partitions(db, before=datetime(2001, 3, 1, tzinfo=timezone.utc)) == ["activity_p200102"]
+    partitions = crud.activity.get_partitions(db)
+    assert "activity_p200101" not in partitions
+    assert f"activity_p{datetime.now(timezone.utc):%Y%m}" in partitions
+
+
+def test_lookups_use_indexes(db: Session) -> None:
+    # Bulk load synthetic activities with SQL, as the ORM would take minutes at this size
+    if not db.scalar(text(f"SELECT count(*) >= {BENCHMARK_SIZE} FROM activity")):
+        db.execute(
+            text(
+                f"""
+                INSERT INTO activity (id, data)
+                SELECT
+                    -- ULIDs for now, so the rows land in the current partition
+                    (lpad(to_hex((extract(epoch FROM now()) * 1000)::bigint), 12, '0') || left(md5(i::text), 20))::uuid,
+                    jsonb_build_object(
+                        'id', '{DOMAIN}/bench/' || i,
+                        'type', 'Create',
+                        'actor', '{DOMAIN}/users/' || (i % 1000),
+                        'object', jsonb_build_object('id', '{DOMAIN}/bench/' || i || '/note', 'inReplyTo',
+                            CASE WHEN i % 10 = 0 THEN '{DOMAIN}/bench/' || (i - 1) || '/note' END)
+                    )
+                FROM generate_series(1, {BENCHMARK_SIZE}) AS i
+                """
+            )
+        )
+        db.commit()
+    db.execute(text("ANALYZE activity"))
+    uri = f"{DOMAIN}/bench/{BENCHMARK_SIZE // 2}"
+    # The loaded partition is probed through its copy of the expression index; empty ones may be scanned
+    partition = f"activity_p{datetime.now(timezone.utc):%Y%m}"
+    for stmt in [
+        crud.activity._get_by_uri_statement(uri),
+        crud.activity._get_newest_statement(where=Activity.actor == f"{DOMAIN}/users/7"),
+        crud.activity._get_newest_statement(where=Activity.object == f"{uri}/note"),
+        crud.activity._get_newest_statement(where=Activity.inReplyTo == f"{uri}/note"),
+    ]:
+        plan = _get_plan(db, stmt)
+        assert f"Index Scan Backward using {partition}_" in plan, plan
+        assert f"Seq Scan on {partition} " not in plan, plan
@@ -0,0 +1,89 @@
+import os
+import time
+
+import pytest
+from sqlalchemy import Select, select, text
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.db.session import engine
+from app.models import Actor
+from app.tests.utils.utils import requires_benchmark
+
+# Set ACTOR_BENCHMARK_SIZE to a million or more for production-sized timings
+ACTOR_BENCHMARK_SIZE = int(os.getenv("ACTOR_BENCHMARK_SIZE", 10_000))
+DOMAIN = "benchmark.example"
+
+
+@pytest.fixture(scope="module")
+def remote_actors():
+    # DOMAIN is a constant, so it is safe to inline
+    with engine.connect() as connection:
+        connection.execute(
+            text(
+                f"""
+                INSERT INTO actor (
+                    id, type, "preferredUsername", domain, inbox, outbox, "sharedInbox",
+                    "URI", "URL", "publicKey", "publicKeyURI"
+                )
+                SELECT
+                    gen_random_uuid(), 'Person', 'user' || i, '{DOMAIN}',
+                    'https://{DOMAIN}/users/user' || i || '/inbox',
+                    'https://{DOMAIN}/users/user' || i || '/outbox',
+                    'https://{DOMAIN}/inbox',
+                    'https://{DOMAIN}/users/user' || i,
+                    'https://{DOMAIN}/profile/user' || i,
+                    'key' || i,
+                    'https://{DOMAIN}/users/user' || i || '#main-key'
+                FROM generate_series(1, :size) AS i
+                """
+            ),
+            {"size": ACTOR_BENCHMARK_SIZE},
+        )
+        connection.commit()
+    # Index-only scans need an up-to-date visibility map
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM ANALYZE actor"))
+    yield
+    with engine.connect() as connection:
+        connection.execute(text("DELETE FROM actor WHERE domain = :domain"), {"domain": DOMAIN})
+        connection.commit()
+
+
+def _explain(db: Session, stmt: Select) -> str:
+    sql = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    return "\n".join(db.execute(text(f"EXPLAIN ANALYZE {sql}")).scalars()).replace('"', "")
+
+
+@requires_benchmark
+@pytest.mark.usefixtures("remote_actors")
+def test_actor_lookups_use_indexes(db: Session) -> None:
+    columns = (Actor.preferredUsername, Actor.domain, Actor.URI)
+    stmt = crud.pub._get_actor_by_resource_statement(resource=f"acct:user500@{DOMAIN}", columns=columns)
+    assert "Index Only Scan using ix_actor_preferredUsername_domain" in _explain(db, stmt)
+    stmt = crud.pub._get_actor_by_resource_statement(resource=f"https://{DOMAIN}/profile/user500", columns=columns)
+    assert "Index Only Scan using ix_actor_URL" in _explain(db, stmt)
+    stmt = select(Actor.inbox, Actor.sharedInbox).where(Actor.URI == f"https://{DOMAIN}/users/user500")
+    assert "Index Only Scan using ix_actor_URI" in _explain(db, stmt)
+    stmt = crud.actor._get_by_name_statement(preferredUsername="user500", actortype="Person")
+    assert "Index Scan using ix_actor_preferredUsername_type" in _explain(db, stmt)
+
+
+@requires_benchmark
+@pytest.mark.usefixtures("remote_actors")
+def test_webfinger_lookup_benchmark(db: Session) -> None:
+    lookups = 1000
+    start = time.perf_counter()
+    for i in range(1, lookups + 1):
+        row = crud.pub.get_webfinger_by_resource(db=db, resource=f"acct:user{i}@{DOMAIN}")
+        assert row.URI == f"https://{DOMAIN}/users/user{i}"
+    webfinger = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(1, lookups + 1):
+        row = crud.actor.get_inbox_by_uri(db, uri=f"https://{DOMAIN}/users/user{i}")
+        assert row.sharedInbox == f"https://{DOMAIN}/inbox"
+    inbox = time.perf_counter() - start
+    print(
+        f"\n{ACTOR_BENCHMARK_SIZE} actors, {lookups} lookups: "
+        f"webfinger {webfinger * 1000 / lookups:.3f} ms, inbox {inbox * 1000 / lookups:.3f} ms per lookup"
+    )
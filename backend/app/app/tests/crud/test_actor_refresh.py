@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.models import Actor
+from app.tests.utils.utils import random_lower_string
+from app.worker.actor import refresh_remote_actors
+from app.worker.runtime import runtime
+
+LONG_AGO = datetime(2000, 1, 1, tzinfo=timezone.utc)
+LAST_MODIFIED = "Wed, 01 Dec 1999 00:00:00 GMT"
+
+
+def _document(uri: str, i: int, **kwargs) -> dict:
+    return {
+        "id": uri,
+        "type": "Person",
+        "preferredUsername": f"user{i}",
+        "inbox": f"{uri}/inbox",
+        "outbox": f"{uri}/outbox",
+        "endpoints": {"sharedInbox": f"https://{uri.split('/')[2]}/inbox"},
+        "publicKey": {"id": f"{uri}#main-key", "publicKeyPem": f"{uri}-key"},
+        **kwargs,
+    }
+
+
+def _create_stale(db: Session, domain: str, count: int) -> list[str]:
+    uris = [f"https://{domain}/users/user{i}" for i in range(count)]
+    crud.actor.upsert_remote(
+        db,
+        obj_in=[
+            {**_remote_columns(uri, i), "domain": domain, "etag": f'"{i}"', "last_modified": LAST_MODIFIED}
+            for i, uri in enumerate(uris)
+        ],
+    )
+    db.execute(update(Actor).where(Actor.domain == domain).values(fetched=LONG_AGO, modified=LONG_AGO))
+    db.commit()
+    return uris
+
+
+def _remote_columns(uri: str, i: int) -> dict:
+    return {
+        "preferredUsername": f"user{i}",
+        "inbox": f"{uri}/inbox",
+        "outbox": f"{uri}/outbox",
+        "URI": uri,
+        "publicKey": f"{uri}-key",
+        "publicKeyURI": f"{uri}#main-key",
+    }
+
+
+@pytest.fixture
+def domain(db: Session):
+    domain = f"{random_lower_string()}.example"
+    yield domain
+    db.execute(delete(Actor).where(Actor.domain == domain))
+    db.commit()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def stopped_runtime():
+    yield
+    runtime.stop()
+
+
+def test_busiest_stale_actors_first(db: Session, domain: str) -> None:
+    quiet, busy, busier = _create_stale(db, domain, 3)
+    # Recently fetched actors are not due
+    fresh = f"https://{domain}/users/fresh"
+    crud.actor.upsert_remote(db, obj_in=[{**_remote_columns(fresh, 3), "domain": domain}])
+    documents = [
+        {"id": f"{actor}/activity/{random_lower_string()}", "type": "Like", "actor": actor, "object": quiet}
+        for actor in [busy, busier, busier]
+    ]
+    crud.activity.ingest(db, documents=documents)
+    uris = [row.URI for row in crud.actor.get_stale_remote(db) if row.URI.startswith(f"https://{domain}/")]
+    assert uris == [busier, busy, quiet]
+
+
+def test_refresh_is_conditional_and_bounded_per_host(db: Session, domain: str, monkeypatch) -> None:
+    unchanged, changed, failing, impostor = _create_stale(db, domain, 4)
+    requests = []
+    in_flight = {"now": 0, "peak": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            in_flight["now"] -= 1
+        uri = str(request.url)
+        if uri == unchanged and request.headers.get("If-None-Match") == '"0"':
+            return httpx.Response(304)
+        if uri == changed:
+            headers = {"ETag": '"new"', "Last-Modified": "Mon, 19 Oct 2026 00:00:00 GMT"}
+            return httpx.Response(200, json=_document(uri, 1, name="Renamed"), headers=headers)
+        if uri == impostor:
+            return httpx.Response(200, json=_document(unchanged, 0, name="Impostor"))
+        return httpx.Response(500)
+
+    monkeypatch.setattr(settings, "ACTOR_REFRESH_PER_HOST", 2)
+    monkeypatch.setattr(runtime, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    result = refresh_remote_actors()
+    assert result["changed"] >= 1
+    assert result["failed"] >= 2
+    assert in_flight["peak"] == 2
+    # The remote's own Last-Modified is sent back, not when it was last fetched
+    assert all(
+        request.headers["If-Modified-Since"] == LAST_MODIFIED
+        for request in requests
+        if str(request.url).startswith(f"https://{domain}/")
+    )
+
+    actors = {
+        db_obj.URI: db_obj
+        for db_obj in db.scalars(select(Actor).where(Actor.domain == domain).execution_options(populate_existing=True))
+    }
+    assert actors[changed].name == "Renamed"
+    assert actors[changed].etag == '"new"'
+    assert actors[changed].last_modified == "Mon, 19 Oct 2026 00:00:00 GMT"
+    assert actors[changed].modified > LONG_AGO
+    # Not modified: only `fetched` moves
+    assert actors[unchanged].fetched > LONG_AGO
+    assert actors[unchanged].retry_after is None
+    assert actors[unchanged].name is None
+    # Failed, or describing another actor: retried later, and the stored copy still dated as fetched
+    for uri in [failing, impostor]:
+        assert actors[uri].fetched == LONG_AGO
+        assert actors[uri].retry_after > datetime.now(timezone.utc)
+    for uri in [unchanged, failing, impostor]:
+        assert actors[uri].modified == LONG_AGO
+    # None are due again until the retry
+    assert not {row.URI for row in crud.actor.get_stale_remote(db)} & set(actors)
+    db.execute(update(Actor).where(Actor.domain == domain).values(retry_after=LONG_AGO, modified=Actor.modified))
+    db.commit()
+    assert {row.URI for row in crud.actor.get_stale_remote(db)} & set(actors) == {failing, impostor}
@@ -0,0 +1,83 @@
+import time
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.models import Actor
+from app.tests.utils.utils import random_lower_string, requires_benchmark
+
+
+def _remote_actor(domain: str, i: int, **kwargs) -> dict:
+    uri = f"https://{domain}/users/user{i}"
+    return {
+        "preferredUsername": f"user{i}",
+        "domain": domain,
+        "inbox": f"{uri}/inbox",
+        "outbox": f"{uri}/outbox",
+        "sharedInbox": f"https://{domain}/inbox",
+        "URI": uri,
+        "publicKey": f"{domain}-key-{i}",
+        "publicKeyURI": f"{uri}#main-key",
+        **kwargs,
+    }
+
+
+def test_upsert_remote_refreshes_changed_columns(db: Session) -> None:
+    domain = f"{random_lower_string()}.example"
+    rows = crud.actor.upsert_remote(db, obj_in=[_remote_actor(domain, i) for i in range(3)])
+    assert [row.URI for row in rows] == [f"https://{domain}/users/user{i}" for i in range(3)]
+    assert len({row.id for row in rows}) == 3
+    before = {a.URI: (a.modified, a.fetched) for a in db.scalars(select(Actor).where(Actor.domain == domain))}
+    db.expire_all()
+
+    again = crud.actor.upsert_remote(
+        db, obj_in=[_remote_actor(domain, 0, name="Renamed"), _remote_actor(domain, 1), _remote_actor(domain, 1)]
+    )
+    assert [row.id for row in again] == [rows[0].id, rows[1].id]
+    actors = {a.URI: a for a in db.scalars(select(Actor).where(Actor.domain == domain))}
+    renamed, unchanged = actors[rows[0].URI], actors[rows[1].URI]
+    assert renamed.name == "Renamed"
+    assert renamed.modified > before[renamed.URI][0]
+    assert unchanged.modified == before[unchanged.URI][0]
+    assert unchanged.fetched > before[unchanged.URI][1]
+    db.execute(delete(Actor).where(Actor.domain == domain))
+    db.commit()
+
+
+def test_upsert_remote_skips_other_unique_conflicts(db: Session) -> None:
+    domain = f"{random_lower_string()}.example"
+    existing = crud.actor.upsert_remote(db, obj_in=[_remote_actor(domain, 0)])
+    # A new URI reusing user0's handle on the same domain collides on (preferredUsername, domain)
+    impostor = _remote_actor(domain, 9, preferredUsername="user0")
+    rows = crud.actor.upsert_remote(
+        db,
+        obj_in=[_remote_actor(domain, 0, name="Renamed"), impostor] + [_remote_actor(domain, i) for i in range(1, 4)],
+    )
+    assert [row.URI for row in rows] == [f"https://{domain}/users/user{i}" for i in range(4)]
+    assert rows[0].id == existing[0].id
+    actors = {a.URI: a for a in db.scalars(select(Actor).where(Actor.domain == domain))}
+    assert impostor["URI"] not in actors
+    assert actors[rows[0].URI].name == "Renamed"
+    db.execute(delete(Actor).where(Actor.domain == domain))
+    db.commit()
+
+
+@requires_benchmark
+def test_upsert_remote_followers_benchmark(db: Session) -> None:
+    domain = f"{random_lower_string()}.example"
+    followers = [_remote_actor(domain, i) for i in range(50_000)]
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        start = time.perf_counter()
+        rows = crud.actor.upsert_remote(db, obj_in=followers)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert len(rows) == 50_000
+    assert len(statements) <= 20
+    print(f"\n50000 remote actors upserted in {len(statements)} statements, {elapsed:.2f} s")
+    db.execute(delete(Actor).where(Actor.domain == domain))
+    db.commit()
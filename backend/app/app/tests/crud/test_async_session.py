@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app import crud
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine
+
+# Concurrent requests, each waiting on a query of this many seconds
+CONCURRENCY = 10
+QUERY_SECONDS = 0.1
+
+
+async def _sync_request() -> None:
+    # What an async endpoint did before: a sync query on the event loop
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT pg_sleep(:s)"), {"s": QUERY_SECONDS})
+    finally:
+        db.close()
+
+
+async def _async_request() -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT pg_sleep(:s)"), {"s": QUERY_SECONDS})
+
+
+async def _elapsed(request) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[request() for _ in range(CONCURRENCY)])
+    return time.perf_counter() - start
+
+
+def test_async_session_concurrency() -> None:
+    async def benchmark() -> tuple[float, float]:
+        blocking = await _elapsed(_sync_request)
+        concurrent = await _elapsed(_async_request)
+        await async_engine.dispose()
+        return blocking, concurrent
+
+    blocking, concurrent = asyncio.run(benchmark())
+    print(f"{CONCURRENCY} requests: sync session {blocking:.2f} s, async session {concurrent:.2f} s")
+    assert blocking >= CONCURRENCY * QUERY_SECONDS
+    assert concurrent < blocking / 2
+
+
+def test_async_get_by_name_rejects_invalid() -> None:
+    async def lookup():
+        async with AsyncSessionLocal() as db:
+            invalid_type = await crud.actor.aget_by_name(db=db, preferredUsername="someone", actortype="Robot")
+            invalid_name = await crud.actor.aget_by_name(db=db, preferredUsername="Not Valid", actortype="Person")
+        await async_engine.dispose()
+        return invalid_type, invalid_name
+
+    assert asyncio.run(lookup()) == (None, None)
@@ -0,0 +1,45 @@
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.schemas import CollectionCreate
+from app.tests.utils.utils import random_lower_string
+
+
+def test_collection_add_and_remove(db: Session) -> None:
+    uri = f"https://example.com/creator/{random_lower_string()}/followers"
+    collection = crud.collection.get_or_create(db, obj_in=CollectionCreate(URI=uri))
+    assert crud.collection.get_or_create(db, obj_in=CollectionCreate(URI=uri)).id == collection.id
+    assert crud.collection.add_item(db, db_obj=collection, item="https://remote.example/users/a")
+    assert not crud.collection.add_item(db, db_obj=collection, item="https://remote.example/users/a")
+    assert crud.collection.add_item(db, db_obj=collection, item="https://remote.example/users/b")
+    assert collection.totalItems == 2
+    assert crud.collection.remove_item(db, db_obj=collection, item="https://remote.example/users/a")
+    assert not crud.collection.remove_item(db, db_obj=collection, item="https://remote.example/users/a")
+    assert collection.totalItems == 1
+
+
+def test_collection_total_not_flushed_again(db: Session) -> None:
+    uri = f"https://example.com/creator/{random_lower_string()}/following"
+    collection = crud.collection.get_or_create(db, obj_in=CollectionCreate(URI=uri))
+    crud.collection._update_total(db, db_obj=collection, change=1)
+    # Already written by the UPDATE, so nothing is left for the next flush to overwrite
+    assert collection.totalItems == 1
+    assert collection not in db.dirty
+    db.rollback()
+
+
+def test_collection_pages(db: Session) -> None:
+    uri = f"https://example.com/creator/{random_lower_string()}/outbox"
+    collection = crud.collection.get_or_create(db, obj_in=CollectionCreate(URI=uri))
+    for i in range(settings.MULTI_MAX + 5):
+        crud.collection.add_item(db, db_obj=collection, item=f"https://example.com/activities/{i}")
+    document = crud.collection.get_collection_document(db_obj=collection, uri=uri)
+    assert document["totalItems"] == settings.MULTI_MAX + 5
+    first = crud.collection.get_page_document(db, db_obj=collection, uri=uri)
+    assert len(first["orderedItems"]) == settings.MULTI_MAX
+    max_id = first["next"].split("max_id=")[1]
+    last = crud.collection.get_page_document(db, db_obj=collection, uri=uri, max_id=max_id)
+    assert len(last["orderedItems"]) == 5
+    assert "next" not in last
+    assert not set(first["orderedItems"]) & set(last["orderedItems"])
@@ -0,0 +1,205 @@
+import os
+import timeit
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+import jinja2
+import pytest
+from emails.template import JinjaTemplate
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import OutboxEmail
+from app.schema_types import EmailPriority
+from app.utilities import email, send_email
+from app.utilities.email import email_templates
+from app.worker.email import deliver_outbox as deliver_emails
+from app.tests.utils.utils import random_email
+
+TEMPLATES_DIR = Path(__file__).parents[2] / "email-templates" / "build"
+
+
+class RecordingResponse:
+    success = True
+    status_code = 250
+    status_text = b"OK"
+    error = None
+
+
+class RecordingBackend:
+    # Stands in for the SMTP server, recording each message sent over the one connection
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.closed = False
+
+    def sendmail(self, from_addr, to_addrs, msg, **kwargs) -> RecordingResponse:
+        msg.as_bytes()
+        self.sent.extend(to_addrs)
+        return RecordingResponse()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _enqueue(db: Session, *, priority: EmailPriority = EmailPriority.normal, **kwargs) -> OutboxEmail:
+    db_obj = OutboxEmail(priority=priority, **kwargs)
+    db.add(db_obj)
+    db.commit()
+    return db_obj
+
+
+@pytest.fixture
+def templates(monkeypatch) -> jinja2.Environment:
+    monkeypatch.setattr(email_templates, "loader", jinja2.FileSystemLoader(TEMPLATES_DIR))
+    return email_templates
+
+
+@pytest.fixture
+def outbox(db: Session, monkeypatch, templates: jinja2.Environment) -> Session:
+    monkeypatch.setattr(settings, "SMTP_HOST", "localhost")
+    monkeypatch.setattr(settings, "SMTP_PORT", 1)
+    monkeypatch.setattr(settings, "SMTP_TLS", False)
+    monkeypatch.setattr(settings, "EMAILS_FROM_EMAIL", "server@example.com")
+    # No broker here, and a prompt left trying to reach one would outlive the test
+    monkeypatch.setattr(email, "prompt_delivery", lambda: None)
+    return db
+
+
+@contextmanager
+def _only_pending(*recipients: str) -> Iterator[None]:
+    # Holds every other pending message locked, so drains skip them as they would another worker's claim
+    with SessionLocal() as other:
+        other.execute(
+            select(OutboxEmail.id)
+            .where(OutboxEmail.sent.is_(None), OutboxEmail.email_to.not_in(recipients))
+            .with_for_update()
+        )
+        yield
+        other.rollback()
+
+
+def test_send_email_renders_and_queues(outbox: Session) -> None:
+    email_to = random_email()
+    send_email(
+        outbox,
+        email_to=email_to,
+        subject="Hello {{ name }}",
+        template="test_email.html",
+        environment={"email": email_to},
+    )
+    db_obj = outbox.query(OutboxEmail).filter(OutboxEmail.email_to == email_to).one()
+    # Subjects may hold creator input, so are never rendered
+    assert db_obj.subject == "Hello {{ name }}"
+    assert email_to in db_obj.html
+    assert db_obj.priority == EmailPriority.normal
+    assert db_obj.sent is None
+
+
+def test_send_email_leaves_the_commit_to_the_caller(outbox: Session, monkeypatch) -> None:
+    prompts = []
+    monkeypatch.setattr(email, "prompt_delivery", lambda: prompts.append(True))
+    email_to = random_email()
+    send_email(outbox, email_to=email_to, subject="", template="test_email.html", environment={"email": email_to})
+    assert prompts == []
+    outbox.rollback()
+    assert not outbox.query(OutboxEmail).filter(OutboxEmail.email_to == email_to).count()
+    # Only a committed message prompts the worker
+    send_email(outbox, email_to=email_to, subject="", template="test_email.html", environment={"email": email_to})
+    outbox.commit()
+    assert prompts == [True]
+
+
+def test_malformed_message_does_not_block(outbox: Session) -> None:
+    recipients = [random_email() for _ in range(2)]
+    _enqueue(outbox, email_to=recipients[0], subject="", html="")
+    _enqueue(outbox, email_to=recipients[1], subject="", html="<p></p>")
+    with _only_pending(*recipients):
+        assert deliver_emails(outbox, backend=RecordingBackend()) == {"sent": 1, "failed": 1}
+
+
+def test_claim_most_urgent_first_and_skip_locked(outbox: Session) -> None:
+    bulk = _enqueue(outbox, email_to=random_email(), subject="", html="", priority=EmailPriority.bulk)
+    urgent = _enqueue(outbox, email_to=random_email(), subject="", html="", priority=EmailPriority.urgent)
+    with _only_pending(bulk.email_to, urgent.email_to):
+        claimed = crud.email.claim(outbox, limit=1)
+        assert [db_obj.id for db_obj in claimed] == [urgent.id]
+        # A concurrent drain skips the claimed message, rather than waiting on it or sending it twice
+        with SessionLocal() as other:
+            assert [db_obj.id for db_obj in crud.email.claim(other)] == [bulk.id]
+            other.rollback()
+        outbox.rollback()
+
+
+def test_deliver_over_one_connection(outbox: Session) -> None:
+    recipients = [random_email() for _ in range(3)]
+    for email_to in recipients:
+        _enqueue(outbox, email_to=email_to, subject="Subject", html="<p>Body</p>")
+    backend = RecordingBackend()
+    with _only_pending(*recipients):
+        assert deliver_emails(outbox, backend=backend) == {"sent": 3, "failed": 0}
+    assert backend.sent == recipients
+    assert backend.closed
+    assert all(db_obj.sent for db_obj in outbox.query(OutboxEmail).filter(OutboxEmail.email_to.in_(recipients)))
+
+
+def test_unreachable_server_retried_with_backoff(outbox: Session) -> None:
+    db_objs = [_enqueue(outbox, email_to=random_email(), subject="", html="<p></p>") for _ in range(2)]
+    with _only_pending(*(db_obj.email_to for db_obj in db_objs)):
+        # Port 1 is never listening, so the batch is deferred after the first attempt
+        assert deliver_emails(outbox) == {"sent": 0, "failed": 2}
+        now = datetime.now(timezone.utc)
+        for db_obj in db_objs:
+            outbox.refresh(db_obj)
+            assert db_obj.sent is None
+            assert db_obj.attempts == 1
+            assert db_obj.error
+            assert db_obj.next_attempt > now
+        assert crud.email.claim(outbox) == []
+        outbox.rollback()
+    outbox.refresh(db_objs[0])
+    crud.email.record_failed(db_obj=db_objs[0], error="again")
+    assert (db_objs[0].next_attempt - now).total_seconds() > settings.EMAIL_RETRY_SECONDS * 1.5
+    outbox.rollback()
+
+
+def test_templates_compiled_once(templates: jinja2.Environment) -> None:
+    assert templates.get_template("magic_login.html") is templates.get_template("magic_login.html")
+
+
+@pytest.mark.parametrize("reload", [True, False])
+def test_template_reloaded_only_in_development(
+    templates: jinja2.Environment, monkeypatch, tmp_path, reload: bool
+) -> None:
+    monkeypatch.setattr(templates, "loader", jinja2.FileSystemLoader(tmp_path))
+    monkeypatch.setattr(templates, "auto_reload", reload)
+    path = tmp_path / "message.html"
+    path.write_text("first {{ link }}")
+    assert templates.get_template("message.html").render(link="x") == "first x"
+    path.write_text("second {{ link }}")
+    mtime = path.stat().st_mtime + 10
+    os.utime(path, (mtime, mtime))
+    assert templates.get_template("message.html").render(link="x") == ("second x" if reload else "first x")
+
+
+def test_template_render_rate(templates: jinja2.Environment) -> None:
+    # Benchmark: messages rendered per second, reading and compiling the template for each as before, against reuse
+    environment = {"project_name": "Project", "valid_minutes": 15, "link": "https://example.com/?magic=token"}
+
+    def compile_each() -> str:
+        with open(TEMPLATES_DIR / "magic_login.html") as f:
+            return JinjaTemplate(f.read()).render(**environment)
+
+    def precompiled() -> str:
+        return templates.get_template("magic_login.html").render(**environment)
+
+    assert compile_each() == precompiled()
+    number = 200
+    per_compiled = timeit.timeit(compile_each, number=number) / number
+    per_cached = timeit.timeit(precompiled, number=number) / number
+    print(f"magic login email: compiled each time {1 / per_compiled:.0f}/s, precompiled {1 / per_cached:.0f}/s")
+    assert per_cached < per_compiled
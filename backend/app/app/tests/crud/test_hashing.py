@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from passlib.hash import argon2
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.calibrate_hashing import MIN_MEMORY_COST, MIN_TIME_COST, calibrate
+from app.core import security
+from app.core.hashing import HashExecutor, HashingRejected, HashingTimeout, hashing
+from app.main import app
+from app.tests.utils.utils import random_email
+
+
+def test_password_hash_round_trip() -> None:
+    completed = hashing.metrics.completed
+    hashed = security.get_password_hash("correct horse")
+    assert security.verify_password(plain_password="correct horse", hashed_password=hashed)
+    assert not security.verify_password(plain_password="wrong horse", hashed_password=hashed)
+    assert hashing.metrics.completed == completed + 3
+    assert hashing.metrics.as_dict()["duration_avg"] > 0
+
+
+def test_full_queue_rejected_and_slow_queue_timed_out() -> None:
+    executor = HashExecutor(workers=1, queue_size=1, timeout=0.2)
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=3) as callers:
+        running = callers.submit(executor.run, release.wait, 5)
+        time.sleep(0.05)
+        queued = callers.submit(executor.run, lambda: "queued")
+        time.sleep(0.05)
+        # One running and one queued fill every slot
+        with pytest.raises(HashingRejected) as e:
+            executor.run(lambda: "rejected")
+        assert e.value.status_code == 429
+        with pytest.raises(HashingTimeout):
+            queued.result()
+        release.set()
+        assert running.result() is True
+    metrics = executor.metrics.as_dict()
+    assert metrics["rejected"] == 1
+    assert metrics["timed_out"] == 1
+    assert metrics["completed"] == 1
+    assert metrics["in_flight"] == 0
+    # Slots are returned, so the executor accepts work again
+    assert executor.run(lambda: "ok") == "ok"
+
+
+def test_rejection_is_shed_with_retry_after(db: Session, monkeypatch) -> None:
+    email = random_email()
+    crud.creator.create(db, obj_in=schemas.CreatorCreate(email=email, password="correct horse"))
+
+    def busy(*args, **kwargs):
+        raise HashingRejected()
+
+    monkeypatch.setattr(hashing, "run", busy)
+    response = TestClient(app).post("/oauth/login", data={"username": email, "password": "correct horse"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"]
+
+
+def test_outdated_hash_rehashed_on_login(db: Session) -> None:
+    email = random_email()
+    creator = crud.creator.create(db, obj_in=schemas.CreatorCreate(email=email))
+    outdated = argon2.using(memory_cost=MIN_MEMORY_COST, rounds=MIN_TIME_COST, parallelism=1).hash("correct horse")
+    crud.creator.update_columns(db, db_obj=creator, values={"hashed_password": outdated})
+    assert security.pwd_context.needs_update(outdated)
+    assert not crud.creator.authenticate(db, email=email, password="wrong horse")
+    assert crud.creator.get_by_email(db, email=email).hashed_password == outdated
+    creator = crud.creator.authenticate(db, email=email, password="correct horse")
+    assert creator.hashed_password != outdated
+    assert not security.pwd_context.needs_update(creator.hashed_password)
+    # The new hash is stored, and is kept on the next login
+    stored = creator.hashed_password
+    db.expire_all()
+    assert crud.creator.authenticate(db, email=email, password="correct horse").hashed_password == stored
+
+
+def test_calibration_keeps_owasp_minimums() -> None:
+    # An unreachable target still gives the minimums, never weaker
+    result = calibrate(target=0.0, workers=1, rounds=1)
+    assert result["memory_cost"] == MIN_MEMORY_COST
+    assert result["time_cost"] == MIN_TIME_COST
+    assert result["parallelism"] >= 1
+    result = calibrate(target=result["seconds"] * 3, workers=1, max_memory_cost=MIN_MEMORY_COST * 2, rounds=1)
+    assert result["memory_cost"] >= MIN_MEMORY_COST
+    assert result["time_cost"] >= MIN_TIME_COST
@@ -0,0 +1,59 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ulid import ULID
+
+from app import crud
+from app.models import Actor, Creator
+from app.schemas import CollectionCreate
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+def _create_local_actor(db: Session) -> Actor:
+    creator = Creator(id=str(ULID()), email=random_email())
+    name = random_lower_string()
+    uri = f"https://local.example/creator/{name}"
+    actor = Actor(
+        id=str(ULID()),
+        preferredUsername=name,
+        domain="local.example",
+        inbox=f"{uri}/inbox",
+        outbox=f"{uri}/outbox",
+        URI=uri,
+        publicKey=f"key-{name}",
+        publicKeyURI=f"{uri}#main-key",
+        creator=creator,
+    )
+    db.add_all([creator, actor])
+    db.commit()
+    return actor
+
+
+def test_node_stats_maintained_by_triggers(db: Session) -> None:
+    before = dict(crud.stats.refresh(db))
+    actor = _create_local_actor(db)
+    outbox = crud.collection.get_or_create(db, obj_in=CollectionCreate(URI=actor.outbox, actor_id=actor.id))
+    crud.collection.add_item(db, db_obj=outbox, item=f"{actor.URI}/activities/1")
+    crud.collection.add_item(db, db_obj=outbox, item=f"{actor.URI}/activities/2")
+    crud.stats.clear_cache()
+    stats = crud.stats.get_all(db)
+    assert stats["users_total"] == before["users_total"] + 1
+    assert stats["local_posts"] == before["local_posts"] + 2
+    # The triggers and a full recount agree on the totals; only the rolling windows wait for the job
+    recount = crud.stats.refresh(db)
+    assert recount["users_total"] == stats["users_total"]
+    assert recount["local_posts"] == stats["local_posts"]
+    assert recount["users_active_month"] == before["users_active_month"] + 1
+
+
+def test_nodeinfo_served_from_cache(db: Session) -> None:
+    crud.stats.refresh(db)
+    crud.pub.get_wellknown_nodeinfo(db=db)
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        nodeinfo = crud.pub.get_wellknown_nodeinfo(db=db)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert not statements
+    assert nodeinfo.usage.localPosts is not None
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.crud.base import decode_cursor, encode_cursor
+from app.models import Collection
+from app.schemas import CollectionCreate
+from app.tests.utils.utils import random_lower_string
+
+
+def test_cursor_round_trip() -> None:
+    key = "01HZY3Q4Z4M0ZJ5V6W7X8Y9ZAB"
+    assert decode_cursor(encode_cursor(key)) == key
+    with pytest.raises(ValueError):
+        decode_cursor("%%%")
+
+
+def test_get_page_walks_every_row_once(db: Session) -> None:
+    for _ in range(settings.MULTI_MAX + 1):
+        crud.collection.get_or_create(
+            db, obj_in=CollectionCreate(URI=f"https://example.com/creator/{random_lower_string()}/liked")
+        )
+    total = db.scalar(select(func.count()).select_from(Collection))
+    seen = []
+    db_objs, cursor = crud.collection.get_page(db)
+    seen.extend(db_objs)
+    while cursor:
+        db_objs, cursor = crud.collection.get_page(db, cursor=cursor)
+        assert len(db_objs) <= settings.MULTI_MAX
+        seen.extend(db_objs)
+    ids = [db_obj.id for db_obj in seen]
+    assert len(ids) == total
+    assert ids == sorted(set(ids))
@@ -0,0 +1,49 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool, get_engine_options, get_pool_metrics
+from app.db.session import SessionLocal, async_engine, engine
+
+
+def test_pool_options_from_settings() -> None:
+    options = get_engine_options()
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == settings.POSTGRES_POOL_SIZE
+    assert options["max_overflow"] == settings.POSTGRES_MAX_OVERFLOW
+    assert options["pool_recycle"] == settings.POSTGRES_POOL_RECYCLE
+    assert options["pool_pre_ping"]
+    assert "connect_args" not in options
+
+
+def test_pool_pgbouncer_options(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "POSTGRES_PGBOUNCER", True)
+    assert get_engine_options()["connect_args"] == {"prepare_threshold": None}
+    monkeypatch.setattr(settings, "POSTGRES_POOL_SIZE", 0)
+    assert get_engine_options()["poolclass"] is NullPool
+
+
+def test_pool_metrics_checkouts() -> None:
+    engine.pool.metrics.reset()
+    for _ in range(3):
+        with SessionLocal() as db:
+            assert db.execute(text("select 1")).scalar_one() == 1
+    metrics = get_pool_metrics()["sync"]
+    assert metrics["checkouts"] == 3
+    assert metrics["checkins"] == 3
+    assert metrics["checked_out"] == 0
+    assert metrics["wait_max"] >= 0.0
+
+
+def test_pool_metrics_per_engine() -> None:
+    assert engine.pool.metrics is not async_engine.pool.metrics
+    other = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **get_engine_options())
+    checkouts = engine.pool.metrics.checkouts
+    with other.connect() as connection:
+        connection.execute(text("select 1"))
+    assert engine.pool.metrics.checkouts == checkouts
+    # Counters carry on when the engine replaces its pool
+    metrics = other.pool.metrics
+    other.dispose()
+    assert other.pool.metrics is metrics
+    other.dispose()
@@ -0,0 +1,87 @@
+import pytest
+import redis
+from fastapi import HTTPException
+from fastapi.security import SecurityScopes
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.api import deps
+from app.core import security
+from app.core.config import settings
+from app.core.principal import PrincipalCache, principals
+from app.main import app
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+def _redis_available() -> bool:
+    try:
+        return principals.client.ping()
+    except redis.RedisError:
+        return False
+
+
+requires_redis = pytest.mark.skipif(not _redis_available(), reason="Redis is not reachable")
+
+
+def _get_token(db: Session, *scopes: str) -> tuple[str, str]:
+    creator = crud.creator.create(db, obj_in=schemas.CreatorCreate(email=random_email()))
+    return creator.id, security.create_access_token(subject=creator.id, security_scopes=SecurityScopes(list(scopes)))
+
+
+@requires_redis
+def test_cached_principal_needs_no_queries(db: Session) -> None:
+    creator_id, token = _get_token(db, "read")
+    principal = deps.get_current_principal(db, token)
+    assert str(principal.id) == creator_id
+    assert principal.scopes == ["read"]
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        assert deps.get_current_principal(db, token) == principal
+        assert deps.get_current_active_principal(deps.get_current_principal(db, token)) == principal
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert statements == []
+    with pytest.raises(HTTPException) as e:
+        deps.get_current_principal(db, token, SecurityScopes(["admin"]))
+    assert e.value.status_code == 401
+
+
+@requires_redis
+def test_revoke_rejects_access_tokens(db: Session) -> None:
+    email, password = random_email(), random_lower_string()
+    crud.creator.create(db, obj_in=schemas.CreatorCreate(email=email, password=password))
+    client = TestClient(app)
+    tokens = client.post("/oauth/login", data={"username": email, "password": password}).json()
+    access = {"Authorization": f"Bearer {tokens['access_token']}"}
+    # Cached on first use, as after any earlier request
+    assert client.get(f"{settings.API_V1_STR}/creators/", headers=access).status_code == 200
+    r = client.post("/oauth/revoke", headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+    assert r.status_code == 200
+    assert client.get(f"{settings.API_V1_STR}/creators/", headers=access).status_code == 401
+    # A later login is unaffected
+    tokens = client.post("/oauth/login", data={"username": email, "password": password}).json()
+    access = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get(f"{settings.API_V1_STR}/creators/", headers=access).status_code == 200
+
+
+@requires_redis
+def test_creator_update_invalidates_principal(db: Session) -> None:
+    creator_id, token = _get_token(db)
+    assert deps.get_current_principal(db, token).is_active
+    crud.creator.update(db, db_obj=crud.creator.get(db, id=creator_id), obj_in={"is_active": False})
+    assert not deps.get_current_principal(db, token).is_active
+    with pytest.raises(HTTPException):
+        deps.get_current_active_principal(deps.get_current_principal(db, token))
+
+
+def test_unreachable_redis_refuses(db: Session, monkeypatch) -> None:
+    # Port 1 is never listening
+    monkeypatch.setattr(deps, "principals", PrincipalCache(redis.Redis(port=1, socket_connect_timeout=1)))
+    _, token = _get_token(db)
+    with pytest.raises(HTTPException) as e:
+        deps.get_current_principal(db, token)
+    assert e.value.status_code == 503
@@ -0,0 +1,58 @@
+from sqlalchemy import delete, text
+from sqlalchemy.orm import Session
+from ulid import ULID
+
+from app.core.config import settings
+from app.db import replica
+from app.db.pool import get_pool_metrics
+from app.db.replica import ReplicaRouter
+from app.models import Creator
+from app.tests.utils.utils import random_email
+
+
+def _port(session: Session) -> int:
+    return session.execute(text("SELECT inet_server_port()")).scalar()
+
+
+def test_replica_router_skips_unreachable_and_lagging(monkeypatch) -> None:
+    # The primary stands in for a healthy replica; port 1 is never listening
+    uri = str(settings.SQLALCHEMY_DATABASE_URI)
+    router = ReplicaRouter([uri, uri.replace(f":{settings.POSTGRES_PORT}/", ":1/")])
+    router.check_lag()
+    assert router.replicas[0].lag == 0
+    assert router.replicas[1].lag is None
+    checkouts = get_pool_metrics()["sync"]["checkouts"]
+    for _ in range(3):
+        with router.get_session() as db:
+            assert db.get_bind() is router.replicas[0].engine
+            db.execute(text("SELECT 1"))
+    # Counted against the replica, not the primary
+    metrics = get_pool_metrics()
+    assert metrics[f"replica:{settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}:sync"]["checkouts"] >= 3
+    assert metrics["sync"]["checkouts"] == checkouts
+    monkeypatch.setattr(settings, "POSTGRES_REPLICA_MAX_LAG", -1)
+    with router.get_session() as db:
+        assert db.get_bind() is not router.replicas[0].engine
+
+
+def test_replica_router_sticky_after_write() -> None:
+    router = ReplicaRouter([str(settings.SQLALCHEMY_DATABASE_URI)])
+    router.check_lag()
+    state = {"sticky_until": 0.0, "wrote": False}
+    creator_id = str(ULID())
+    token = replica._request_state.set(state)
+    try:
+        with router.get_session() as db:
+            assert db.get_bind() is router.replicas[0].engine
+        with replica.SessionLocal() as db:
+            db.add(Creator(id=creator_id, email=random_email()))
+            db.commit()
+        assert state["wrote"]
+        with router.get_session() as db:
+            assert db.get_bind() is not router.replicas[0].engine
+            assert _port(db) == settings.POSTGRES_PORT
+    finally:
+        replica._request_state.reset(token)
+        with replica.SessionLocal() as db:
+            db.execute(delete(Creator).where(Creator.id == creator_id))
+            db.commit()
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+import redis
+from celery import Celery
+from ulid import ULID
+
+from app.core import celery_app as celery_module
+from app.core import scheduling
+from app.core.celery_app import IO_QUEUE, PRIORITY_STEPS, PriorityTask, TaskPriority, celery_app, get_broker_priority
+from app.core.config import settings
+from app.core.scheduling import FairShare, QueueLatency
+import app.worker  # noqa: F401
+
+
+def _redis_available() -> bool:
+    try:
+        return scheduling.queue_latency.client.ping()
+    except redis.RedisError:
+        return False
+
+
+requires_redis = pytest.mark.skipif(not _redis_available(), reason="Redis is not reachable")
+unreachable = redis.Redis(port=1, socket_connect_timeout=1)
+
+
+@pytest.mark.parametrize("redis_broker", [False, True])
+def test_classes_never_overlap(monkeypatch, redis_broker: bool) -> None:
+    monkeypatch.setattr(celery_module, "_REDIS_BROKER", redis_broker)
+    # Ordered most urgent first, in the order each broker takes them
+    order = [
+        get_broker_priority(priority, demotion) for priority in TaskPriority for demotion in range(PRIORITY_STEPS + 1)
+    ]
+    assert order == sorted(order, reverse=not redis_broker)
+    # The most demoted interactive task still goes before any normal one
+    assert order.index(get_broker_priority(TaskPriority.interactive, 5)) < order.index(
+        get_broker_priority(TaskPriority.normal)
+    )
+
+
+def test_task_class_sets_priority_and_rate_limit(monkeypatch) -> None:
+    monkeypatch.setitem(settings.WORKER_RATE_LIMITS, "bulk", "50/s")
+    # Registered apart from the worker's own tasks
+    test_app = Celery("test", task_cls=PriorityTask)
+
+    @test_app.task(priority_class=TaskPriority.bulk, shared=False)
+    def backfill() -> None:
+        pass
+
+    assert backfill.priority == get_broker_priority(TaskPriority.bulk)
+    assert backfill.rate_limit == "50/s"
+    assert celery_app.tasks["app.worker.email.deliver_emails"].priority_class == TaskPriority.interactive
+
+
+def test_published_with_priority_and_queued_at(monkeypatch) -> None:
+    monkeypatch.setattr(scheduling, "fair_share", FairShare(unreachable))
+    task = celery_app.tasks["app.worker.tests.test_celery"]
+    with celery_app.connection_for_write("memory://") as connection:
+        monkeypatch.setattr(celery_app, "connection_for_write", lambda *args, **kwargs: connection)
+        # Fair share fails open, to the class priority
+        scheduling.dispatch(task, "word", actor="https://example.com/actor")
+        message = connection.SimpleQueue(IO_QUEUE).get(timeout=1)
+    assert message.properties["priority"] == get_broker_priority(TaskPriority.normal)
+    assert time.time() - message.headers["queued_at"] < 5
+
+
+def test_unreachable_redis_fails_open() -> None:
+    assert FairShare(unreachable).get_demotion("https://example.com/actor") == 0
+    QueueLatency(unreachable).record(TaskPriority.normal, 1.0)
+
+
+@requires_redis
+def test_busy_actor_demoted(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "WORKER_FAIR_SHARE_BURST", 2)
+    actor = f"https://example.com/actor/{time.time()}"
+    assert [scheduling.fair_share.get_demotion(actor) for _ in range(4)] == [0, 0, 1, 1]
+
+
+@requires_redis
+def test_queue_latency_against_slo(monkeypatch) -> None:
+    # Counted apart from the workers' totals, which are left as they are
+    queue_latency = QueueLatency(scheduling.queue_latency.client, prefix=f"test:{ULID()}:")
+    monkeypatch.setattr(scheduling, "queue_latency", queue_latency)
+    try:
+        queue_latency.record(TaskPriority.interactive, 0.5)
+        queue_latency.record(TaskPriority.interactive, settings.WORKER_LATENCY_SLO["interactive"] + 1)
+        metrics = scheduling.get_queue_latency_metrics()["interactive"]
+        assert metrics["count"] == 2
+        assert metrics["breaches"] == 1
+        assert metrics["within_slo"] == 0.5
+    finally:
+        queue_latency.reset()
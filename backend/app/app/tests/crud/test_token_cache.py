@@ -0,0 +1,64 @@
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.api import deps
+from app.core.config import settings
+from app.core.security import TokenPayloadCache, token_cache
+from app.db.types import new_ulid
+
+
+def _encode(**claims) -> str:
+    claims = {"sub": new_ulid(), "totp": False, **claims}
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.JWT_ALGO)
+
+
+def test_payload_decoded_once() -> None:
+    token = _encode(exp=int(time.time()) + 60, scopes=["read"])
+    hits = token_cache.hits
+    payload = deps.get_token_payload(token)
+    assert payload.scopes == ["read"]
+    assert deps.get_token_payload(token) is payload
+    assert token_cache.hits == hits + 1
+    token_cache.discard(token)
+    assert deps.get_token_payload(token) is not payload
+
+
+def test_invalid_token_not_cached() -> None:
+    token = _encode(exp=int(time.time()) + 60)[:-2] + "xx"
+    for _ in range(2):
+        with pytest.raises(HTTPException) as e:
+            deps.get_token_payload(token)
+        assert e.value.status_code == 403
+    assert token_cache.get(token) is None
+
+
+def test_entry_ends_at_token_expiry(monkeypatch) -> None:
+    cache = TokenPayloadCache(maxsize=8, ttl=300)
+    monkeypatch.setattr(deps.security, "token_cache", cache)
+    now = time.time()
+    token = _encode(exp=int(now) + 2)
+    deps.get_token_payload(token)
+    assert cache.get(token)
+    monkeypatch.setattr(time, "time", lambda: now + 3)
+    assert cache.get(token) is None
+    monkeypatch.undo()
+    # An expired token is refused by the decode, and never cached
+    token = _encode(exp=int(now) - 1)
+    with pytest.raises(HTTPException):
+        deps.get_token_payload(token)
+    assert token_cache.get(token) is None
+
+
+def test_bounded_least_recently_used() -> None:
+    cache = TokenPayloadCache(maxsize=2, ttl=300)
+    tokens = [_encode() for _ in range(3)]
+    for token in tokens[:2]:
+        cache.set(token, deps.get_token_payload(token))
+    assert cache.get(tokens[0])
+    cache.set(tokens[2], deps.get_token_payload(tokens[2]))
+    # The second token was used least recently
+    assert cache.get(tokens[1]) is None
+    assert cache.get(tokens[0]) and cache.get(tokens[2])
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ulid import ULID
+
+from app import crud
+from app.crud.base import encode_cursor
+from app.db.types import ulid_floor, validate_ulid
+from app.schemas import CollectionCreate
+from app.tests.utils.utils import random_lower_string
+
+
+def _create(db: Session):
+    return crud.collection.get_or_create(
+        db, obj_in=CollectionCreate(URI=f"https://example.com/creator/{random_lower_string()}/liked")
+    )
+
+
+def test_ids_are_per_row_and_stored_as_uuid(db: Session) -> None:
+    first = _create(db)
+    second = _create(db)
+    assert first.id != second.id
+    assert first.id < second.id
+    stored = db.execute(text("SELECT id FROM collection WHERE id = :id"), {"id": ULID.from_str(first.id).to_uuid()})
+    assert ULID.from_uuid(stored.scalar_one()) == ULID.from_str(first.id)
+    assert db.execute(text("SELECT pg_column_size(id) FROM collection LIMIT 1")).scalar_one() == 16
+
+
+def test_ulid_floor_orders_by_time() -> None:
+    now = datetime.now(tz=timezone.utc)
+    assert ulid_floor(now - timedelta(seconds=1)) < str(ULID())
+    assert ULID.from_str(ulid_floor(now)).milliseconds == int(now.timestamp() * 1000)
+    # Naive moments are UTC, whatever the server's local time
+    assert ulid_floor(now.replace(tzinfo=None)) == ulid_floor(now)
+
+
+def test_get_multi_since(db: Session) -> None:
+    _create(db)
+    since = datetime.now(tz=timezone.utc) + timedelta(milliseconds=5)
+    while datetime.now(tz=timezone.utc) < since:
+        pass
+    created = {_create(db).id for _ in range(3)}
+    assert {c.id for c in crud.collection.get_multi(db, since=since, page_break=True)} == created
+
+
+def test_invalid_ids_rejected(db: Session) -> None:
+    with pytest.raises(ValueError):
+        validate_ulid("bench1")
+    with pytest.raises(ValueError):
+        crud.collection.get_multi(db, cursor=encode_cursor("bench1"))
@@ -0,0 +1,78 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ulid import ULID
+
+from app import crud
+from app.models import Creator, Token
+from app.schemas import NewTOTP
+from app.tests.utils.utils import random_email
+
+
+def _create_creator(db: Session) -> Creator:
+    db_obj = Creator(id=str(ULID()), email=random_email())
+    db.add(db_obj)
+    db.commit()
+    db.refresh(db_obj)
+    return db_obj
+
+
+def test_update_columns_is_one_statement(db: Session) -> None:
+    creator = _create_creator(db)
+    modified = creator.modified
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        creator = crud.creator.validate_email(db, db_obj=creator)
+        # Everything was repopulated from RETURNING, so reading it does not reload
+        assert creator.email_validated
+        assert creator.modified > modified
+        assert creator.email
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE creator SET")
+
+
+def test_update_totp_counter_only_moves_forward(db: Session) -> None:
+    creator = _create_creator(db)
+    totp_in = NewTOTP(secret="secret", key="key", uri="uri")
+    creator = crud.creator.activate_totp(db, db_obj=creator, totp_in=totp_in, new_counter=10)
+    assert creator.totp_secret == "secret"
+    assert creator.totp_counter == 10
+    assert crud.creator.update_totp_counter(db, db_obj=creator, new_counter=10) is None
+    assert crud.creator.update_totp_counter(db, db_obj=creator, new_counter=11).totp_counter == 11
+    creator = crud.creator.deactivate_totp(db, db_obj=creator)
+    assert creator.totp_secret is None and creator.totp_counter is None
+
+
+def test_update_ignores_non_columns(db: Session) -> None:
+    creator = _create_creator(db)
+    creator = crud.creator.update(db, db_obj=creator, obj_in={"is_moderator": True, "original": "ignored"})
+    assert creator.is_moderator
+
+
+def test_update_expired_instance_without_reload(db: Session) -> None:
+    creator = _create_creator(db)
+    db.expire(creator)
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        creator = crud.creator.update(db, db_obj=creator, obj_in={"is_moderator": True})
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert len(statements) == 1
+    assert creator.is_moderator
+
+
+def test_update_sets_relationships(db: Session) -> None:
+    creator, other = _create_creator(db), _create_creator(db)
+    token = Token(token=random_email(), authenticates_id=creator.id)
+    db.add(token)
+    db.commit()
+    token = crud.token.update(db, db_obj=token, obj_in={"scopes": "read", "authenticates": other})
+    assert token.scopes == "read"
+    assert token.authenticates_id == other.id
+    db.delete(token)
+    db.commit()
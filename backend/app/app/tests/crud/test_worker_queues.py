@@ -0,0 +1,41 @@
+import pytest
+
+from app.core.celery_app import CPU_QUEUE, EMAIL_QUEUE, IO_QUEUE, MAIN_QUEUE, celery_app, get_worker_arguments
+import app.worker  # noqa: F401
+
+
+def _get_queue(name: str) -> str:
+    task = celery_app.tasks[name]
+    return celery_app.amqp.router.route(task._get_exec_options(), name)["queue"].name
+
+
+@pytest.mark.parametrize(
+    "name,queue",
+    [
+        ("app.worker.email.deliver_emails", EMAIL_QUEUE),
+        ("app.worker.tests.test_celery", IO_QUEUE),
+        ("app.worker.stats.refresh_node_stats", MAIN_QUEUE),
+    ],
+)
+def test_tasks_routed_by_kind(name: str, queue: str) -> None:
+    assert _get_queue(name) == queue
+
+
+def test_send_task_by_name_routed() -> None:
+    # As the API prompts email delivery, without importing the worker
+    route = celery_app.amqp.router.route({}, "app.worker.email.deliver_emails")
+    assert route["queue"].name == EMAIL_QUEUE
+
+
+def test_worker_profiles() -> None:
+    arguments = get_worker_arguments("io")
+    assert arguments[arguments.index("-Q") + 1] == IO_QUEUE
+    assert arguments[arguments.index("-P") + 1] == "threads"
+    assert "-B" not in arguments
+    arguments = get_worker_arguments("cpu")
+    assert arguments[arguments.index("-Q") + 1] == CPU_QUEUE
+    assert arguments[arguments.index("-P") + 1] == "prefork"
+    assert int(arguments[arguments.index("-c") + 1]) >= 1
+    # Beat runs in exactly one deployed profile
+    assert "-B" in get_worker_arguments("main")
+    assert set(get_worker_arguments("all")[1].split(",")) == {MAIN_QUEUE, CPU_QUEUE, IO_QUEUE, EMAIL_QUEUE}
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.worker.runtime import async_task, runtime
+
+in_flight = {"now": 0, "peak": 0}
+
+
+@async_task()
+async def wait_for_io(seconds: float) -> int:
+    # Stands in for a fetch or delivery: all waiting, no work
+    in_flight["now"] += 1
+    in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        in_flight["now"] -= 1
+    return id(runtime.client)
+
+
+@async_task()
+async def query_database(seconds: float = 0) -> int:
+    async with runtime.session() as db:
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        try:
+            return (await db.execute(text("SELECT 1 FROM pg_sleep(:seconds)"), {"seconds": seconds})).scalar_one()
+        finally:
+            in_flight["now"] -= 1
+
+
+@pytest.fixture(scope="module", autouse=True)
+def stopped_runtime():
+    yield
+    # Leave no connections bound to the runtime's loop for other tests
+    runtime.stop()
+
+
+def test_coroutine_task_runs_on_the_loop() -> None:
+    assert wait_for_io.name == "app.tests.crud.test_worker_runtime.wait_for_io"
+    assert wait_for_io.apply(args=[0]).get() == wait_for_io(0)
+    assert query_database() == 1
+
+
+def test_thousands_of_jobs_in_flight() -> None:
+    jobs = 1000
+    in_flight["peak"] = 0
+    start = time.perf_counter()
+    # As a `threads` pool would run them: each thread only waits while the loop does the I/O
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        clients = set(pool.map(lambda _: wait_for_io(0.5), range(jobs)))
+    elapsed = time.perf_counter() - start
+    print(f"{jobs} concurrent jobs of 0.5 s in {elapsed:.2f} s, peak in flight {in_flight['peak']}")
+    assert in_flight["peak"] > jobs / 2
+    assert elapsed < 10
+    # One shared HTTP client
+    assert len(clients) == 1
+
+
+def test_database_jobs_queue_for_the_pool(monkeypatch) -> None:
+    runtime.stop()
+    monkeypatch.setattr(settings, "POSTGRES_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "POSTGRES_MAX_OVERFLOW", 1)
+    in_flight["peak"] = 0
+    # Far more jobs than connections, none of which times out waiting for one
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        results = list(pool.map(lambda _: query_database(0.02), range(50)))
+    assert results == [1] * 50
+    assert in_flight["peak"] == 3
+    runtime.stop()
+
+
+def test_timeout_cancels_the_coroutine() -> None:
+    cancelled = asyncio.Event()
+
+    async def hang() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(TimeoutError):
+        runtime.run(hang(), timeout=0.1)
+    time.sleep(0.1)
+    assert cancelled.is_set()
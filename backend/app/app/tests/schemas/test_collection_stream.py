@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.schemas.activitypubdantic import CollectionPageParser, get_collection_items, get_page_items
+
+
+def _chunked(data: bytes, size: int = 7) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def _page(start: int, stop: int, next: str = None) -> bytes:
+    page = {
+        "@context": "https://www.w3.org/ns/activitystreams",
+        "type": "OrderedCollectionPage",
+        "orderedItems": [f"https://example.com/actors/{i}" for i in range(start, stop)],
+        "totalItems": 1000000,
+    }
+    if next:
+        page["next"] = next
+    return json.dumps(page).encode()
+
+
+def test_page_items_streamed_in_order() -> None:
+    parser = CollectionPageParser()
+    items = list(get_page_items(_chunked(_page(0, 50, next="https://example.com/p/2")), parser=parser))
+    assert [str(i.id) for i in items] == [f"https://example.com/actors/{i}" for i in range(50)]
+    assert parser.properties["next"] == "https://example.com/p/2"
+    assert parser.properties["totalItems"] == 1000000
+
+
+def test_page_items_validated_by_type() -> None:
+    data = json.dumps(
+        {
+            "type": "OrderedCollectionPage",
+            "orderedItems": [
+                {"type": "Note", "id": "https://example.com/n/1", "content": "é ü"},
+                {"href": "https://example.com/l/1"},
+            ],
+        }
+    ).encode()
+    items = list(get_page_items(_chunked(data, size=3)))
+    assert items[0].type == "Note"
+    assert items[0].content == "é ü"
+    assert str(items[1].href) == "https://example.com/l/1"
+
+
+def test_page_buffer_stays_bounded() -> None:
+    parser = CollectionPageParser(max_item_size=1024)
+    for chunk in _chunked(_page(0, 5000), size=512):
+        parser.feed(chunk)
+        assert len(parser._buffer) <= 1024
+    parser.close()
+
+
+def test_page_oversized_item_rejected() -> None:
+    data = json.dumps({"type": "OrderedCollectionPage", "orderedItems": [{"content": "x" * 4096}]}).encode()
+    with pytest.raises(ValueError):
+        list(get_page_items(_chunked(data, size=256), max_item_size=1024))
+
+
+def test_page_item_size_counted_in_bytes() -> None:
+    # 400 characters, but 800 bytes once encoded
+    data = json.dumps({"type": "OrderedCollectionPage", "orderedItems": [{"content": "é" * 400}]}, ensure_ascii=False)
+    with pytest.raises(ValueError):
+        list(get_page_items(_chunked(data.encode(), size=128), max_item_size=600))
+
+
+def test_embedded_first_page_streamed() -> None:
+    collection = {
+        "type": "OrderedCollection",
+        "totalItems": 5000,
+        "first": json.loads(_page(0, 5000, next="https://example.com/p/2")),
+    }
+    parser = CollectionPageParser(max_item_size=1024)
+    items = list(get_page_items(_chunked(json.dumps(collection).encode(), size=512), parser=parser))
+    assert [str(i.id) for i in items] == [f"https://example.com/actors/{i}" for i in range(5000)]
+    assert parser.properties["first"]["next"] == "https://example.com/p/2"
+    assert "orderedItems" not in parser.properties["first"]
+    assert parser.properties["totalItems"] == 5000
+
+
+def test_page_truncated_rejected() -> None:
+    with pytest.raises(ValueError):
+        list(get_page_items([_page(0, 3)[:-10]]))
+
+
+def test_collection_items_follow_next() -> None:
+    pages = {
+        "https://example.com/followers": json.dumps(
+            {"type": "OrderedCollection", "totalItems": 6, "first": "https://example.com/followers?page=1"}
+        ).encode(),
+        "https://example.com/followers?page=1": _page(0, 3, next="https://example.com/followers?page=2"),
+        "https://example.com/followers?page=2": _page(3, 6, next="https://example.com/followers?page=1"),
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=pages[str(request.url)])
+
+    async def collect() -> list:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [i async for i in get_collection_items("https://example.com/followers", client=client)]
+
+    items = asyncio.run(collect())
+    assert [str(i.id) for i in items] == [f"https://example.com/actors/{i}" for i in range(6)]
+
+
+def test_collection_items_follow_embedded_first_page() -> None:
+    first = json.loads(_page(0, 3, next="https://example.com/followers?page=2"))
+    pages = {
+        "https://example.com/followers": json.dumps({"type": "OrderedCollection", "first": first}).encode(),
+        "https://example.com/followers?page=2": _page(3, 6),
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=pages[str(request.url)])
+
+    async def collect() -> list:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [i async for i in get_collection_items("https://example.com/followers", client=client)]
+
+    items = asyncio.run(collect())
+    assert [str(i.id) for i in items] == [f"https://example.com/actors/{i}" for i in range(6)]
@@ -0,0 +1,73 @@
+import pickle
+import tracemalloc
+
+from app.schemas.activitypubdantic import get_class, get_model
+
+CREATE = {
+    "type": "Create",
+    "id": "https://example.com/c/1",
+    "actor": "https://example.com/u/1",
+    "to": ["https://www.w3.org/ns/activitystreams#Public"],
+    "bcc": ["https://example.com/u/2"],
+    "object": {"type": "Note", "id": "https://example.com/n/1", "contentMap": {"en": "Hello " * 50}},
+}
+
+
+def test_class_is_model_backed() -> None:
+    activity = get_class(CREATE)
+    assert type(activity).__dictoffset__ == 0
+    assert str(activity.id) == "https://example.com/c/1"
+    activity.make_public()
+    assert activity.model.bcc is None
+    assert "bcc" not in activity.data()
+
+
+def test_class_maps_default_language() -> None:
+    note = get_class({"type": "Note", "id": "https://example.com/n/2", "contentMap": {"fr": "Salut", "en": "Hi"}})
+    assert note.content == "Hi"
+    assert note.data()["content"] == "Hi"
+    note.content = "Hello"
+    assert note.data()["content"] == "Hello"
+
+
+def test_class_input_unmodified_by_default_language() -> None:
+    note = get_class({"type": "Note", "id": "https://example.com/n/3", "content": "Hey", "contentMap": {"en": "Hi"}})
+    assert note.content == "Hi"
+    assert note.data(use_input_json=True)["content"] == "Hey"
+    assert note.model.content == "Hey"
+
+
+def test_collection_add_and_remove_keep_items_whole() -> None:
+    collection = get_class(
+        {"type": "OrderedCollection", "id": "https://example.com/c", "orderedItems": ["https://example.com/x"]}
+    )
+    collection.add(get_class(CREATE))
+    added = collection.data()["orderedItems"][0]
+    assert added["type"] == "Create"
+    assert str(added["actor"][0]["id"]) == CREATE["actor"]
+    assert str(added["object"]["id"]) == CREATE["object"]["id"]
+    assert collection.data()["totalItems"] == 2
+    collection.remove(get_class(CREATE))
+    assert [str(i["id"]) for i in collection.data()["orderedItems"]] == ["https://example.com/x"]
+    assert collection.data()["totalItems"] == 1
+
+
+def test_class_pickles() -> None:
+    activity = pickle.loads(pickle.dumps(get_class(CREATE)))
+    assert str(activity.data(use_input_json=True)["object"]["id"]) == "https://example.com/n/1"
+
+
+def test_class_memory_per_activity() -> None:
+    # The class should add almost nothing to the validated model it wraps
+    tracemalloc.start()
+    models = [get_model(CREATE) for _ in range(200)]
+    model_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del models
+    tracemalloc.start()
+    classes = [get_class(CREATE) for _ in range(200)]
+    class_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del classes
+    print(f"per activity: model {model_size / 200:.0f} B, class {class_size / 200:.0f} B")
+    assert class_size < model_size * 1.2
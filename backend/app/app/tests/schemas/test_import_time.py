@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+# Cumulative import time budget for the ActivityPub models, in microseconds
+IMPORT_BUDGET = 500000
+
+
+def _import_times(module: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            # Nested imports are reported first, before the parent packages that contain them
+            times.setdefault(name.strip(), int(cumulative))
+    return times
+
+
+def test_activitypubdantic_import_time() -> None:
+    times = _import_times("app.schemas.activitypubdantic.models")
+    cumulative = times["app.schemas.activitypubdantic.models"]
+    print(f"app.schemas.activitypubdantic.models imported in {cumulative / 1000:.1f} ms")
+    assert cumulative < IMPORT_BUDGET
+
+
+def test_activitypubdantic_schemas_deferred() -> None:
+    from app.schemas.activitypubdantic import build_models, get_model
+    from app.schemas.activitypubdantic.models import TombstoneModel
+
+    assert get_model({"type": "Note", "id": "https://example.com/n/1"}).type == "Note"
+    build_models()
+    assert TombstoneModel.__pydantic_complete__
+
+
+def test_link_models_built_on_first_use() -> None:
+    # In a fresh interpreter, so nothing has been built yet
+    code = (
+        "from app.schemas.activitypubdantic import get_model;"
+        "print(get_model({'type': 'Mention', 'href': 'https://example.com/@user', 'name': '@user'}).name)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "@user"
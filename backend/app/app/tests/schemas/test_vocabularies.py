@@ -0,0 +1,53 @@
+import timeit
+from typing import get_args
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.activitypubdantic.models import LinkModel, NoteModel
+from app.schemas.activitypubdantic.models._utils.language_types import language_types, normalize_language
+from app.schemas.activitypubdantic.models._utils.mime_types import normalize_mime_type
+
+
+def test_normalize_language() -> None:
+    assert normalize_language("en-US") == "en-US"
+    assert normalize_language("en-us") == "en-US"
+    assert normalize_language("EN_US") == "en-US"
+    assert normalize_language("fr-lu") == "fr-LU"
+    assert normalize_language("zh-hant") == "zh-Hant"
+    assert normalize_language("xx-YY") is None
+    assert normalize_language("en-") is None
+
+
+def test_normalize_mime_type() -> None:
+    assert normalize_mime_type("image/PNG") == "image/png"
+    assert normalize_mime_type("text/html; charset=utf-8") == "text/html; charset=utf-8"
+    assert normalize_mime_type("image/nope") is None
+
+
+def test_language_maps_normalized() -> None:
+    note = NoteModel(content_map={"EN_us": "Hello", "fr": "Bonjour"}, summary_map={"de-de": "Hallo"})
+    assert note.content_map == {"en-US": "Hello", "fr": "Bonjour"}
+    assert note.summary_map == {"de-DE": "Hallo"}
+    with pytest.raises(ValidationError):
+        NoteModel(content_map={"xx": "?"})
+
+
+def test_link_media_type_and_hreflang() -> None:
+    link = LinkModel(href="https://example.com/a.png", media_type="IMAGE/PNG", hreflang="en_gb")
+    assert link.media_type == "image/png"
+    assert link.hreflang == "en-GB"
+    with pytest.raises(ValidationError):
+        LinkModel(href="https://example.com/a", media_type="image/nope")
+
+
+def test_language_lookup_cost() -> None:
+    # Microbenchmark: per-key cost of the precompiled table against the previous Literal scan
+    number = 20000
+    literal_scan = timeit.timeit(lambda: "zh-TW" in list(get_args(language_types)), number=number) / number
+    table_lookup = timeit.timeit(lambda: normalize_language("zh_tw"), number=number) / number
+    print(f"language key: literal scan {literal_scan * 1e9:.0f} ns, table lookup {table_lookup * 1e9:.0f} ns")
+    assert table_lookup < literal_scan
+    number = 2000
+    per_field = timeit.timeit(lambda: NoteModel(content_map={"en-us": "a", "fr": "b", "de_DE": "c"}), number=number)
+    print(f"NoteModel with a three language contentMap: {per_field / number * 1e6:.1f} µs")
@@ -1,11 +1,16 @@
+import os
 import random
 import string
 from typing import Dict
 
+import pytest
 from fastapi.testclient import TestClient
 
 from app.core.config import settings
 
+# Benchmarks load large tables and print timings, so only run when asked for
+requires_benchmark = pytest.mark.skipif(not os.getenv("RUN_BENCHMARKS"), reason="Set RUN_BENCHMARKS to run")
+
 
 def random_lower_string() -> str:
     return "".join(random.choices(string.ascii_lowercase, k=32))
@@ -1,4 +1,6 @@
+from .regexes import regex  # noqa: F401
 from .email import (  # noqa: F401
+    get_smtp_options,
     send_email,
     send_test_email,
     send_web_contact_email,
@@ -7,4 +9,3 @@ from .email import (  # noqa: F401
     send_new_account_email,
     send_email_validation_email,
 )
-from .regexes import regex  # noqa: F401
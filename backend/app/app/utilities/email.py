@@ -1,26 +1,31 @@
 import logging
-from pathlib import Path
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict
 
-import emails
-from emails.template import JinjaTemplate
+import jinja2
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 
+from app.core.celery_app import TaskPriority, celery_app, get_broker_priority
 from app.core.config import settings
+from app.models import OutboxEmail
+from app.schema_types import EmailPriority
 from app.schemas import EmailContent, EmailValidation
 
+# Prompts to the worker are published off the request thread, as a broker connection can block for seconds
+_prompter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="email-prompt")
+_prompt_pending = threading.Event()
+# Each template is read and compiled once, on first use, and reused for every message. Reloading checks the
+# file's mtime on each use, so is for development only
+email_templates = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(settings.EMAIL_TEMPLATES_DIR),
+    auto_reload=settings.EMAIL_TEMPLATES_RELOAD,
+    cache_size=-1,
+)
 
-def send_email(
-    email_to: str,
-    subject_template: str = "",
-    html_template: str = "",
-    environment: Dict[str, Any] = {},
-) -> None:
-    assert settings.emails_enabled, "no provided configuration for email variables"
-    message = emails.Message(
-        subject=JinjaTemplate(subject_template),
-        html=JinjaTemplate(html_template),
-        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
-    )
+
+def get_smtp_options() -> Dict[str, Any]:
     smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
     if settings.SMTP_TLS:
         # https://python-emails.readthedocs.io/en/latest/
@@ -29,83 +34,139 @@ def send_email(
         smtp_options["user"] = settings.SMTP_USER
     if settings.SMTP_PASSWORD:
         smtp_options["password"] = settings.SMTP_PASSWORD
+    return smtp_options
+
+
+def send_email(
+    db: Session,
+    email_to: str,
+    subject: str,
+    template: str,
+    environment: Dict[str, Any] = {},
+    priority: EmailPriority = EmailPriority.normal,
+) -> None:
+    """
+    Render the named template and add the message to the outbox, flushed but not committed: the caller
+    owns the transaction, and the worker is only prompted to deliver once it commits. Nothing here waits
+    on the SMTP server; the worker also drains the outbox on a schedule, so a message is still sent if the
+    prompt is lost. The subject is sent as given: it may hold creator input, so is never rendered as a template.
+    """
+    assert settings.emails_enabled, "no provided configuration for email variables"
     # Add common template environment elements
-    environment["server_host"] = settings.SERVER_HOST
-    environment["server_name"] = settings.SERVER_NAME
-    environment["server_bot"] = settings.SERVER_BOT
-    response = message.send(to=email_to, render=environment, smtp=smtp_options)
-    logging.info(f"send email result: {response}")
+    environment = {
+        **environment,
+        "server_host": settings.SERVER_HOST,
+        "server_name": settings.SERVER_NAME,
+        "server_bot": settings.SERVER_BOT,
+    }
+    # Added through the model, as `app.crud` imports the schemas, which import this package
+    db_obj = OutboxEmail(
+        email_to=email_to,
+        subject=subject,
+        html=email_templates.get_template(template).render(**environment),
+        priority=priority,
+    )
+    db.add(db_obj)
+    db.flush()
+    db.info["email_queued"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _prompt_on_commit(session: Session) -> None:
+    if session.info.pop("email_queued", False):
+        prompt_delivery()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session: Session) -> None:
+    session.info.pop("email_queued", None)
+
+
+def _prompt_worker() -> None:
+    _prompt_pending.clear()
+    try:
+        celery_app.send_task(
+            "app.worker.email.deliver_emails", priority=get_broker_priority(TaskPriority.interactive), retry=False
+        )
+    except Exception as e:
+        logging.warning(f"Email queued, but the worker could not be prompted: {e}")
+
+
+def prompt_delivery() -> None:
+    # One drain sends everything pending, so prompts made while one is waiting are dropped
+    if not _prompt_pending.is_set():
+        _prompt_pending.set()
+        _prompter.submit(_prompt_worker)
 
 
-def send_email_validation_email(data: EmailValidation) -> None:
+def send_email_validation_email(db: Session, data: EmailValidation) -> None:
     subject = f"{settings.PROJECT_NAME} - {data.subject}"
     server_host = settings.SERVER_HOST
     link = f"{server_host}?token={data.token}"
-    with open(Path(settings.EMAIL_TEMPLATES_DIR) / "confirm_email.html") as f:
-        template_str = f.read()
     send_email(
+        db,
         email_to=data.email,
-        subject_template=subject,
-        html_template=template_str,
+        subject=subject,
+        template="confirm_email.html",
         environment={"link": link},
+        priority=EmailPriority.urgent,
     )
 
 
-def send_web_contact_email(data: EmailContent) -> None:
+def send_web_contact_email(db: Session, data: EmailContent) -> None:
     subject = f"{settings.PROJECT_NAME} - {data.subject}"
-    with open(Path(settings.EMAIL_TEMPLATES_DIR) / "web_contact_email.html") as f:
-        template_str = f.read()
     send_email(
+        db,
         email_to=settings.EMAILS_TO_EMAIL,
-        subject_template=subject,
-        html_template=template_str,
+        subject=subject,
+        template="web_contact_email.html",
         environment={"content": data.content, "email": data.email},
+        priority=EmailPriority.bulk,
     )
 
 
-def send_test_email(email_to: str) -> None:
+def send_test_email(db: Session, email_to: str) -> None:
     project_name = settings.PROJECT_NAME
     subject = f"{project_name} - Test email"
-    with open(Path(settings.EMAIL_TEMPLATES_DIR) / "test_email.html") as f:
-        template_str = f.read()
     send_email(
+        db,
         email_to=email_to,
-        subject_template=subject,
-        html_template=template_str,
+        subject=subject,
+        template="test_email.html",
         environment={"project_name": settings.PROJECT_NAME, "email": email_to},
+        priority=EmailPriority.bulk,
     )
 
 
-def send_magic_login_email(email_to: str, token: str) -> None:
+def send_magic_login_email(db: Session, email_to: str, token: str) -> None:
     project_name = settings.PROJECT_NAME
     subject = f"Your {project_name} magic login"
-    with open(Path(settings.EMAIL_TEMPLATES_DIR) / "magic_login.html") as f:
-        template_str = f.read()
     server_host = settings.SERVER_HOST
     link = f"{server_host}?magic={token}"
     send_email(
+        db,
         email_to=email_to,
-        subject_template=subject,
-        html_template=template_str,
+        subject=subject,
+        template="magic_login.html",
         environment={
             "project_name": settings.PROJECT_NAME,
             "valid_minutes": int(settings.ACCESS_TOKEN_EXPIRE_SECONDS / 60),
             "link": link,
         },
+        priority=EmailPriority.urgent,
     )
 
 
-def send_reset_password_email(email_to: str, email: str, token: str) -> None:
+def send_reset_password_email(db: Session, email_to: str, email: str, token: str) -> None:
     project_name = settings.PROJECT_NAME
     subject = f"{project_name} - Password recovery for creator {email}"
-    with open(Path(settings.EMAIL_TEMPLATES_DIR) / "reset_password.html") as f:
-        template_str = f.read()
     server_host = settings.SERVER_HOST
     link = f"{server_host}/reset-password?token={token}"
     send_email(
+        db,
         email_to=email_to,
-        subject_template=subject,
-        html_template=template_str,
+        subject=subject,
+        template="reset_password.html",
         environment={
             "project_name": settings.PROJECT_NAME,
             "creatorname": email,
@@ -113,19 +174,19 @@ def send_reset_password_email(email_to: str, email: str, token: str) -> None:
             "valid_hours": int(settings.ACCESS_TOKEN_EXPIRE_SECONDS / 60),
             "link": link,
         },
+        priority=EmailPriority.urgent,
     )
 
 
-def send_new_account_email(email_to: str, creatorname: str, password: str) -> None:
+def send_new_account_email(db: Session, email_to: str, creatorname: str, password: str) -> None:
     project_name = settings.PROJECT_NAME
     subject = f"{project_name} - New account for creator {creatorname}"
-    with open(Path(settings.EMAIL_TEMPLATES_DIR) / "new_account.html") as f:
-        template_str = f.read()
     link = settings.SERVER_HOST
     send_email(
+        db,
         email_to=email_to,
-        subject_template=subject,
-        html_template=template_str,
+        subject=subject,
+        template="new_account.html",
         environment={
             "project_name": settings.PROJECT_NAME,
             "creatorname": creatorname,
@@ -1,3 +1,9 @@
 from app.core.celery_app import celery_app  # noqa: F401
+from app.worker.runtime import runtime  # noqa: F401
+from app.core import scheduling  # noqa: F401
 
 from .tests import test_celery  # noqa: F401
+from .stats import refresh_node_stats  # noqa: F401
+from .activity import maintain_activity_partitions  # noqa: F401
+from .email import deliver_emails, purge_email_outbox  # noqa: F401
+from .actor import refresh_remote_actors  # noqa: F401
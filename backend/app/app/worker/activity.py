@@ -0,0 +1,9 @@
+from app import crud
+from app.core.celery_app import TaskPriority, celery_app
+from app.db.session import SessionLocal
+
+
+@celery_app.task(acks_late=True, priority_class=TaskPriority.maintenance)
+def maintain_activity_partitions() -> dict[str, list[str]]:
+    with SessionLocal() as db:
+        return crud.activity.maintain_partitions(db)
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import Row
+
+from app import crud
+from app.core.celery_app import IO_QUEUE, TaskPriority, celery_app
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.schemas import ActorRemoteCreate
+from app.worker.runtime import runtime
+
+_ACCEPT = 'application/activity+json, application/ld+json; profile="https://www.w3.org/ns/activitystreams"'
+
+
+def _get_ref(value: Any) -> Optional[str]:
+    # A reference may be a URI, a Link, or an embedded object
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        return value.get("id") or value.get("href")
+    return value
+
+
+def get_remote_actor(
+    document: dict[str, Any], *, etag: Optional[str] = None, last_modified: Optional[str] = None
+) -> ActorRemoteCreate:
+    """
+    The columns stored for a remote actor, from its ActivityPub document. Every column is set, so
+    a property the remote has since dropped is cleared on upsert.
+    """
+    public_key = document.get("publicKey") or {}
+    return ActorRemoteCreate(
+        type=document.get("type"),
+        preferredUsername=document.get("preferredUsername"),
+        name=document.get("name"),
+        domain=urlsplit(document.get("id", "")).hostname,
+        inbox=document.get("inbox"),
+        outbox=document.get("outbox"),
+        sharedInbox=(document.get("endpoints") or {}).get("sharedInbox"),
+        following=_get_ref(document.get("following")),
+        followers=_get_ref(document.get("followers")),
+        liked=_get_ref(document.get("liked")),
+        URI=document.get("id"),
+        URL=_get_ref(document.get("url")),
+        publicKey=public_key.get("publicKeyPem"),
+        publicKeyURI=public_key.get("id"),
+        etag=etag,
+        last_modified=last_modified,
+    )
+
+
+async def fetch_actor(client: httpx.AsyncClient, actor: Row, limit: asyncio.Semaphore) -> Optional[ActorRemoteCreate]:
+    """
+    Conditionally refetch a remote actor, returning its columns only if the document has changed, and
+    raising if it could not be fetched. The validators are sent back exactly as the remote gave them.
+    """
+    headers = {"Accept": _ACCEPT}
+    if actor.etag:
+        headers["If-None-Match"] = actor.etag
+    if actor.last_modified:
+        headers["If-Modified-Since"] = actor.last_modified
+    async with limit:
+        response = await client.get(actor.URI, headers=headers)
+    if response.status_code == httpx.codes.NOT_MODIFIED:
+        return None
+    response.raise_for_status()
+    remote = get_remote_actor(
+        response.json(), etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified")
+    )
+    # A host may only describe its own actors
+    if str(remote.URI) != actor.URI:
+        raise ValueError(f"returned {remote.URI}")
+    return remote
+
+
+async def fetch_actors(actors: list[Row]) -> list[Optional[ActorRemoteCreate] | BaseException]:
+    """
+    Refetch actors concurrently on the shared client, at most `ACTOR_REFRESH_PER_HOST` at a time to any
+    one host, returning the changed columns, `None` if unchanged, or the error, for each in order.
+    """
+    limits: dict[str, asyncio.Semaphore] = {}
+    fetches = []
+    for actor in actors:
+        host = urlsplit(actor.URI).hostname
+        limit = limits.setdefault(host, asyncio.Semaphore(settings.ACTOR_REFRESH_PER_HOST))
+        fetches.append(fetch_actor(runtime.client, actor, limit))
+    return await asyncio.gather(*fetches, return_exceptions=True)
+
+
+@celery_app.task(queue=IO_QUEUE, priority_class=TaskPriority.bulk)
+def refresh_remote_actors() -> dict[str, int]:
+    with SessionLocal() as db:
+        actors = crud.actor.get_stale_remote(db)
+    if not actors:
+        return {"fetched": 0, "changed": 0}
+    # No session is held open while waiting on remote hosts
+    results = runtime.run(fetch_actors(actors))
+    changed, unchanged, failed = [], [], []
+    for actor, result in zip(actors, results):
+        if isinstance(result, BaseException):
+            # An unreachable host or a malformed document; tried again after `ACTOR_REFRESH_RETRY_SECONDS`
+            logging.warning(f"Actor refresh failed for {actor.URI}: {result!r}")
+            failed.append(actor.id)
+        elif result is None:
+            unchanged.append(actor.id)
+        else:
+            changed.append(result)
+    with SessionLocal() as db:
+        if changed:
+            crud.actor.upsert_remote(db, obj_in=changed)
+        crud.actor.record_fetched(db, ids=unchanged)
+        crud.actor.record_failed(db, ids=failed)
+    return {"fetched": len(actors), "changed": len(changed), "failed": len(failed)}
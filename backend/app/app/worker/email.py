@@ -0,0 +1,70 @@
+import logging
+from typing import Optional
+
+import emails
+from emails.backend.smtp import SMTPBackend
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.celery_app import TaskPriority, celery_app
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.utilities import get_smtp_options
+
+
+def deliver_outbox(db: Session, *, backend: Optional[SMTPBackend] = None) -> dict[str, int]:
+    """
+    Drain the outbox, most urgent first, over a single SMTP connection. A failed message is retried
+    later with backoff; if the server cannot be reached at all, the rest of the batch is deferred
+    without trying each in turn.
+    """
+    assert settings.emails_enabled, "no provided configuration for email variables"
+    backend = backend or SMTPBackend(**get_smtp_options())
+    counts = {"sent": 0, "failed": 0}
+    try:
+        while db_objs := crud.email.claim(db):
+            unreachable = None
+            for db_obj in db_objs:
+                if unreachable:
+                    crud.email.record_failed(db_obj=db_obj, error=unreachable)
+                    counts["failed"] += 1
+                    continue
+                try:
+                    message = emails.Message(
+                        subject=db_obj.subject,
+                        html=db_obj.html,
+                        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+                    )
+                    response = message.send(to=db_obj.email_to, smtp=backend)
+                except Exception as e:
+                    # One malformed message must not hold up the rest
+                    crud.email.record_failed(db_obj=db_obj, error=repr(e))
+                    counts["failed"] += 1
+                    continue
+                if response.success:
+                    crud.email.record_sent(db_obj=db_obj)
+                    counts["sent"] += 1
+                    continue
+                error = f"{response.status_code} {response.status_text or response.error}"
+                crud.email.record_failed(db_obj=db_obj, error=error)
+                counts["failed"] += 1
+                if response.status_code is None:
+                    # Never reached the server
+                    unreachable = error
+            db.commit()
+    finally:
+        backend.close()
+    logging.info(f"deliver email result: {counts}")
+    return counts
+
+
+@celery_app.task(acks_late=True, priority_class=TaskPriority.interactive)
+def deliver_emails() -> dict[str, int]:
+    with SessionLocal() as db:
+        return deliver_outbox(db)
+
+
+@celery_app.task(acks_late=True, priority_class=TaskPriority.maintenance)
+def purge_email_outbox() -> int:
+    with SessionLocal() as db:
+        return crud.email.purge(db)
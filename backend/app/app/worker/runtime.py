@@ -0,0 +1,163 @@
+import asyncio
+import functools
+import logging
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+
+import httpx
+from celery import Task
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_shutdown
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.celery_app import IO_QUEUE, celery_app
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, async_engine
+from app.schemas.activitypubdantic import build_models
+
+T = TypeVar("T")
+
+
+class AsyncRuntime:
+    """
+    One event loop per worker process, on its own thread, so Celery tasks can be coroutines. Every
+    task shares the loop's HTTP client and the async database engine. The pool thread running a task
+    only waits for its result, so with the `threads` pool a process holds as many I/O-bound jobs in
+    flight as it has threads, all multiplexed on the one loop. Far fewer of those can hold a database
+    connection at once, so coroutines take sessions from `session()`, which queues them for the pool.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sessions: Optional[asyncio.Semaphore] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run_loop, args=(loop, started), name="async-runtime", daemon=True
+                )
+                self._thread.start()
+                started.wait()
+                self._loop = loop
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop, started: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        loop.run_forever()
+        loop.close()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Only used from coroutines on the loop, which is single threaded
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=settings.WORKER_HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.WORKER_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.WORKER_HTTP_MAX_CONNECTIONS,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """
+        An async session, once one of the pool's connections is free. Only used from coroutines on the loop.
+        """
+        if self._sessions is None:
+            # As many as the async pool holds, so no checkout waits out POSTGRES_POOL_TIMEOUT
+            self._sessions = asyncio.Semaphore(max(settings.POSTGRES_POOL_SIZE + settings.POSTGRES_MAX_OVERFLOW, 1))
+        async with self._sessions:
+            async with AsyncSessionLocal() as db:
+                yield db
+
+    def run(self, coro: Coroutine[Any, Any, T], *, timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine on the loop and wait for its result, cancelling it after `timeout` seconds.
+        """
+        loop = self.loop
+        if self._thread is threading.current_thread():
+            coro.close()
+            raise RuntimeError("AsyncRuntime.run would block its own event loop; await the coroutine instead.")
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout or settings.WORKER_TASK_TIMEOUT)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    async def _aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        await async_engine.dispose()
+
+    def stop(self) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+            self._sessions = None
+        if loop is None or thread is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._aclose(), loop).result(settings.WORKER_HTTP_TIMEOUT)
+        except Exception as e:
+            logging.warning(f"Async runtime did not close cleanly: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(settings.WORKER_HTTP_TIMEOUT)
+
+    def reset(self) -> None:
+        # A forked child inherits the parent's references but not its loop thread, nor may it share its connections
+        with self._lock:
+            self._loop = self._thread = None
+            self._client = None
+            self._sessions = None
+        async_engine.sync_engine.dispose(close=False)
+
+
+runtime = AsyncRuntime()
+
+
+def async_task(**options: Any) -> Callable[[Callable[..., Coroutine[Any, Any, T]]], Task]:
+    """
+    Register a coroutine function as a Celery task that runs on the process's event loop. Takes the
+    same options as `celery_app.task`; the task goes to the I/O queue unless given another.
+    """
+    options.setdefault("queue", IO_QUEUE)
+
+    def decorator(fn: Callable[..., Coroutine[Any, Any, T]]) -> Task:
+        @functools.wraps(fn)
+        def run(*task_args: Any, **task_kwargs: Any) -> T:
+            return runtime.run(fn(*task_args, **task_kwargs))
+
+        return celery_app.task(**options)(run)
+
+    return decorator
+
+
+@worker_init.connect
+def build_worker_models(**kwargs: Any) -> None:
+    # ActivityPub schemas are deferred at import; build them once before the pool forks
+    build_models()
+
+
+@worker_process_init.connect
+def reset_runtime(**kwargs: Any) -> None:
+    runtime.reset()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_runtime(**kwargs: Any) -> None:
+    runtime.stop()
@@ -1,13 +1,13 @@
 from raven import Client
 import asyncio
 
-from app.core.celery_app import celery_app
 from app.core.config import settings
+from app.worker.runtime import async_task
 
 client_sentry = Client(settings.SENTRY_DSN)
 
 
-@celery_app.task(acks_late=True)
+@async_task(acks_late=True)
 async def test_celery(word: str) -> str:
     await asyncio.sleep(5)
     return f"test task return {word}"
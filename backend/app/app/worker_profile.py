@@ -0,0 +1,12 @@
+import sys
+
+from app.core.celery_app import get_worker_arguments
+
+
+def main() -> None:
+    # Prints the `celery worker` options for the profile named, for worker-start.sh
+    print(" ".join(get_worker_arguments(sys.argv[1] if len(sys.argv) > 1 else "all")))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,4 +2,6 @@
 set -e
 
 hatch run python /app/app/worker_pre_start.py
-hatch run celery -A app.worker worker -l info -Q main-queue -c 1
+# WORKER_PROFILE picks the queues, pool, concurrency and prefetch: main, cpu, io, email, or all for development
+WORKER_ARGS=$(hatch run python /app/app/worker_profile.py "${WORKER_PROFILE:-all}")
+hatch run celery -A app.worker worker -l info $WORKER_ARGS